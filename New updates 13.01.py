@@ -1,60 +1,248 @@
 import flet as ft
+import asyncio
 import datetime
+import functools
 import logging
-import random
+import os
+import re
+import sqlite3
 import time
-import threading
 
-# Set up logging to catch and print errors
-logging.basicConfig(level=logging.INFO)
-
-# --- Color Palette ---
-BG_COLOR = "#121212"
-CARD_COLOR = "#1E1E1E"
-ACCENT_MOVEMENT = "#00E676"  # Neon Green for Movement
-ACCENT_SLEEP = "#651FFF"     # Deep Purple for Sleep
-ACCENT_NAP = "#FF9100"       # Orange for Naps
-ACCENT_WARNING = "#FF5252"   # Red for Schedule Warning
-TEXT_COLOR = "#FFFFFF"
-
-# --- Utility Colors ---
-C_TRANSPARENT = "#00000000"
-C_WHITE10 = "#1AFFFFFF"      
-C_GREY_400 = "#BDBDBD"
-C_GREY_700 = "#616161"
-C_RED_400 = "#EF5350"
-C_WARNING = "#FF8A80"        # Light Red for warnings
-
-# --- Sleep Gradient (Calm/Dark Purple-Blue) ---
-SLEEP_GRADIENT_COLORS = ["#0f0c29",  "#302b63", "#24243e"]
-
-# --- Movement Gradient (Pastel Turquoise/Blue-Greenish) for enegrising mood ---
-MOVEMENT_GRADIENT_COLORS = ["#FF00AA69", "#FF006970"] 
-
-# --- Dashboard Gradient (Dark Sea Blue) for calming opening colors ---
-DASHBOARD_GRADIENT_COLORS = ["#191186B9", "#1F21AD86", "#090F7AA7"]
-
-GLASS_COLOR = "#25252550"
+import metrics
+import sleep_rules
+from completions import CategoryIndex, CompletionLog
+from events import FrameBatcher, Mailbox, coalesce_slider
+from models import CATEGORIES, NORMAL, PRIORITIES, format_due, parse_due
+from sleep_history import QUALITY_LABELS, SleepHistory
+from storage import HabitStorage
+from task_store import TaskStore
+from theme import (
+    ACCENT_MOVEMENT, ACCENT_NAP, ACCENT_SLEEP, ACCENT_WARNING, BG_COLOR, C_GREY_400, C_GREY_700, C_RED_400,
+    C_TRANSPARENT, C_WARNING, C_WHITE10, CARD_COLOR, GLASS_COLOR, TEXT_COLOR, VIEW_GRADIENTS
+)
+
+# Only the dashboard path is imported here. The Mindfulness tab, the Sleep History
+# view and import/export (transfer) live in their own modules and are imported inside
+# the methods that first need them; run importtime_report.py to check what startup imports.
+
+QUOTE = "Small steps every day lead to giant leaps over time."
+
+QUALITY_TOOLTIP = (
+    "1: Horrible - Barely slept at all.\n"
+    "2: Poor - Restless, woke up frequently.\n"
+    "3: Average - Okay sleep, usual routine.\n"
+    "4: Good - Restful, mostly uninterrupted.\n"
+    "5: Well Rested - Didn't wake up once, feeling extremely energized."
+)
+
+# --- Persistence ---
+DB_PATH = os.environ.get("ZENITH_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "zenith.db"))
+
+# Habits seeded into a fresh database
+DEFAULT_TASKS = (
+    {"label": "Morning Stretch", "done": False, "category": "Exercise", "due": "08:00"},
+    {"label": "30 Min Walk", "done": False, "category": "Exercise"},
+    {"label": "Gym Workout", "done": False, "category": "Exercise", "due": "18:00"},
+    {"label": "Drink 2L Water", "done": False, "category": "Nutrition", "due": "20:00"},
+    {"label": "Read 10 Pages", "done": False, "category": "Mental Exercise", "due": "22:00"},
+    {"label": "Lunch with a Friend", "done": False, "category": "Socialising", "due": "12:00"},
+)
+
+# --- Server Mode ---
+# ZENITH_SERVER=1 serves the app to many browsers from one process; each browser
+# gets its own database file under ZENITH_DATA_DIR, keyed by an id kept in its
+# client storage.
+SERVER_MODE = os.environ.get("ZENITH_SERVER") == "1"
+SERVER_PORT = int(os.environ.get("ZENITH_PORT", "8550"))
+DATA_DIR = os.environ.get("ZENITH_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+TRACE_SESSION_MEMORY = os.environ.get("ZENITH_TRACE_MEMORY") == "1"
+# UI updates are coalesced into one per frame; the web client gets a longer frame
+# since every update is a network round trip
+FRAME_INTERVAL = int(os.environ.get("ZENITH_FRAME_MS", "60" if SERVER_MODE else "16")) / 1000
+if TRACE_SESSION_MEMORY:
+    import tracemalloc
+
+# Cache keys for the NavigationRail destinations, in rail order
+VIEW_KEYS = ("dashboard", "movement", "sleep", "mindfulness")
+
+# --- Task List Virtualization ---
+TASK_ROW_HEIGHT = 62
+TASK_ROW_EXTENT = TASK_ROW_HEIGHT + 10   # row height plus the gap below it
+TASK_LIST_VISIBLE_ROWS = 10              # assumed viewport until the first scroll event
+TASK_LIST_OVERSCAN = 8                   # extra rows kept above and below the viewport
+# A recycled row ignores clicks for this long after it starts showing another habit:
+# the click may have been aimed at the habit it showed before (batched frame + round trip)
+TASK_ROW_REBIND_GUARD = FRAME_INTERVAL + 0.25
+
+# --- Dashboard ---
+UP_NEXT_COUNT = 3   # undone habits listed under "Up Next"
+TREND_DAYS = 7      # the category breakdown compares this many days with the period before
+DUE_TIMES = [format_due(hour * 60) for hour in range(5, 24)]   # choices in the add-habit dialog
+
+
+@functools.lru_cache(maxsize=24)
+def greeting_for(hour):
+    """Different greetings depending on time of day."""
+    if 5 <= hour < 12:
+        return "Good Morning!"
+    if 12 <= hour < 17:
+        return "Good Afternoon!"
+    if 17 <= hour < 21:
+        return "Good Evening!"
+    return "Good Night!"
+
+
+@functools.lru_cache(maxsize=2)
+def date_heading(date):
+    return date.strftime("%A, %d %B")
+
+
+# contrast so writing can be seen in the glass box
+class TaskRow(ft.Container):
+    """Glass card for a single task. Rows are recycled: bind() points one at another task."""
+
+    def __init__(self, on_toggle, on_delete, request_update):
+        self.task_id = None
+        self.done = False
+        self.rebound_at = float("-inf")   # monotonic time task_id last changed
+        self.on_toggle = on_toggle
+        self.on_delete = on_delete
+        self.request_update = request_update
+        self.checkbox = ft.Checkbox(
+            active_color=ACCENT_MOVEMENT, 
+            check_color=BG_COLOR,
+            on_change=self.handle_toggle
+        )
+        self.label_text = ft.Text(size=16, weight="w500")
+        self.category_text = ft.Text(size=12, color=C_GREY_400)
+        super().__init__(
+            # Use white to create a distinct layer on top of the main glass card
+            bgcolor=C_WHITE10, 
+            padding=10, 
+            border_radius=10,
+            border=ft.border.all(1, C_WHITE10),
+            height=TASK_ROW_HEIGHT,
+            margin=ft.margin.only(bottom=TASK_ROW_EXTENT - TASK_ROW_HEIGHT),
+            content=ft.Row([
+                ft.Row([
+                    self.checkbox,
+                    ft.Column([
+                        self.label_text,
+                        self.category_text
+                    ], spacing=0)
+                ]),
+                ft.IconButton(icon="delete_outline", icon_color=C_RED_400, 
+                            on_click=self.handle_delete)
+            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
+        )
 
-class HabitApp:
-    def __init__(self, page: ft.Page):
-        self.page = page
-        self.timer_running = False  # ADD THIS LINE HERE
-        # ... the rest of your init variables ...
-        # ... your existing state variables ...
-
-        # FIX: Define these here so they exist as soon as the app starts
-        self.meditation_timer_text = ft.Text("10:00", size=40, weight="bold", color=ACCENT_MOVEMENT)
-        self.breath_status = ft.Text("Ready to breathe?", size=20, weight="bold")
-        self.breathing_line = ft.Container(
-            width=20, height=20, bgcolor=ACCENT_MOVEMENT, border_radius=20,
-            alignment=ft.alignment.bottom_center
+    async def handle_toggle(self, e):
+        if self.recently_rebound():
+            # Put the checkbox back; the user can click again now that the row is settled
+            self.checkbox.value = self.done
+            self.request_update(self.checkbox)
+            return
+        await self.on_toggle(self.task_id, e.control.value)
+
+    async def handle_delete(self, e):
+        if not self.recently_rebound():
+            await self.on_delete(self.task_id)
+
+    def recently_rebound(self):
+        return time.monotonic() - self.rebound_at < TASK_ROW_REBIND_GUARD
+
+    def bind(self, task):
+        if task.id != self.task_id:
+            if self.task_id is not None and self.visible:
+                # The client still shows the previous habit here until the next frame lands
+                self.rebound_at = time.monotonic()
+            self.task_id = task.id
+        self.done = task.done
+        self.checkbox.value = task.done
+        self.label_text.value = task.label
+        # task.streak is the run up to yesterday; today's check extends it
+        streak = task.streak + task.done
+        self.category_text.value = f"{task.category} · {streak}-day streak" if streak > 1 else task.category
+        self.visible = True
+
+
+class VirtualTaskList:
+    """Windowed ft.ListView over one partition (To Do or Done) of a TaskStore.
+
+    Only the rows around the viewport (plus overscan) exist as controls; spacers
+    stand in for the rest. Scrolling and store changes rebind the existing rows
+    in place, so the client only receives the values that changed.
+    """
+
+    def __init__(self, title, store, done, on_toggle, on_delete, request_update):
+        self.store = store
+        self.done = done
+        self.on_toggle = on_toggle
+        self.on_delete = on_delete
+        self.request_update = request_update   # FrameBatcher.mark
+        self.start = 0
+        self.visible_rows = TASK_LIST_VISIBLE_ROWS
+        self.rows = []
+        self.top_spacer = ft.Container(height=0)
+        self.bottom_spacer = ft.Container(height=0)
+        self.list_view = ft.ListView(
+            controls=[self.top_spacer, self.bottom_spacer],
+            expand=True,
+            spacing=0,
+            on_scroll=self.handle_scroll,
+            on_scroll_interval=50,
         )
-      
-      
-        self.setup_page()
-        
-        # --- State ---
+        self.control = ft.Column([
+            ft.Text(title, weight="bold", color="white"),
+            self.list_view,
+        ], expand=True, spacing=10)
+        self.render()
+
+    def render(self):
+        """Rebinds the row window to the current store contents."""
+        total = self.store.count(self.done)
+        window = self.visible_rows + 2 * TASK_LIST_OVERSCAN
+        self.start = max(0, min(self.start, total - window))
+        tasks = self.store.window(self.done, self.start, self.start + window)
+
+        if len(self.rows) < len(tasks):
+            self.rows.extend(
+                TaskRow(self.on_toggle, self.on_delete, self.request_update) for _ in range(len(tasks) - len(self.rows))
+            )
+            self.list_view.controls = [self.top_spacer, *self.rows, self.bottom_spacer]
+
+        for row, task in zip(self.rows, tasks):
+            row.bind(task)
+        # Spare rows stay mounted but hidden until the window needs them again
+        for row in self.rows[len(tasks):]:
+            row.visible = False
+
+        self.top_spacer.height = self.start * TASK_ROW_EXTENT
+        self.bottom_spacer.height = (total - self.start - len(tasks)) * TASK_ROW_EXTENT
+
+    async def handle_scroll(self, e):
+        first = int(e.pixels // TASK_ROW_EXTENT)
+        visible_rows = int(e.viewport_dimension // TASK_ROW_EXTENT) + 1
+        shown = sum(1 for row in self.rows if row.visible)
+        # Only re-window once the viewport leaves the rows that already exist
+        if first >= self.start and first + visible_rows <= self.start + shown and visible_rows <= self.visible_rows:
+            return
+
+        self.visible_rows = max(self.visible_rows, visible_rows)
+        self.start = max(0, first - TASK_LIST_OVERSCAN)
+        self.render()
+        self.request_update(self.list_view)
+
+class SessionState:
+    """Per-session user state. Tasks, sleep history and completions are set by start() once loaded."""
+
+    __slots__ = (
+        "sleep_hours", "sleep_quality", "nap_hours", "bedtime", "wakeup",
+        "show_sleep_history", "task_store", "sleep_history", "completions", "completions_day",
+        "category_index",
+    )
+
+    def __init__(self):
         self.sleep_hours = 7.0
         self.sleep_quality = 3
         self.nap_hours = 0.0  
@@ -65,21 +253,34 @@ class HabitApp:
         
         # Sleep History UI State
         self.show_sleep_history = False
+
+        self.task_store = None
+        self.sleep_history = None
+        self.completions = None
+        self.completions_day = None   # the day the done flags currently describe
+        self.category_index = None
+
+
+class HabitApp:
+    def __init__(self, page: ft.Page):
+        self.page = page
+        metrics.instrument_page(page)
+
+        self.mindfulness = None  # MindfulnessView, built on first visit
+        self.pending_export = None  # extension picked in the export menu, None while importing
+        self.rollover_handle = None  # loop timer for the next midnight
+
+        self.setup_page()
         
-        self.categories = [
-            "Socialising", "Exercise", "Mental Exercise", 
-            "Hygiene", "Nutrition", "Chores", "Others"
-        ]
-        
-        self.movement_tasks = [
-            {"label": "Morning Stretch", "done": False, "category": "Exercise"},
-            {"label": "30 Min Walk", "done": False, "category": "Exercise"},
-            {"label": "Gym Workout", "done": False, "category": "Exercise"},
-            {"label": "Drink 2L Water", "done": False, "category": "Nutrition"},
-            {"label": "Read 10 Pages", "done": False, "category": "Mental Exercise"},
-            {"label": "Lunch with a Friend", "done": False, "category": "Socialising"},
-        ]
-        self.quote = "Small steps every day lead to giant leaps over time."
+        # --- State ---
+        # Everything user-specific lives in one compact object; the rest is shared.
+        # State and controls are only changed on the session loop (handlers, the
+        # tick scheduler); anything running in another thread posts to the mailbox.
+        self.state = SessionState()
+        self.mailbox = Mailbox(self.page.loop)
+        self.categories = CATEGORIES
+        self.quote = QUOTE
+        self.storage = None  # opened by start()
 
         # --- UI Components ---
         self.content_area = ft.Container(
@@ -87,46 +288,72 @@ class HabitApp:
             padding=30,
         )
         
-        # Movement Inputs
-        self.new_task_input = ft.TextField(
-            hint_text="e.g., Yoga Session", 
-            border_color=ACCENT_MOVEMENT,
-            cursor_color=ACCENT_MOVEMENT,
-            text_style=ft.TextStyle(color=TEXT_COLOR)
-        )
-        
-        # Category dropdown
-        self.new_task_category = ft.Dropdown(
-            options=[ft.dropdown.Option(c) for c in self.categories],
-            width=200,
-            hint_text="Category",
-            border_color=C_GREY_700,
-            text_style=ft.TextStyle(color=TEXT_COLOR)
-        )
+        # Pickers, the add-habit dialog and its inputs are built on first use
+        # (see the lazy overlay properties below), so startup only pays for the dashboard
+
+        # Every page update goes through the batcher: handlers mark what changed and
+        # one update per frame carries all of it
+        self.ui_batcher = FrameBatcher(self.page, FRAME_INTERVAL)
+
+        # --- View Cache ---
+        # Each view is built once and kept mounted inside view_host; navigating
+        # only flips visibility and patches the values that changed.
+        self.view_host = ft.Column(expand=True, spacing=0)
+        self.view_cache = {}
+        self.view_builders = {
+            "dashboard": self.view_dashboard,
+            "movement": self.view_movement,
+            "sleep": self.view_sleep,
+            "sleep_history": self.view_sleep_history,
+            "mindfulness": self.view_mindfulness,
+        }
+        self.view_patchers = {
+            "dashboard": self.patch_dashboard,
+            "sleep_history": self.patch_sleep_history,
+        }
 
-        # Time Pickers for Sleep
-        self.bedtime_picker = ft.TimePicker(
-            confirm_text="Set Bedtime",
-            error_invalid_text="Time invalid",
-            help_text="Select your bedtime",
-            on_change=self.handle_bedtime_change
-        )
-        self.wakeup_picker = ft.TimePicker(
-            confirm_text="Set Wake Up",
-            error_invalid_text="Time invalid",
-            help_text="Select wake up time",
-            on_change=self.handle_wakeup_change
-        )
+    async def start(self):
+        """Loads saved data without blocking the event loop, then renders the UI."""
+        # --- Persistence ---
+        db_path = await self.session_db_path() if SERVER_MODE else DB_PATH
+        self.storage = await asyncio.to_thread(HabitStorage, db_path)
+        self.storage.on_write_error = self.handle_storage_error
+        self.storage.start()
+        # A web client may drop and reconnect to the same session; only on_close ends it
+        self.page.on_disconnect = self.handle_disconnect
+        self.page.on_close = self.handle_close
+        if self.storage.is_new:
+            self.state.task_store = TaskStore(DEFAULT_TASKS)
+            for task in self.state.task_store:
+                self.storage.save_task(task)
+        else:
+            self.state.task_store = TaskStore(await asyncio.to_thread(self.storage.load_tasks))
+        self.state.sleep_history = SleepHistory(await asyncio.to_thread(self.storage.load_sleep_history))
+        self.state.completions = CompletionLog(await asyncio.to_thread(self.storage.load_completions))
+        self.state.category_index = CategoryIndex(self.state.task_store, self.state.completions)
+        self.roll_over()
+        self.load_sleep_log()
 
-        self.rail = self.create_navigation()
         self.initialize_ui()
+        self.ui_batcher.flush()   # first paint shouldn't wait for a frame
+        self.schedule_rollover()
+
+    async def session_db_path(self):
+        """Returns this browser's database file, creating its user id on first visit."""
+        user_id = await self.page.client_storage.get_async("zenith.user_id")
+        # Only accept ids we generated, so the value can't point outside DATA_DIR
+        if not isinstance(user_id, str) or not re.fullmatch(r"[0-9a-f]{32}", user_id):
+            import uuid  # server mode only
+            user_id = uuid.uuid4().hex
+            await self.page.client_storage.set_async("zenith.user_id", user_id)
+        os.makedirs(DATA_DIR, exist_ok=True)
+        return os.path.join(DATA_DIR, f"zenith-{user_id}.db")
 
     def setup_page(self):
         self.page.title = "Zenith | Habit Tracker"
         self.page.theme_mode = ft.ThemeMode.DARK
         self.page.bgcolor = BG_COLOR
         self.page.padding = 0
-        self.page.update()
 
     def create_navigation(self):
         return ft.NavigationRail(
@@ -161,28 +388,113 @@ class HabitApp:
             bgcolor=CARD_COLOR,
         )
 
-    def initialize_ui(self):
-        self.add_task_dialog = ft.AlertDialog(
+    # --- Lazy overlays ---
+    # Each is created and added to page.overlay the first time it is touched; the
+    # handler that opens it sends the page update that mounts it.
+
+    @functools.cached_property
+    def bedtime_picker(self):
+        return self.add_overlay(ft.TimePicker(
+            confirm_text="Set Bedtime",
+            error_invalid_text="Time invalid",
+            help_text="Select your bedtime",
+            on_change=self.handle_bedtime_change
+        ))
+
+    @functools.cached_property
+    def wakeup_picker(self):
+        return self.add_overlay(ft.TimePicker(
+            confirm_text="Set Wake Up",
+            error_invalid_text="Time invalid",
+            help_text="Select wake up time",
+            on_change=self.handle_wakeup_change
+        ))
+
+    @functools.cached_property
+    def new_task_input(self):
+        return ft.TextField(
+            hint_text="e.g., Yoga Session", 
+            border_color=ACCENT_MOVEMENT,
+            cursor_color=ACCENT_MOVEMENT,
+            text_style=ft.TextStyle(color=TEXT_COLOR)
+        )
+
+    @functools.cached_property
+    def new_task_category(self):
+        return ft.Dropdown(
+            options=[ft.dropdown.Option(c) for c in self.categories],
+            width=200,
+            hint_text="Category",
+            border_color=C_GREY_700,
+            text_style=ft.TextStyle(color=TEXT_COLOR)
+        )
+
+    @functools.cached_property
+    def new_task_priority(self):
+        return ft.Dropdown(
+            options=[ft.dropdown.Option(key=str(i), text=p) for i, p in enumerate(PRIORITIES)],
+            width=140,
+            hint_text="Priority",
+            border_color=C_GREY_700,
+            text_style=ft.TextStyle(color=TEXT_COLOR)
+        )
+
+    @functools.cached_property
+    def new_task_due(self):
+        return ft.Dropdown(
+            options=[ft.dropdown.Option(t) for t in DUE_TIMES],
+            width=140,
+            hint_text="Due by",
+            border_color=C_GREY_700,
+            text_style=ft.TextStyle(color=TEXT_COLOR)
+        )
+
+    @functools.cached_property
+    def add_task_dialog(self):
+        return self.add_overlay(ft.AlertDialog(
             title=ft.Text("Add New Habit"),
             content=ft.Column([
                 self.new_task_input,
                 ft.Container(height=10),
-                self.new_task_category
-            ], height=120),
+                self.new_task_category,
+                ft.Container(height=10),
+                ft.Row([self.new_task_priority, self.new_task_due], spacing=10),
+            ], height=200),
             actions=[
                 ft.TextButton("Cancel", on_click=self.close_dialog, style=ft.ButtonStyle(color=C_GREY_400)),
                 ft.TextButton("Add", on_click=self.add_task, style=ft.ButtonStyle(color=ACCENT_MOVEMENT)),
             ],
             actions_alignment=ft.MainAxisAlignment.END,
             bgcolor=CARD_COLOR,
+        ))
+
+    @functools.cached_property
+    def file_picker(self):
+        return self.add_overlay(ft.FilePicker(on_result=self.handle_file_result))
+
+    @functools.cached_property
+    def transfer_dialog(self):
+        self.transfer_status = ft.Text(size=13, width=380)
+        self.transfer_progress = ft.ProgressBar(value=0, color=ACCENT_MOVEMENT, bgcolor=C_WHITE10, width=380)
+        self.transfer_close = ft.TextButton(
+            "Close", on_click=self.close_transfer_dialog, style=ft.ButtonStyle(color=ACCENT_MOVEMENT)
         )
-        
-        # Overlay components
-        self.page.overlay.append(self.add_task_dialog)
-        self.page.overlay.append(self.bedtime_picker)
-        self.page.overlay.append(self.wakeup_picker)
+        return self.add_overlay(ft.AlertDialog(
+            modal=True,
+            title=ft.Text("Import / Export"),
+            content=ft.Column([self.transfer_progress, self.transfer_status], height=140, spacing=15),
+            actions=[self.transfer_close],
+            bgcolor=CARD_COLOR,
+        ))
 
-        self.content_area.content = self.view_dashboard()
+    def add_overlay(self, control):
+        self.page.overlay.append(control)
+        return control
+
+    def initialize_ui(self):
+        """Renders the dashboard; page.add() sends it together with the page settings in one update."""
+        self.rail = self.create_navigation()
+        self.show_view("dashboard")
         
         self.page.add(
             ft.Row(
@@ -195,202 +507,446 @@ class HabitApp:
                 spacing=0
             )
         )
-        self.page.update()
 
     # --- LOGIC ---
 
     def calculate_sleep_duration(self):
-        """Calculates sleep hours based on bedtime and wakeup time."""
-        if self.bedtime and self.wakeup:
-            # Combine with dummy date to perform arithmetic
-            today = datetime.date.today()
-            b_dt = datetime.datetime.combine(today, self.bedtime)
-            w_dt = datetime.datetime.combine(today, self.wakeup)
-            
-            # If wakeup is earlier than bedtime, assume it's the next day
-            if w_dt <= b_dt:
-                w_dt += datetime.timedelta(days=1)
-                
-            diff = w_dt - b_dt
-            total_hours = diff.total_seconds() / 3600
-            
-            # Update state, clamped to slider range (0-14h)
-            self.sleep_hours = min(max(total_hours, 0), 14)
+        """Sets sleep hours from bedtime and wakeup time, when both are set."""
+        hours = sleep_rules.sleep_duration(self.state.bedtime, self.state.wakeup)
+        if hours is not None:
+            self.state.sleep_hours = hours
+
+    def roll_over(self):
+        """Daily rollover: done flags show whether each habit was completed today.
+
+        Also refreshes the streak each habit has at stake (its run up to yesterday),
+        which Up Next ranks by. O(habits), once per day.
+        """
+        today = datetime.date.today()
+        yesterday = today - datetime.timedelta(days=1)
+        store, log = self.state.task_store, self.state.completions
+        for task in store:
+            done = log.is_done(task.id, today)
+            if task.done and task.id not in log:
+                # Done flags saved before completions were logged count for today
+                self.log_completion(task, today, True)
+                done = True
+            if done != task.done:
+                store.set_done(task.id, done)
+                self.storage.save_task(task)
+            store.set_streak(task.id, log.streak(task.id, yesterday))
+        self.state.completions_day = today
+
+    def log_completion(self, task, date, done):
+        """Records a completion in the log, the category index and storage."""
+        log = self.state.completions
+        if log.mark(task.id, date, done):
+            self.state.category_index.mark(task.category_id, date, done)
+            self.storage.save_completions(task.id, log.bits(task.id))
+
+    def schedule_rollover(self):
+        now = datetime.datetime.now()
+        midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time())
+        self.rollover_handle = asyncio.get_running_loop().call_later(
+            (midnight - now).total_seconds() + 1, self.handle_rollover
+        )
+
+    def handle_rollover(self):
+        self.roll_over()
+        self.invalidate_views("movement")
+        self.refresh_current_view()
+        self.schedule_rollover()
+
+    def load_sleep_log(self):
+        """Restores tonight's sleep entry, if one was saved."""
+        entry = self.state.sleep_history.night(datetime.date.today())
+        if entry is None:
+            return
+        self.state.sleep_hours = entry.hours
+        self.state.sleep_quality = entry.quality
+        self.state.nap_hours = entry.nap_hours
+        self.state.bedtime = entry.bedtime
+        self.state.wakeup = entry.wakeup
+
+    def save_sleep_log(self):
+        today = datetime.date.today()
+        self.state.sleep_history.record(
+            today, self.state.sleep_hours, self.state.sleep_quality, self.state.nap_hours, self.state.bedtime, self.state.wakeup
+        )
+        # Queued; rapid slider events for the same night coalesce into one write
+        self.storage.save_sleep(
+            today, self.state.sleep_hours, self.state.sleep_quality, self.state.nap_hours, self.state.bedtime, self.state.wakeup
+        )
 
-    def handle_bedtime_change(self, e):
-        self.bedtime = self.bedtime_picker.value
+    async def handle_disconnect(self, e):
+        # The session (and its timers) lives on, but the client may not come back
+        # (e.g. the desktop window was closed), so get queued writes to disk now
+        try:
+            await self.storage.flush()
+        except sqlite3.Error:
+            pass   # already reported by handle_storage_error; the writes stay queued
+
+    async def handle_close(self, e):
+        """The session is being destroyed: stop its timers and close storage."""
+        if self.rollover_handle is not None:
+            self.rollover_handle.cancel()
+        if self.mindfulness is not None:
+            self.mindfulness.cancel_timers()
+        self.ui_batcher.flush()
+        batcher = self.ui_batcher
+        logging.info(f"UI updates: {batcher.requested} requested, {batcher.sent} sent, {batcher.saved} saved")
+        await self.storage.close()
+
+    def handle_storage_error(self, ex):
+        # Storage keeps the writes and retries; the user should still know
+        metrics.count("errors", where="storage")
+        self.page.snack_bar = ft.SnackBar(ft.Text(f"Couldn't save your changes, retrying: {ex}"))
+        self.page.snack_bar.open = True
+        self.ui_batcher.mark()
+
+    @metrics.timed()
+    async def handle_bedtime_change(self, e):
+        self.state.bedtime = self.bedtime_picker.value
         self.calculate_sleep_duration()
+        self.save_sleep_log()
+        self.invalidate_views("sleep")
         self.refresh_current_view()
 
-    def handle_wakeup_change(self, e):
-        self.wakeup = self.wakeup_picker.value
+    @metrics.timed()
+    async def handle_wakeup_change(self, e):
+        self.state.wakeup = self.wakeup_picker.value
         self.calculate_sleep_duration()
+        self.save_sleep_log()
+        self.invalidate_views("sleep")
         self.refresh_current_view()
 
-    def open_bedtime_picker(self, e):
+    @metrics.timed()
+    async def open_bedtime_picker(self, e):
         self.bedtime_picker.open = True
-        self.page.update()
+        self.ui_batcher.mark()
 
-    def open_wakeup_picker(self, e):
+    @metrics.timed()
+    async def open_wakeup_picker(self, e):
         self.wakeup_picker.open = True
-        self.page.update()
+        self.ui_batcher.mark()
 
-    def open_add_task_dialog(self, e):
+    @metrics.timed()
+    async def open_add_task_dialog(self, e):
         self.new_task_input.value = "" 
         self.new_task_category.value = None
+        self.new_task_priority.value = None
+        self.new_task_due.value = None
         self.add_task_dialog.open = True
-        self.page.update()
+        self.ui_batcher.mark()
 
-    def close_dialog(self, e):
+    @metrics.timed()
+    async def close_dialog(self, e):
         self.add_task_dialog.open = False
-        self.page.update()
+        self.ui_batcher.mark()
 
-    def add_task(self, e):
+    @metrics.timed()
+    async def add_task(self, e):
         if self.new_task_input.value:
             cat = self.new_task_category.value if self.new_task_category.value else "Others"
-            self.movement_tasks.append({
-                "label": self.new_task_input.value, 
-                "done": False,
-                "category": cat
-            })
-            self.refresh_current_view()
+            priority = int(self.new_task_priority.value) if self.new_task_priority.value else NORMAL
+            task = self.state.task_store.add(
+                self.new_task_input.value, cat, priority=priority, due=parse_due(self.new_task_due.value)
+            )
+            self.storage.save_task(task)
             self.add_task_dialog.open = False
-            self.page.update()
 
-    def delete_task(self, task_label):
-        self.movement_tasks = [t for t in self.movement_tasks if t["label"] != task_label]
+            if "movement" in self.view_cache:
+                self.todo_list.render()
+                self.ui_batcher.mark(self.add_task_dialog, self.todo_list.list_view)
+            else:
+                self.ui_batcher.mark(self.add_task_dialog)
+
+    @metrics.timed()
+    async def delete_task(self, task_id):
+        task = self.state.task_store.remove(task_id)
+        if task is None:
+            return
+        self.state.category_index.remove(task.category_id, self.state.completions.days_mask(task_id))
+        self.state.completions.remove(task_id)
+        self.storage.delete_task(task_id)
+        if "movement" not in self.view_cache:
+            return
+
+        task_list = self.done_list if task.done else self.todo_list
+        task_list.render()
+        self.ui_batcher.mark(task_list.list_view)
+
+    @metrics.timed()
+    async def toggle_task(self, task_id, value):
+        if self.state.completions_day != datetime.date.today():
+            # Midnight passed while the loop was suspended; catch up before logging
+            self.roll_over()
+        task = self.state.task_store.get(task_id)
+        if task is None or task.done == bool(value):
+            return
+        self.state.task_store.set_done(task_id, value)
+        self.storage.save_task(task)
+        self.log_completion(task, self.state.completions_day, task.done)
+
+        if "movement" in self.view_cache:
+            self.todo_list.render()
+            self.done_list.render()
+            self.ui_batcher.mark(self.todo_list.list_view, self.done_list.list_view)
+
+    # --- Import / Export ---
+    # Files are streamed in batches by transfer.py; parsing and writing run in a
+    # worker thread and the dialog's progress bar is updated between batches.
+
+    @metrics.timed()
+    async def open_import(self, e):
+        import transfer
+
+        self.pending_export = None
+        picker = self.file_picker
+        self.ui_batcher.mark()
+        self.ui_batcher.flush()   # the picker must be mounted before it's opened
+        picker.pick_files(dialog_title="Import habits and sleep history", allowed_extensions=[ext[1:] for ext in transfer.FORMATS])
+
+    @metrics.timed()
+    async def open_export(self, e):
+        self.pending_export = e.control.data   # file extension
+        picker = self.file_picker
+        self.ui_batcher.mark()
+        self.ui_batcher.flush()
+        picker.save_file(
+            dialog_title="Export habits and sleep history",
+            file_name=f"zenith-export{self.pending_export}",
+            allowed_extensions=[self.pending_export[1:]],
+        )
+
+    async def handle_file_result(self, e):
+        if e.files is None and e.path is None:
+            return   # dialog cancelled
+        if self.pending_export is None:
+            path = e.files[0].path if e.files else None
+        else:
+            path = e.path
+            if path and not os.path.splitext(path)[1]:
+                path += self.pending_export
+        if not path:
+            # Browsers don't expose file paths
+            self.show_transfer("Import and export are only available in the desktop app.", done=True)
+            return
+        if self.pending_export is None:
+            await self.import_file(path)
+        else:
+            await self.export_file(path)
+
+    async def close_transfer_dialog(self, e):
+        self.transfer_dialog.open = False
+        self.ui_batcher.mark()
+
+    def show_transfer(self, status, progress=None, done=False):
+        """Opens or updates the transfer dialog; `progress` None shows an indeterminate bar."""
+        dialog = self.transfer_dialog
+        self.transfer_status.value = status
+        self.transfer_progress.value = 1 if done else progress
+        self.transfer_close.disabled = not done
+        if dialog.open:
+            self.ui_batcher.mark(self.transfer_status, self.transfer_progress, self.transfer_close)
+        else:
+            dialog.open = True
+            self.ui_batcher.mark()
+
+    @metrics.timed()
+    async def import_file(self, path):
+        import transfer
+
+        name = os.path.basename(path)
+        self.show_transfer(f"Importing {name}...", 0)
+        store, history = self.state.task_store, self.state.sleep_history
+        imported = rejected = 0
+        errors = []
+        started = time.perf_counter()
+        try:
+            total_bytes = max(os.path.getsize(path), 1)
+            batches = transfer.read_batches(path, self.categories)
+            while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+                for row in batch.tasks:
+                    task = store.add(
+                        row["label"], row["category"], row["done"], priority=row["priority"], due=parse_due(row["due"])
+                    )
+                    self.storage.save_task(task)
+                    if task.done:
+                        self.log_completion(task, self.state.completions_day, True)
+                for row in batch.nights:
+                    entry = history.record(
+                        row["date"], row["hours"], row["quality"], row["nap_hours"], row["bedtime"], row["wakeup"]
+                    )
+                    self.storage.save_sleep(
+                        entry.date, entry.hours, entry.quality, entry.nap_hours, entry.bedtime, entry.wakeup
+                    )
+                # One transaction per batch, and the write queue never holds more than a batch
+                await self.storage.flush()
+                imported += len(batch.tasks) + len(batch.nights)
+                rejected += batch.rejected
+                errors.extend(batch.errors[:transfer.MAX_ERRORS_KEPT - len(errors)])
+                self.show_transfer(
+                    f"Importing {name}... {imported:,} records", batch.bytes_read / total_bytes
+                )
+        except Exception as ex:
+            logging.exception("Import failed")
+            metrics.count("errors", where="import")
+            self.show_transfer(f"Import stopped after {imported:,} records: {ex}", done=True)
+        else:
+            elapsed = time.perf_counter() - started
+            summary = f"Imported {imported:,} records in {elapsed:.1f}s."
+            if rejected:
+                summary += f"\n{rejected:,} rejected, e.g.:\n" + "\n".join(errors[:3])
+            self.show_transfer(summary, done=True)
+        metrics.count("records_imported", imported)
+
+        # Imported tasks and tonight's entry show up on the next visit
+        self.load_sleep_log()
+        self.invalidate_views("movement", "sleep")
         self.refresh_current_view()
 
-    def toggle_task(self, task_label, value):
-        for task in self.movement_tasks:
-            if task["label"] == task_label:
-                task["done"] = value
-        
-        self.page.update()
-        if self.rail.selected_index == 1:
-            self.refresh_current_view()
+    @metrics.timed()
+    async def export_file(self, path):
+        import transfer
+
+        name = os.path.basename(path)
+        # Snapshot the references so the worker thread never iterates a dict that is being changed
+        tasks, nights = list(self.state.task_store), list(self.state.sleep_history)
+        total = max(len(tasks) + len(nights), 1)
+        self.show_transfer(f"Exporting to {name}...", 0)
 
-    def toggle_sleep_history(self, e):
-        self.show_sleep_history = not self.show_sleep_history
+        def on_progress(count):
+            # Runs in the worker thread
+            self.mailbox.post(self.show_transfer, f"Exporting to {name}... {count:,} records", count / total)
+
+        started = time.perf_counter()
+        try:
+            count = await asyncio.to_thread(
+                transfer.write_records, path, transfer.export_records(tasks, nights), None, on_progress
+            )
+        except Exception as ex:
+            logging.exception("Export failed")
+            metrics.count("errors", where="export")
+            self.mailbox.post(self.show_transfer, f"Export failed: {ex}", None, True)
+            return
+        # Posted behind the worker's progress messages so none of them lands after it
+        summary = f"Exported {count:,} records to {name} in {time.perf_counter() - started:.1f}s."
+        self.mailbox.post(self.show_transfer, summary, None, True)
+
+    @metrics.timed()
+    async def toggle_sleep_history(self, e):
+        self.state.show_sleep_history = not self.state.show_sleep_history
         self.refresh_current_view()
 
-    def navigate(self, e):
+    @metrics.timed()
+    async def navigate(self, e):
         try:
             idx = e.control.selected_index
             
             # --- Background Switching ---
-            if idx == 0: # Dashboard (Deep Slate Blue --> general calming and focused colours)
-                self.content_area.gradient = ft.LinearGradient(
-                    begin=ft.alignment.top_left,
-                    end=ft.alignment.bottom_right,
-                    colors=DASHBOARD_GRADIENT_COLORS
-                )
-                self.content_area.bgcolor = None
-
-            elif idx == 1: # Movement Tab (Pastel/Blue-Green Gradient --> energizing)
-                self.content_area.gradient = ft.LinearGradient(
-                    begin=ft.alignment.top_left,
-                    end=ft.alignment.bottom_right,
-                    colors=MOVEMENT_GRADIENT_COLORS
-                )
-                self.content_area.bgcolor = None
-            
-            elif idx == 2: # Sleep Tab (Calm/Dark Gradient)
-                self.content_area.gradient = ft.LinearGradient(
-                    begin=ft.alignment.top_left,
-                    end=ft.alignment.bottom_right,
-                    colors=SLEEP_GRADIENT_COLORS
-                )
-                self.content_area.bgcolor = None
-            
-            else: # Mindfulness (Standard Dark Background)
-                self.content_area.gradient = None
-                self.content_area.bgcolor = BG_COLOR
+            # Mindfulness has no gradient and uses the standard dark background
+            gradient = VIEW_GRADIENTS[idx]
+            self.content_area.gradient = gradient
+            self.content_area.bgcolor = None if gradient else BG_COLOR
 
             # Reset history view when navigating to other tabs
             if idx != 2:
-                self.show_sleep_history = False
+                self.state.show_sleep_history = False
 
             # Switch Content
             self.refresh_current_view()
             
         except Exception as ex:
-            print(f"Error navigating: {ex}")
+            logging.exception("Error navigating")
+            metrics.count("errors", where="navigate")
             self.page.snack_bar = ft.SnackBar(ft.Text(f"Navigation Error: {ex}"))
             self.page.snack_bar.open = True
-            self.page.update()
+            self.ui_batcher.mark()
 
-    def refresh_current_view(self):
+    def current_view_key(self):
         idx = self.rail.selected_index
-        self.content_area.content = ft.Container() 
-        self.page.update()
-        
+        if idx == 2 and self.state.show_sleep_history:
+            return "sleep_history"
+        return VIEW_KEYS[idx]
+
+    def invalidate_views(self, *keys):
+        """Drops cached views so they are rebuilt the next time they are shown."""
+        for key in keys:
+            slot = self.view_cache.pop(key, None)
+            if slot is not None:
+                self.view_host.controls.remove(slot)
+
+    def show_view(self, key):
+        """Shows the cached view for `key`, building it on first use."""
+        slot = self.view_cache.get(key)
+        if slot is None:
+            with metrics.span("view_build", view=key):
+                content = self.view_builders[key]()
+            metrics.count_controls("controls_created", content, view=key)
+            slot = ft.Container(content=content, expand=True)
+            self.view_cache[key] = slot
+            self.view_host.controls.append(slot)
+        elif key in self.view_patchers:
+            with metrics.span("view_patch", view=key):
+                self.view_patchers[key]()
+
+        for cached_key, cached_slot in self.view_cache.items():
+            cached_slot.visible = cached_key == key
+        self.content_area.content = self.view_host
+
+    def refresh_current_view(self):
         try:
-            if idx == 0:
-                self.content_area.content = self.view_dashboard()
-            elif idx == 1:
-                self.content_area.content = self.view_movement()
-            elif idx == 2:
-                self.content_area.content = self.view_sleep()
-            elif idx == 3:
-                self.content_area.content = self.view_mindfulness()
+            self.show_view(self.current_view_key())
         except Exception as e:
-            print(f"Error loading view: {e}")
+            logging.exception("Error loading view")
+            metrics.count("errors", where="show_view")
             self.content_area.content = ft.Text(f"Error: {e}", color="red")
         
-        self.page.update()
+        self.ui_batcher.mark()
 
     # --- VIEWS ---
 
     def view_dashboard(self):
-        done_tasks = sum(1 for t in self.movement_tasks if t["done"])
-        total_tasks = len(self.movement_tasks)
-        progress = done_tasks / total_tasks if total_tasks > 0 else 0
-        
-        now = datetime.datetime.now()
-        date_str = now.strftime("%A, %d %B")
-
-        # Different greetings depending on time of day
-        hour = now.hour
-        if 5 <= hour < 12:
-            greeting = "Good Morning"
-        elif 12 <= hour < 17:
-            greeting = "Good Afternoon"
-        elif 17 <= hour < 21:
-            greeting = "Good Evening"
-        else:
-            greeting = "Good Night"
-
-        bed_str = self.bedtime.strftime("%H:%M") if self.bedtime else "..."
-        wake_str = self.wakeup.strftime("%H:%M") if self.wakeup else "..."
-        sleep_subtitle = None
-        if self.bedtime or self.wakeup:
-            sleep_subtitle = f"({bed_str} - {wake_str})"
-
-        priorities = [t for t in self.movement_tasks if not t["done"]][:3]
-        priority_list = ft.Column(spacing=5)
-        
-        if not priorities:
-             priority_list.controls.append(ft.Text("All caught up!", color=ACCENT_MOVEMENT, italic=True, size=12))
-        else:
-            for task in priorities:
-                priority_list.controls.append(
-                    ft.Container(
-                        content=ft.Row([
-                            ft.Icon("radio_button_unchecked", size=12, color=ACCENT_MOVEMENT),
-                            ft.Text(task["label"], size=13)
-                        ]),
-                        padding=8,
-                        bgcolor=C_WHITE10,
-                        border_radius=8
-                    )
-                )
+        # Controls whose values change between visits; filled in by patch_dashboard
+        self.dash_greeting = ft.Text(size=16, color=C_GREY_400)
+        self.dash_date = ft.Text(size=36, weight="bold", color=TEXT_COLOR)
+        self.dash_sleep_value = ft.Ref[ft.Text]()
+        self.dash_sleep_subtitle = ft.Ref[ft.Text]()
+        self.dash_focus_value = ft.Ref[ft.Text]()
+        self.dash_progress_bar = ft.ProgressBar(
+            value=0, color=ACCENT_MOVEMENT, bgcolor=CARD_COLOR, height=10, border_radius=5
+        )
+        self.dash_progress_text = ft.Text(size=12, color=C_GREY_400)
+        # Up Next keeps a fixed set of rows and rebinds their labels
+        self.dash_caught_up = ft.Text("All caught up!", color=ACCENT_MOVEMENT, italic=True, size=12)
+        self.dash_priority_labels = [ft.Text(size=13, expand=True) for _ in range(UP_NEXT_COUNT)]
+        self.dash_priority_due = [ft.Text(size=11, color=C_GREY_400) for _ in range(UP_NEXT_COUNT)]
+        self.dash_priority_rows = [
+            ft.Container(
+                content=ft.Row([
+                    ft.Icon("radio_button_unchecked", size=12, color=ACCENT_MOVEMENT),
+                    label,
+                    due
+                ]),
+                padding=8,
+                bgcolor=C_WHITE10,
+                border_radius=8
+            )
+            for label, due in zip(self.dash_priority_labels, self.dash_priority_due)
+        ]
+        self.dash_priority_list = ft.Column([self.dash_caught_up, *self.dash_priority_rows], spacing=5)
+        # Category breakdown rows are created the first time a category has habits
+        self.dash_category_rows = {}   # category id -> row
+        self.dash_category_list = ft.Column(spacing=10)
+        self.dash_key = None
 
         # Structure inside the glass box
         dashboard_content = ft.Column([
             ft.Row([
-                self.create_stat_card("Sleep", f"{int(self.sleep_hours)}h", "bedtime", ACCENT_SLEEP, subtitle=sleep_subtitle),
-                self.create_stat_card("Focus", f"{int(progress*100)}%", "check_circle", ACCENT_MOVEMENT),
+                self.create_stat_card("Sleep", "", "bedtime", ACCENT_SLEEP,
+                                      value_ref=self.dash_sleep_value, subtitle_ref=self.dash_sleep_subtitle),
+                self.create_stat_card("Focus", "", "check_circle", ACCENT_MOVEMENT, value_ref=self.dash_focus_value),
             ], alignment=ft.MainAxisAlignment.START, spacing=20),
             
             ft.Divider(height=20, color=C_TRANSPARENT),
@@ -399,10 +955,8 @@ class HabitApp:
                 [
                     ft.Column([
                         ft.Text("Daily Progress", size=20, weight="bold"),
-                        ft.ProgressBar(
-                            value=progress, color=ACCENT_MOVEMENT, bgcolor=CARD_COLOR, height=10, border_radius=5
-                        ),
-                        ft.Text(f"{done_tasks} of {total_tasks} habits completed", size=12, color=C_GREY_400),
+                        self.dash_progress_bar,
+                        self.dash_progress_text,
                         ft.Container(height=20),
                         ft.Container(
                             bgcolor=CARD_COLOR,
@@ -419,7 +973,12 @@ class HabitApp:
                     ft.Column([
                         ft.Text("Up Next", size=18, weight="bold"),
                         ft.Container(
-                            bgcolor=CARD_COLOR, padding=15, border_radius=15, content=priority_list, width=280
+                            bgcolor=CARD_COLOR, padding=15, border_radius=15, content=self.dash_priority_list, width=280
+                        ),
+                        ft.Container(height=10),
+                        ft.Text("By Category", size=18, weight="bold"),
+                        ft.Container(
+                            bgcolor=CARD_COLOR, padding=15, border_radius=15, content=self.dash_category_list, width=280
                         ),
                     ], expand=1)
                 ],
@@ -438,86 +997,147 @@ class HabitApp:
             expand=True
         )
 
+        self.patch_dashboard()
+
         return ft.Column(
             [
-                ft.Text(f"{greeting}!", size=16, color=C_GREY_400),
-                ft.Text(f"{date_str}", size=36, weight="bold", color=TEXT_COLOR),
+                self.dash_greeting,
+                self.dash_date,
                 ft.Divider(color=C_TRANSPARENT, height=10),
                 main_card
             ],
             expand=True
         )
 
+    def patch_dashboard(self):
+        """Refreshes the values shown on the cached dashboard controls.
+
+        The task counts, next undone habits and category breakdown come from the live
+        indexes (TaskStore, CategoryIndex), so this is O(1) in the number of habits.
+        Returns False when nothing shown changed.
+        """
+        store = self.state.task_store
+        now = datetime.datetime.now()
+        priorities = store.next_undone(UP_NEXT_COUNT)
+        categories = self.category_breakdown(now.date())
+        key = (
+            store.done_count, len(store), tuple((task.id, task.label, task.due) for task in priorities),
+            int(self.state.sleep_hours), self.state.bedtime, self.state.wakeup, now.date(), now.hour, categories,
+        )
+        if key == self.dash_key:
+            return False
+        self.dash_key = key
+
+        self.dash_greeting.value = greeting_for(now.hour)
+        self.dash_date.value = date_heading(now.date())
+
+        sleep_subtitle = None
+        if self.state.bedtime or self.state.wakeup:
+            bed_str = self.state.bedtime.strftime("%H:%M") if self.state.bedtime else "..."
+            wake_str = self.state.wakeup.strftime("%H:%M") if self.state.wakeup else "..."
+            sleep_subtitle = f"({bed_str} - {wake_str})"
+        self.dash_sleep_value.current.value = f"{int(self.state.sleep_hours)}h"
+        self.dash_sleep_subtitle.current.value = sleep_subtitle
+        self.dash_sleep_subtitle.current.visible = bool(sleep_subtitle)
+
+        progress = store.progress
+        self.dash_focus_value.current.value = f"{int(progress*100)}%"
+        self.dash_progress_bar.value = progress
+        self.dash_progress_text.value = f"{store.done_count} of {len(store)} habits completed"
+
+        self.dash_caught_up.visible = not priorities
+        for index, row in enumerate(self.dash_priority_rows):
+            row.visible = index < len(priorities)
+            if row.visible:
+                self.dash_priority_labels[index].value = priorities[index].label
+                self.dash_priority_due[index].value = format_due(priorities[index].due)
+
+        shown = []
+        for category_id, (done, total, this_week, last_week) in enumerate(categories):
+            if not total:
+                continue
+            row = self.dash_category_rows.get(category_id)
+            if row is None:
+                row = self.dash_category_rows[category_id] = self.create_category_row(self.categories[category_id])
+            counts, bar, trend = row.controls[0].controls[1], row.controls[1], row.controls[2]
+            counts.value = f"{done}/{total}"
+            bar.value = done / total
+            arrow = "▲" if this_week > last_week else "▼" if this_week < last_week else "="
+            trend.value = f"{this_week} done in {TREND_DAYS} days {arrow} (vs {last_week})"
+            shown.append(row)
+        if shown != self.dash_category_list.controls:
+            self.dash_category_list.controls = shown
+        return True
+
+    def create_category_row(self, name):
+        """Done today, a bar, and completions this period vs. the one before."""
+        return ft.Column([
+            ft.Row([
+                ft.Text(name, size=13, expand=True),
+                ft.Text(size=12, color=C_GREY_400),
+            ]),
+            ft.ProgressBar(value=0, color=ACCENT_MOVEMENT, bgcolor=C_WHITE10, height=6, border_radius=3),
+            ft.Text(size=11, color=C_GREY_400),
+        ], spacing=3)
+
+    def category_breakdown(self, today):
+        """(done today, habits, completions this period, completions the period before) per category."""
+        index = self.state.category_index
+        rows = []
+        for category_id in range(len(self.categories)):
+            last_week, this_week = index.trend(category_id, today, TREND_DAYS, 2)
+            rows.append((*index.counts(category_id), this_week, last_week))
+        return tuple(rows)
+
     def view_movement(self):
+        import transfer
+
         # Header Row
         header_row = ft.Row([
             ft.Row([
                 ft.Icon("directions_run", size=32, color="white"),
                 ft.Text("Habits & Movement", size=32, weight="bold"),
             ]),
-            # Elevated Button for text + icon and custom blending color
-            ft.ElevatedButton(
-                text="Add Exercise",
-                icon="add",
-                bgcolor="#4DFFFFFF", #somewhat transparent for glass box effect
-                color="white", # Text and Icon color
-                on_click=self.open_add_task_dialog,
-                style=ft.ButtonStyle(
-                    shape=ft.RoundedRectangleBorder(radius=12),
-                    padding=ft.padding.symmetric(horizontal=15, vertical=10)
+            ft.Row([
+                ft.PopupMenuButton(
+                    icon="import_export",
+                    icon_color="white",
+                    tooltip="Import / Export",
+                    items=[
+                        ft.PopupMenuItem(text="Import from file...", icon="file_upload", on_click=self.open_import),
+                        *(ft.PopupMenuItem(text=f"Export as {transfer.FORMAT_LABELS[fmt]}", icon="file_download",
+                                           data=ext, on_click=self.open_export)
+                          for ext, fmt in transfer.FORMATS.items()),
+                    ],
+                ),
+                # Elevated Button for text + icon and custom blending color
+                ft.ElevatedButton(
+                    text="Add Exercise",
+                    icon="add",
+                    bgcolor="#4DFFFFFF", #somewhat transparent for glass box effect
+                    color="white", # Text and Icon color
+                    on_click=self.open_add_task_dialog,
+                    style=ft.ButtonStyle(
+                        shape=ft.RoundedRectangleBorder(radius=12),
+                        padding=ft.padding.symmetric(horizontal=15, vertical=10)
+                    )
                 )
-            )
+            ]),
         ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
 
-        unfinished = [t for t in self.movement_tasks if not t['done']]
-        finished = [t for t in self.movement_tasks if t['done']]
-
-        # contrast so writing can be seen in the glass box
-        def create_task_container(task):
-            label = task["label"]
-            cat = task.get("category", "General")
-            return ft.Container(
-                # Use white to create a distinct layer on top of the main glass card
-                bgcolor=C_WHITE10, 
-                padding=10, 
-                border_radius=10,
-                border=ft.border.all(1, C_WHITE10),
-                content=ft.Row([
-                    ft.Row([
-                        ft.Checkbox(
-                            value=task["done"], 
-                            active_color=ACCENT_MOVEMENT, 
-                            check_color=BG_COLOR,
-                            on_change=lambda e, l=label: self.toggle_task(l, e.control.value)
-                        ),
-                        ft.Column([
-                            ft.Text(label, size=16, weight="w500"),
-                            ft.Text(cat, size=12, color=C_GREY_400)
-                        ], spacing=0)
-                    ]),
-                    ft.IconButton(icon="delete_outline", icon_color=C_RED_400, 
-                                on_click=lambda e, l=label: self.delete_task(l))
-                ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
-            )
-
-        # lists for To do and Done tasks
-        left_controls = [create_task_container(t) for t in unfinished]
-        right_controls = [create_task_container(t) for t in finished]
+        # Virtualized lists for To do and Done tasks; toggles, adds and deletes
+        # rebind the visible rows instead of rebuilding both lists
+        self.todo_list = VirtualTaskList("To Do", self.state.task_store, False, self.toggle_task, self.delete_task,
+                                         self.ui_batcher.mark)
+        self.done_list = VirtualTaskList("Done", self.state.task_store, True, self.toggle_task, self.delete_task,
+                                         self.ui_batcher.mark)
 
         split_layout = ft.Row(
             controls=[
                 # Left Side: To Do
-                ft.Column(
-                    controls=[ft.Text("To Do", weight="bold", color="white")] + left_controls, 
-                    expand=True, 
-                    spacing=10
-                ),
+                self.todo_list.control,
                 # Right Side: Done
-                ft.Column(
-                    controls=[ft.Text("Done", weight="bold", color="white")] + right_controls, 
-                    expand=True, 
-                    spacing=10
-                )
+                self.done_list.control,
             ],
             vertical_alignment=ft.CrossAxisAlignment.START,
             spacing=20,
@@ -547,217 +1167,92 @@ class HabitApp:
         )
 
     def view_sleep_history(self):
-        # Example Data for History
-        days_of_week = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-        week_data = [6.5, 7.0, 5.5, 8.0, 7.5, 9.0, 6.0] 
-        
-        view_2days = ft.Column([
-            ft.Text("Yesterday", weight="bold", size=16),
-            ft.Container(
-                bgcolor=C_WHITE10, padding=15, border_radius=10,
-                content=ft.Row([
-                    ft.Column([
-                        ft.Text("7.5h Sleep", color="white", weight="bold"),
-                        ft.Text("Quality: 4/5 (Good)", color=C_GREY_400, size=12),
-                    ]),
-                    ft.Column([
-                        ft.Text("23:00 - 06:30", color=C_GREY_400, size=12),
-                        ft.Text("Nap: 20m", color=ACCENT_NAP, size=12),
-                    ], horizontal_alignment=ft.CrossAxisAlignment.END)
-                ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
-            ),
-            ft.Container(height=10),
-            ft.Text("2 Days Ago", weight="bold", size=16),
-            ft.Container(
-                bgcolor=C_WHITE10, padding=15, border_radius=10,
-                content=ft.Row([
-                    ft.Column([
-                        ft.Text("6.0h Sleep", color="white", weight="bold"),
-                        ft.Text("Quality: 2/5 (Poor)", color=C_GREY_400, size=12),
-                    ]),
-                    ft.Column([
-                        ft.Text("01:00 - 07:00", color=C_GREY_400, size=12),
-                        ft.Text("No Nap", color=C_GREY_700, size=12),
-                    ], horizontal_alignment=ft.CrossAxisAlignment.END)
-                ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
-            ),
-        ])
+        from history_view import SleepHistoryView
+        self.sleep_history_view = SleepHistoryView(self.state.sleep_history, self.toggle_sleep_history, self.ui_batcher.mark)
+        return self.sleep_history_view.build()
 
-        chart_bars = []
-        for day, hours in zip(days_of_week, week_data):
-            bar_height = (hours / 10) * 100
-            bar_color = ACCENT_SLEEP if hours >= 7 else C_WARNING if hours < 6 else "#90CAF9"
-            
-            chart_bars.append(
-                ft.Column([
-                    ft.Container(height=100-bar_height), 
-                    ft.Container(
-                        width=20, 
-                        height=bar_height, 
-                        bgcolor=bar_color, 
-                        border_radius=ft.border_radius.only(top_left=5, top_right=5),
-                        tooltip=f"{hours} hours"
-                    ),
-                    ft.Text(day, size=10, color=C_GREY_400)
-                ], alignment=ft.MainAxisAlignment.END, spacing=5)
-            )
-        
-        view_week = ft.Container(
-            padding=20, bgcolor=C_WHITE10, border_radius=15,
-            content=ft.Column([
-                ft.Text("Last 7 Days (Hours)", weight="bold"),
-                ft.Container(height=10),
-                ft.Row(chart_bars, alignment=ft.MainAxisAlignment.SPACE_EVENLY, height=150)
-            ])
-        )
-
-        view_month = ft.Row([
-            ft.Container(
-                bgcolor=C_WHITE10, padding=20, border_radius=15, expand=1,
-                content=ft.Column([
-                    ft.Icon("bedtime", color=ACCENT_SLEEP, size=30),
-                    ft.Text("Avg Sleep", size=12, color=C_GREY_400),
-                    ft.Text("7.2h", size=24, weight="bold")
-                ], horizontal_alignment=ft.CrossAxisAlignment.CENTER)
-            ),
-            ft.Container(width=10),
-            ft.Container(
-                bgcolor=C_WHITE10, padding=20, border_radius=15, expand=1,
-                content=ft.Column([
-                    ft.Icon("star", color="#B39DDB", size=30),
-                    ft.Text("Avg Quality", size=12, color=C_GREY_400),
-                    ft.Text("3.8/5", size=24, weight="bold")
-                ], horizontal_alignment=ft.CrossAxisAlignment.CENTER)
-            )
-        ])
-
-        return ft.Column([
-            ft.Container(height=5),
-            ft.Row([
-                ft.Icon("history", size=30, color="#B39DDB"),
-                ft.Text("Sleep History", size=28, weight="bold", color="white"),
-                ft.IconButton(
-                    icon="close", 
-                    icon_color=C_RED_400, 
-                    tooltip="Back to Tracker",
-                    on_click=self.toggle_sleep_history
-                )
-            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
-            ft.Divider(color=C_TRANSPARENT, height=10),
-            
-            ft.Tabs( # different History Views
-                selected_index=0,
-                animation_duration=300,
-                indicator_color=ACCENT_SLEEP,
-                label_color=TEXT_COLOR,
-                unselected_label_color=C_GREY_400,
-                divider_color=C_TRANSPARENT,
-                tabs=[
-                    ft.Tab(
-                        text="Past 2 Days",
-                        content=ft.Container(content=view_2days, padding=ft.padding.only(top=20))
-                    ),
-                    ft.Tab(
-                        text="Week",
-                        content=ft.Container(content=view_week, padding=ft.padding.only(top=20))
-                    ),
-                    ft.Tab(
-                        text="Month",
-                        content=ft.Container(content=view_month, padding=ft.padding.only(top=20))
-                    ),
-                ],
-                expand=1,
-            )
-        ])
+    def patch_sleep_history(self):
+        self.sleep_history_view.refresh()
 
     def view_sleep(self):
-        if self.show_sleep_history:
-            return self.view_sleep_history()
-
-        hours_label = ft.Text(f"{self.sleep_hours} Hours", size=24, weight="bold")
+        hours_label = ft.Text(f"{self.state.sleep_hours} Hours", size=24, weight="bold")
+        @metrics.timed()
         def on_hours_change(e):
-            self.sleep_hours = e.control.value
-            hours_label.value = f"{int(self.sleep_hours)} Hours" if self.sleep_hours % 1 == 0 else f"{self.sleep_hours:.1f} Hours"
-            hours_label.update()
-
-        quality_map = { # For user to choose sleep quality.
-            1: "Horrible (Insomnia)",
-            2: "Poor",
-            3: "Average",
-            4: "Good",
-            5: "Well Rested"
-        }
-        quality_text = ft.Text(quality_map[int(self.sleep_quality)], size=16, color="#B39DDB", weight="bold") 
+            self.state.sleep_hours = e.control.value
+            hours_label.value = f"{int(self.state.sleep_hours)} Hours" if self.state.sleep_hours % 1 == 0 else f"{self.state.sleep_hours:.1f} Hours"
+            self.ui_batcher.mark(hours_label)
 
+        quality_text = ft.Text(QUALITY_LABELS[int(self.state.sleep_quality)], size=16, color="#B39DDB", weight="bold") 
+
+        @metrics.timed()
         def on_quality_change(e):
-            self.sleep_quality = int(e.control.value)
-            quality_text.value = quality_map[self.sleep_quality]
-            quality_text.update()
+            self.state.sleep_quality = int(e.control.value)
+            quality_text.value = QUALITY_LABELS[self.state.sleep_quality]
+            self.ui_batcher.mark(quality_text)
 
-        nap_minutes = int(self.nap_hours * 60)
-        nap_label = ft.Text(f"{nap_minutes} min" if nap_minutes > 0 else "No Nap", size=16, weight="bold")
-        
-        initial_nap_msg = ""
-        initial_nap_col = C_GREY_400
-        if nap_minutes > 30:
-            initial_nap_msg = "⚠️ Short naps are better. Long naps (>30m) cause inertia."
-            initial_nap_col = C_WARNING
-        elif nap_minutes >= 15:
-            initial_nap_msg = "Power naps (15-30m) boost energy."
-            initial_nap_col = ACCENT_NAP
-        elif nap_minutes > 0:
-             initial_nap_msg = "Too short for benefit. Aim for 15-30m."
-             initial_nap_col = C_GREY_400
-
-        nap_feedback = ft.Text(initial_nap_msg, size=12, color=initial_nap_col)
+        nap_label = ft.Text(size=16, weight="bold")
+        nap_feedback = ft.Text(size=12)
 
-        def on_nap_change(e):
-            self.nap_hours = e.control.value
-            mins = int(self.nap_hours * 60)
+        def show_nap(nap_hours):
+            mins = int(nap_hours * 60)
             nap_label.value = f"{mins} min" if mins > 0 else "No Nap"
-            
-            # Warnings for nap duration (Too short, Too Long, and optimal)
-            if mins > 30:
-                nap_feedback.value = "⚠️ Short naps are better. Long naps (>30m) cause inertia."
-                nap_feedback.color = C_WARNING
-            elif mins >= 15:
-                nap_feedback.value = "Power naps (15-30m) boost energy."
-                nap_feedback.color = ACCENT_NAP
-            elif mins > 0:
-                nap_feedback.value = "Too short for benefit. Aim for 15-30m."
-                nap_feedback.color = C_GREY_400
-            else:
-                nap_feedback.value = ""
-            
-            nap_label.update()
-            nap_feedback.update()
+            # Advice for nap duration (too short, too long, optimal) comes from the rule table
+            advice = sleep_rules.nap_advice(nap_hours)
+            nap_feedback.value = advice.message
+            nap_feedback.color = advice.color
 
-        bed_str = self.bedtime.strftime("%H:%M") if self.bedtime else "--:--"
-        wake_str = self.wakeup.strftime("%H:%M") if self.wakeup else "--:--"
-        
-        schedule_feedback = ft.Container()
+        show_nap(self.state.nap_hours)
+
+        @metrics.timed()
+        def on_nap_change(e):
+            self.state.nap_hours = e.control.value
+            show_nap(self.state.nap_hours)
+            self.ui_batcher.mark(nap_label, nap_feedback)
+
+        # Drags only refresh labels (throttled); releasing the thumb commits to storage
+        hours_slider = ft.Slider(
+            min=0, max=sleep_rules.MAX_SLEEP_HOURS, divisions=sleep_rules.MAX_SLEEP_HOURS * 2,
+            value=self.state.sleep_hours, 
+            active_color="#90CAF9", 
+            thumb_color="white",
+        )
+        quality_slider = ft.Slider(
+            min=1, max=5, divisions=4, 
+            value=self.state.sleep_quality,
+            active_color="#B39DDB", 
+            thumb_color="white",
+        )
+        nap_slider = ft.Slider(
+            min=0, max=sleep_rules.MAX_NAP_MINUTES / 60, divisions=sleep_rules.MAX_NAP_MINUTES // 5,
+            value=self.state.nap_hours, 
+            active_color=ACCENT_NAP, 
+            thumb_color="white",
+        )
+        commit = lambda e: self.save_sleep_log()
+        coalesce_slider(hours_slider, on_hours_change, commit)
+        coalesce_slider(quality_slider, on_quality_change, commit)
+        coalesce_slider(nap_slider, on_nap_change, commit)
+
+        bed_str = self.state.bedtime.strftime("%H:%M") if self.state.bedtime else "--:--"
+        wake_str = self.state.wakeup.strftime("%H:%M") if self.state.wakeup else "--:--"
         
-        if self.bedtime and self.wakeup:
-            is_late_sleep = 2 <= self.bedtime.hour < 6
-            is_late_wake = self.wakeup.hour >= 13
-            
-            #Warning for risky sleep schedule --> effects on mood
-            if is_late_sleep and is_late_wake:
-                schedule_feedback = ft.Container(
-                    bgcolor=C_WARNING,
-                    padding=10,
-                    border_radius=10,
-                    content=ft.Row([
-                        ft.Icon("warning_amber", color="white", size=20),
-                        ft.Column([
-                            ft.Text("Risky Sleep Schedule", weight="bold", color="black", size=13),
-                            ft.Text("Sleeping late (>2:00) and waking late (>13:00) increases risk of depressive moods.", color="black", size=11, width=450),
-                            ft.Text("Go to sleep earlier and wake up earlier for mood boosts.", color="black", size=11, width=350)
-                        ], spacing=1)
-                    ])
-                )
-            else:
-                schedule_feedback = ft.Container(height=0)
+        # Warning for risky sleep schedule --> effects on mood
+        risk = sleep_rules.schedule_risk(self.state.bedtime, self.state.wakeup)
+        schedule_feedback = ft.Container(height=0)
+        if risk:
+            schedule_feedback = ft.Container(
+                bgcolor=risk.color,
+                padding=10,
+                border_radius=10,
+                content=ft.Row([
+                    ft.Icon("warning_amber", color="white", size=20),
+                    ft.Column([
+                        ft.Text(risk.title, weight="bold", color="black", size=13),
+                        ft.Text(risk.message, color="black", size=11, width=450),
+                        ft.Text(risk.hint, color="black", size=11, width=350)
+                    ], spacing=1)
+                ])
+            )
 
         return ft.Column(
             [
@@ -792,13 +1287,7 @@ class HabitApp:
                                     ft.Text("Sleep Duration", size=16, weight="w500")
                                 ]),
                                 ft.Container(height=5),
-                                ft.Slider(
-                                    min=0, max=12, divisions=24, 
-                                    value=self.sleep_hours, 
-                                    active_color="#90CAF9", 
-                                    thumb_color="white",
-                                    on_change=on_hours_change
-                                ),
+                                hours_slider,
                                 ft.Row([hours_label], alignment=ft.MainAxisAlignment.CENTER),
                             ], expand=True), 
 
@@ -857,24 +1346,12 @@ class HabitApp:
                                 icon="info_outline", 
                                 icon_color=C_GREY_400,
                                 icon_size=18,
-                                tooltip=(
-                                    "1: Horrible - Barely slept at all.\n"
-                                    "2: Poor - Restless, woke up frequently.\n"
-                                    "3: Average - Okay sleep, usual routine.\n"
-                                    "4: Good - Restful, mostly uninterrupted.\n"
-                                    "5: Well Rested - Didn't wake up once, feeling extremely energized."
-                                )
+                                tooltip=QUALITY_TOOLTIP
                             )
                         ], vertical_alignment=ft.CrossAxisAlignment.CENTER),
                         
                         ft.Column([
-                            ft.Slider(
-                                min=1, max=5, divisions=4, 
-                                value=self.sleep_quality,
-                                active_color="#B39DDB", 
-                                thumb_color="white",
-                                on_change=on_quality_change
-                            ),
+                            quality_slider,
                             ft.Row([
                                 ft.Text("1", size=10, color=C_GREY_400),
                                 ft.Row([
@@ -892,13 +1369,7 @@ class HabitApp:
                             ft.Text("Daytime Nap", size=16, weight="w500")
                         ]),
                         ft.Container(height=5),
-                        ft.Slider(
-                            min=0, max=3, divisions=36, 
-                            value=self.nap_hours, 
-                            active_color=ACCENT_NAP, 
-                            thumb_color="white",
-                            on_change=on_nap_change
-                        ),
+                        nap_slider,
                         ft.Column([
                             ft.Row([
                                 nap_label,
@@ -928,223 +1399,14 @@ class HabitApp:
         )
 
     def view_mindfulness(self):
-        # Calm Color Palette
-        OCEAN_DEEP = "#0F2027"
-        OCEAN_LIGHT = "#3985A5"
+        from mindfulness import MindfulnessView
+        self.mindfulness = MindfulnessView(self.page, self.ui_batcher)
+        return self.mindfulness.build()
 
-        return ft.Container(
-            expand=True,
-            padding=30,
-            # This adds the calming "Ocean" background
-            gradient=ft.LinearGradient(
-                begin=ft.alignment.top_center,
-                end=ft.alignment.bottom_center,
-                colors=[OCEAN_DEEP, OCEAN_LIGHT],
-            ),
-            content=ft.Column([
-                ft.Text("Mindfulness Sanctuary", size=32, weight="bold", color="white"),
-                ft.Tabs(
-                    selected_index=0,
-                    tabs=[
-                        ft.Tab(text="Meditation", content=self.ui_meditation_tab()),
-                        ft.Tab(text="Breathing Exercise", content=self.ui_breathing_tab()),
-                        ft.Tab(text="Emergency Help", content=self.ui_help_tab()),
-                    ],
-                    expand=1
-                )
-            ], scroll=ft.ScrollMode.AUTO)
-        )
-
-    def ui_meditation_tab(self):
-        return ft.Container(
-            padding=20,
-            content=ft.Column([
-                ft.Text("Guided Meditation", size=20, weight="bold"),
-                ft.Container(
-                    bgcolor=CARD_COLOR, padding=30, border_radius=15,
-                    content=ft.Column([
-                        ft.Icon("spa", size=50, color=ACCENT_MOVEMENT),
-                        self.meditation_timer_text,
-                        ft.Row([
-                            # FIXED: Added 'lambda' to pass the minutes to the timer
-                            ft.ElevatedButton("5 Min", on_click=lambda e: self.start_meditation_timer(e, 300)),
-                            ft.ElevatedButton("10 Min", on_click=lambda e: self.start_meditation_timer(e, 600)),
-                        ], alignment=ft.MainAxisAlignment.CENTER)
-                    ], horizontal_alignment=ft.CrossAxisAlignment.CENTER)
-                ),
-            ])
-        )
-    
-    def animate_breathing(self, e):
-        def run():
-            try:
-                # --- PHASE 1: INHALE (4s) ---
-                self.breathing_circle.scale = 1.0 
-                self.page.update()
-                
-                self.breath_status.color = "#00E676" # Hardcoded Green
-                self.breathing_circle.bgcolor = "#00E676"
-                self.breathing_circle.scale = 2.5  
-                self.breathing_circle.opacity = 0.8
-                self.breathing_circle.animate_scale = ft.Animation(4000, "decelerate")
-                
-                for i in range(4, 0, -1):
-                    self.breath_status.value = f"INHALE... {i}"
-                    self.page.update()
-                    time.sleep(1)
-
-                # --- PHASE 2: HOLD (7s) ---
-                self.breath_status.color = "#FF5252" # Hardcoded Red
-                self.breathing_circle.bgcolor = "#FF5252"
-                self.page.update()
-                
-                for i in range(7, 0, -1):
-                    self.breath_status.value = f"HOLD... {i}"
-                    self.page.update()
-                    time.sleep(1)
-
-                # --- PHASE 3: RELEASE (8s) ---
-                # This transition is now forced with hardcoded Blue
-                self.breath_status.color = "#448AFF" 
-                self.breathing_circle.bgcolor = "#448AFF"
-                self.breathing_circle.scale = 1.0  
-                self.breathing_circle.opacity = 0.2
-                self.breathing_circle.animate_scale = ft.Animation(8000, "accelerate")
-                
-                # We update the page BEFORE the loop to ensure the color changes immediately
-                self.page.update() 
-
-                for i in range(8, 0, -1):
-                    self.breath_status.value = f"RELEASE... {i}"
-                    self.page.update()
-                    time.sleep(1)
-
-                # --- RESET ---
-                self.breath_status.value = "Ready to breathe?"
-                self.breath_status.color = "white"
-                self.breathing_circle.bgcolor = "#00E676"
-                self.page.update()
-                
-            except Exception as ex:
-                # This will tell you EXACTLY why it got stuck in the terminal
-                logging.error(f"ANIMATION CRASHED: {ex}")
-
-        threading.Thread(target=run, daemon=True).start()
-        
-
-
-    def ui_breathing_tab(self):
-        self.breathing_circle = ft.Container(
-            width=100, height=100,
-            bgcolor=ACCENT_MOVEMENT,
-            border_radius=50,
-            opacity=0.2,
-            scale=1.0,
-            # Critical for smooth movement and color shifting
-            animate_scale=ft.Animation(1000, ft.AnimationCurve.EASE_IN_OUT),
-            animate=ft.Animation(1000, ft.AnimationCurve.EASE_IN_OUT),
-            shadow=ft.BoxShadow(
-                blur_radius=50,
-                spread_radius=-10,
-                color=ft.Colors.with_opacity(0.3, ACCENT_MOVEMENT), # Fixed Capital 'C'
-            ),
-        )
-
-        return ft.Container(
-            padding=40,
-            content=ft.Column([
-                ft.Text("4-7-8 Rhythm", size=28, weight="bold"),
-                ft.Container(height=40),
-                ft.Container(
-                    height=300, width=400,
-                    alignment=ft.alignment.center,
-                    content=ft.Stack([
-                        # Outer Guide Ring
-                        ft.Container(
-                            width=260, height=260,
-                            border=ft.border.all(1, C_WHITE10),
-                            border_radius=130,
-                        ),
-                        self.breathing_circle
-                    ], alignment=ft.alignment.center)
-                ),
-                self.breath_status,
-                ft.Container(height=40),
-                ft.ElevatedButton(
-                    "BEGIN SESSION", 
-                    on_click=self.animate_breathing,
-                    bgcolor=C_WHITE10,
-                    color="white",
-                    style=ft.ButtonStyle(shape=ft.RoundedRectangleBorder(radius=20))
-                )
-            ], horizontal_alignment=ft.CrossAxisAlignment.CENTER)
-        )
-
-    def ui_help_tab(self):
-        return ft.Container(
-            padding=20,
-            content=ft.Column([
-                ft.Text("You are not alone.", size=24, weight="bold", color=C_RED_400),
-                ft.Container(height=10),
-                # FIXED: Using string "phone" to prevent flet icon errors
-                self.create_help_hotline("Line", "804", "Available 24/7", "phone"),
-                self.create_help_hotline("Live Chat Support", "+490741741", "Free support", "sms"),
-                self.create_help_hotline("Email", "info@zenith.de", "Free support", "sms"),
-            ])
-        )
-    
-    
-
-    def start_meditation_timer(self, e, duration_seconds):
-        # 1. Stop any existing timer by changing a unique ID
-        self.timer_running = False 
-        time.sleep(0.1) # Give the old thread a tiny moment to stop
-        
-        # 2. Start new timer session
-        self.timer_running = True
-        current_timer_id = random.random() # Create a unique ID for this click
-        self.active_timer_id = current_timer_id
-        
-        e.control.disabled = True
-        self.page.update()
-
-        def run_timer():
-            seconds = duration_seconds
-            # The timer only runs if its ID is the "Active" one
-            while seconds > 0 and self.active_timer_id == current_timer_id:
-                mins, secs = divmod(seconds, 60)
-                self.meditation_timer_text.value = f"{mins:02d}:{secs:02d}"
-                self.page.update()
-                time.sleep(1)
-                seconds -= 1
-            
-            # Only show "Done" if the timer actually finished
-            if self.active_timer_id == current_timer_id:
-                self.meditation_timer_text.value = "Done!"
-                e.control.disabled = False
-                self.page.update()
-
-        threading.Thread(target=run_timer, daemon=True).start()
-
-    
-
-    def create_help_hotline(self, name, contact, desc, icon):
-        # We use the string "phone" instead of ft.icons.PHONE to avoid crashes
-        return ft.Container(
-            bgcolor=CARD_COLOR, padding=15, border_radius=10, margin=ft.margin.only(bottom=10),
-            content=ft.Row([
-                ft.Icon(icon, color=C_RED_400), 
-                ft.Column([
-                    ft.Text(name, weight="bold", size=16),
-                    ft.Text(contact, color=ACCENT_MOVEMENT, size=14, weight="bold"),
-                    ft.Text(desc, size=12, color=C_GREY_400),
-                ], spacing=2)
-            ])
-        )
-      
     # --- HELPERS ---
 
-    def create_stat_card(self, title, value, icon, color, subtitle=None):
+    def create_stat_card(self, title, value, icon, color, subtitle=None, value_ref=None, subtitle_ref=None):
+        # Refs let a cached card have its value/subtitle patched in place
         bottom_content = ft.Column(
             spacing=0,
             controls=[
@@ -1153,16 +1415,19 @@ class HabitApp:
                     size=36,
                     weight="bold",
                     color=TEXT_COLOR, 
+                    ref=value_ref,
                 )
             ]
         )
 
-        if subtitle:
+        if subtitle or subtitle_ref:
             bottom_content.controls.append(
                 ft.Text(
                     subtitle,
                     size=12,
                     color=C_GREY_400,
+                    visible=bool(subtitle),
+                    ref=subtitle_ref,
                 )
             )
 
@@ -1189,13 +1454,31 @@ class HabitApp:
 
     
     
-def main(page: ft.Page):
+async def main(page: ft.Page):
     print("Zenith Habit Tracker starting...")
+    started = time.perf_counter()
+    memory_before = tracemalloc.get_traced_memory()[0] if TRACE_SESSION_MEMORY else 0
     try:
         app = HabitApp(page)
+        await app.start()
     except Exception as e:
         print(f"CRITICAL ERROR: {e}")
         page.add(ft.Text(f"Error loading app: {e}", size=30, color="red"))
+        return
+
+    message = f"Session {page.session_id} ready in {(time.perf_counter() - started) * 1000:.1f} ms"
+    if TRACE_SESSION_MEMORY:
+        # Approximate: other sessions starting concurrently are counted too
+        message += f", ~{(tracemalloc.get_traced_memory()[0] - memory_before) / 1024:.0f} KiB"
+    logging.info(message)
 
 if __name__ == "__main__":
-    ft.app(target=main)
\ No newline at end of file
+    # Configured here rather than at import, so importing the module has no side effects
+    logging.basicConfig(level=logging.INFO)
+    if TRACE_SESSION_MEMORY:
+        tracemalloc.start()
+    metrics.start()
+    if SERVER_MODE:
+        ft.app(target=main, view=None, port=SERVER_PORT)
+    else:
+        ft.app(target=main)
\ No newline at end of file
@@ -0,0 +1,740 @@
+"""Headless benchmarks for HabitApp view construction and event handling.
+
+The app runs against a real ft.Page whose connection is faked, so every
+page.update() goes through Flet's own diffing and the size of each command
+batch that would be sent to the client is recorded.
+
+Usage:
+    python benchmark.py [--sizes 10 1000 10000] [--repeat 30] [--json]
+    python benchmark.py --memory [--records 100000]
+    python benchmark.py --analytics [--years 3]
+    python benchmark.py --rules [--years 3]
+    python benchmark.py --up-next [--records 100000]
+    python benchmark.py --transfer [--records 100000]
+    python benchmark.py --streaks [--records 100000] [--years 3]
+    python benchmark.py --stress [--records 1000]
+"""
+import argparse
+import asyncio
+import datetime
+import gc
+import importlib.util
+import itertools
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import flet as ft
+from flet.core.connection import Connection
+from flet.core.protocol import CommandEncoder, PageCommandResponsePayload, PageCommandsBatchResponsePayload
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import sleep_analytics  # noqa: E402
+import sleep_rules  # noqa: E402
+import transfer  # noqa: E402
+from completions import EPOCH, CategoryIndex, CompletionLog  # noqa: E402
+from models import CATEGORIES, SleepEntry, Task, category_id  # noqa: E402
+from sleep_history import SleepHistory, _as_time  # noqa: E402
+from storage import SCHEMA, SQL_SELECT_SLEEP_ALL, SQL_SELECT_TASKS  # noqa: E402
+from task_store import TaskStore  # noqa: E402
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "New updates 13.01.py")
+VIEW_KEYS = ("dashboard", "movement", "sleep", "sleep_history", "mindfulness")
+
+
+class RecordingConnection(Connection):
+    """Stands in for the Flet server: assigns control ids and records every batch sent."""
+
+    def __init__(self):
+        super().__init__()
+        self._ids = itertools.count(1)
+        self.batches = []   # payload size in bytes of each page.update()
+
+    def send_commands(self, session_id, commands):
+        self.batches.append(len(json.dumps(commands, cls=CommandEncoder)))
+        results = [
+            " ".join(f"_{next(self._ids)}" for _ in command.commands)
+            for command in commands if command.name == "add"
+        ]
+        return PageCommandsBatchResponsePayload(results=results, error="")
+
+    def send_command(self, session_id, command):
+        return PageCommandResponsePayload(result="", error="")
+
+
+class FakeEvent:
+    def __init__(self, control, data=None):
+        self.control = control
+        self.data = data
+
+
+class Session:
+    """One headless HabitApp with its own page, event loop and database."""
+
+    def __init__(self, module, db_path):
+        os.environ["ZENITH_DB"] = db_path
+        module.DB_PATH = db_path
+        self.module = module
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        self.conn = RecordingConnection()
+        self.page = ft.Page(self.conn, "benchmark", self.loop)
+        started = time.perf_counter()
+        self.app = self.run(self._start())
+        # Time until the dashboard has been sent, and the updates it took
+        self.startup_seconds = time.perf_counter() - started
+        self.startup_batches = list(self.conn.batches)
+
+    async def _start(self):
+        app = self.module.HabitApp(self.page)
+        await app.start()
+        return app
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def call(self, fn, *args):
+        """Runs a sync callable on the session loop (handlers expect to be there)."""
+        async def wrapper():
+            return fn(*args)
+        return self.run(wrapper())
+
+    def close(self):
+        self.run(self.app.handle_close(None))
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def load_app_module():
+    spec = importlib.util.spec_from_file_location("zenith_app", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.path.insert(0, os.path.dirname(APP_PATH))
+    spec.loader.exec_module(module)
+    return module
+
+
+def count_controls(control):
+    return 1 + sum(count_controls(child) for child in control._get_children())
+
+
+def find_controls(control, kind, found=None):
+    found = [] if found is None else found
+    if isinstance(control, kind):
+        found.append(control)
+    for child in control._get_children():
+        find_controls(child, kind, found)
+    return found
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(name, samples, batches, repeat, controls=None):
+    return {
+        "op": name,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "updates_per_op": len(batches) / repeat,
+        "bytes_per_op": sum(batches) / repeat,
+        "controls": controls,
+    }
+
+
+def measure(session, name, op, repeat, settle=0.0):
+    """Times `op` (a coroutine factory) `repeat` times and collects the updates it sent.
+
+    Without `settle` the app's pending frame is flushed after each op (and timed
+    with it); with `settle` frames are left to the batcher's own clock.
+    """
+    session.call(session.app.ui_batcher.flush)   # don't count what setup left pending
+    session.conn.batches.clear()
+    samples = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        session.run(op(i))
+        if not settle:
+            session.call(session.app.ui_batcher.flush)
+        samples.append(time.perf_counter() - started)
+    if settle:
+        # Let throttled/batched updates land before counting them
+        time.sleep(settle)
+    return summarize(name, samples, list(session.conn.batches), repeat)
+
+
+def populate(session, habits):
+    """Adds habits up to `habits` and saves them, so later sessions start with them."""
+    app = session.app
+    store = app.state.task_store
+    categories = app.categories
+
+    async def fill():
+        for i in range(habits - len(store)):
+            app.storage.save_task(store.add(f"Habit {i}", categories[i % len(categories)]))
+        await app.storage.flush()
+        app.invalidate_views("movement")
+    session.run(fill())
+
+
+def bench_startup(module, db_path, repeat):
+    """Starts fresh sessions against an existing database, as a returning user would."""
+    samples = []
+    batches = []
+    for _ in range(repeat):
+        session = Session(module, db_path)
+        samples.append(session.startup_seconds)
+        batches.extend(session.startup_batches)
+        session.close()
+    return summarize("startup", samples, batches, repeat)
+
+
+def bench_views(session, repeat):
+    """Builds each view from scratch, as the app did on every navigation before caching."""
+    results = []
+    app = session.app
+    for key in VIEW_KEYS:
+        builder = app.view_builders[key]
+        samples = []
+        root = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            root = session.call(builder)
+            samples.append(time.perf_counter() - started)
+        results.append(summarize(f"build {key}", samples, [], repeat, count_controls(root)))
+    return results
+
+
+def bench_handlers(session, repeat):
+    app = session.app
+    results = []
+
+    async def navigate(i):
+        app.rail.selected_index = i % 4
+        await app.navigate(FakeEvent(app.rail))
+    results.append(measure(session, "navigate", navigate, repeat))
+
+    # A dashboard refresh after one habit changed: only the counts, bar and Up Next move
+    app.rail.selected_index = 0
+    session.run(app.navigate(FakeEvent(app.rail)))
+    first = next(iter(app.state.task_store))
+
+    async def dashboard(i):
+        app.state.task_store.set_done(first.id, not first.done)
+        app.refresh_current_view()
+    results.append(measure(session, "dashboard refresh", dashboard, repeat))
+
+    # Movement handlers need the movement view mounted
+    app.rail.selected_index = 1
+    session.run(app.navigate(FakeEvent(app.rail)))
+    store = app.state.task_store
+
+    async def toggle(i):
+        task = next(iter(store))
+        await app.toggle_task(task.id, not task.done)
+    results.append(measure(session, "toggle_task", toggle, repeat))
+
+    session.run(app.open_add_task_dialog(None))
+
+    async def add(i):
+        app.new_task_input.value = f"Benchmark {i}"
+        await app.add_task(None)
+    results.append(measure(session, "add_task", add, repeat))
+
+    added = [task.id for task in store if task.label.startswith("Benchmark ")]
+
+    async def delete(i):
+        await app.delete_task(added[i])
+    results.append(measure(session, "delete_task", delete, min(repeat, len(added))))
+
+    # Several handlers landing in one frame go out as a single update
+    async def burst(i):
+        for task in list(store)[:5]:
+            await app.toggle_task(task.id, not task.done)
+    results.append(measure(session, "toggle burst (5)", burst, repeat))
+
+    app.rail.selected_index = 2
+    session.run(app.navigate(FakeEvent(app.rail)))
+    sliders = find_controls(app.view_cache["sleep"], ft.Slider)
+    for name, slider in zip(("hours slider", "quality slider", "nap slider"), sliders):
+        async def drag(i, slider=slider):
+            slider.value = slider.min + (i % 4) * (slider.max - slider.min) / 4
+            await slider.on_change(FakeEvent(slider))
+        results.append(measure(session, f"{name} drag", drag, repeat, settle=0.3))
+
+    return results
+
+
+def run_benchmarks(sizes, repeat):
+    module = load_app_module()
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for habits in sizes:
+            db_path = os.path.join(tmp, f"bench-{habits}.db")
+            session = Session(module, db_path)
+            try:
+                populate(session, habits)
+                # Handlers first: building views directly rebinds the app's dash_* controls
+                report[habits] = bench_handlers(session, repeat) + bench_views(session, repeat)
+            finally:
+                session.close()
+            report[habits].insert(0, bench_startup(module, db_path, min(repeat, 10)))
+    return report
+
+
+# --- Memory ---
+
+def traced_size(build):
+    """Bytes still allocated by `build()` once it returns (what the result keeps alive)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def memory_database(records):
+    """An in-memory database with `records` tasks and nights, so rows come back as storage loads them."""
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO tasks (id, label, category, done) VALUES (?, ?, ?, ?)",
+        ((i, f"Habit {i}", CATEGORIES[i % len(CATEGORIES)], i % 3 == 0) for i in range(1, records + 1))
+    )
+    first = datetime.date.today() - datetime.timedelta(days=records)
+    conn.executemany(
+        "INSERT INTO sleep_log (date, hours, quality, nap_hours, bedtime, wakeup) VALUES (?, ?, ?, ?, ?, ?)",
+        (((first + datetime.timedelta(days=i)).isoformat(), 7.5, 1 + i % 5, 0.5, "23:15", "06:45") for i in range(records))
+    )
+    return conn
+
+
+def bench_memory(records):
+    conn = memory_database(records)
+    load_tasks = lambda: conn.execute(SQL_SELECT_TASKS).fetchall()
+    load_nights = lambda: conn.execute(SQL_SELECT_SLEEP_ALL).fetchall()
+
+    rows = [
+        ("task dicts", lambda: [
+            {"id": r[0], "label": r[1], "category": r[2], "done": bool(r[3])} for r in load_tasks()
+        ]),
+        ("Task (__slots__)", lambda: [Task(r[0], r[1], category_id(r[2]), bool(r[3])) for r in load_tasks()]),
+        ("TaskStore", lambda: TaskStore(
+            {"id": r[0], "label": r[1], "category": r[2], "done": bool(r[3])} for r in load_tasks()
+        )),
+        ("sleep dicts", lambda: [
+            {"date": datetime.date.fromisoformat(r[0]), "hours": r[1], "quality": r[2], "nap_hours": r[3],
+             "bedtime": _as_time(r[4]), "wakeup": _as_time(r[5])} for r in load_nights()
+        ]),
+        ("SleepEntry (__slots__)", lambda: [
+            SleepEntry(datetime.date.fromisoformat(r[0]), r[1], r[2], r[3], _as_time(r[4]), _as_time(r[5]))
+            for r in load_nights()
+        ]),
+        ("SleepHistory", lambda: SleepHistory(
+            {"date": r[0], "hours": r[1], "quality": r[2], "nap_hours": r[3], "bedtime": r[4], "wakeup": r[5]}
+            for r in load_nights()
+        )),
+    ]
+    print(f"\n=== memory, {records} records ===")
+    print(f"{'representation':<26}{'MiB':>10}{'bytes/record':>14}")
+    for name, build in rows:
+        size = traced_size(build)
+        print(f"{name:<26}{size / 2**20:>10.2f}{size / records:>14.0f}")
+
+
+# --- Analytics ---
+
+def bench_analytics(years, repeat):
+    """Times sleep_analytics.analyze() over a history of `years` years of nights."""
+    today = datetime.date.today()
+    history = SleepHistory()
+    for i in range(years * 365):
+        history.record(today - datetime.timedelta(days=i), 5 + i % 5, 1 + i % 5, (i % 3) * 0.5, "23:15", "06:45")
+
+    print(f"\n=== analytics, {years} years, {'numpy' if sleep_analytics.np is not None else 'pure Python'} ===")
+    print(f"{'range':<14}{'p50 ms':>9}{'p95 ms':>9}")
+    for label, days in (("week", 7), ("month", 30), ("year", 365), (f"{years} years", years * 365)):
+        start = today - datetime.timedelta(days=days - 1)
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            sleep_analytics.analyze(history, start, today)
+            samples.append(time.perf_counter() - started)
+        print(f"{label:<14}{percentile(samples, 50) * 1000:>9.2f}{percentile(samples, 95) * 1000:>9.2f}")
+
+
+# --- Sleep rules ---
+
+def legacy_feedback(bedtime, wakeup, nap_hours):
+    """The Sleep tab's original inline branching, kept as the baseline for --rules."""
+    sleep_hours = None
+    risky = False
+    if bedtime and wakeup:
+        today = datetime.date.today()
+        b_dt = datetime.datetime.combine(today, bedtime)
+        w_dt = datetime.datetime.combine(today, wakeup)
+        if w_dt <= b_dt:
+            w_dt += datetime.timedelta(days=1)
+        sleep_hours = min(max((w_dt - b_dt).total_seconds() / 3600, 0), sleep_rules.MAX_SLEEP_HOURS)
+        risky = 2 <= bedtime.hour < 6 and wakeup.hour >= 13
+
+    mins = int(nap_hours * 60)
+    if mins > 30:
+        nap = "⚠️ Short naps are better. Long naps (>30m) cause inertia."
+    elif mins >= 15:
+        nap = "Power naps (15-30m) boost energy."
+    elif mins > 0:
+        nap = "Too short for benefit. Aim for 15-30m."
+    else:
+        nap = ""
+    return sleep_hours, risky, nap
+
+
+def engine_feedback(bedtime, wakeup, nap_hours):
+    schedule, nap = sleep_rules.evaluate(bedtime, wakeup, nap_hours)
+    return sleep_rules.sleep_duration(bedtime, wakeup), bool(schedule), nap.message
+
+
+def bench_rules(years, repeat, states=10_000):
+    """Times the rule tables against the inline branching, then evaluate_history().
+
+    tests/test_sleep_rules.py checks that both give the same feedback.
+    """
+    rng = random.Random(1)
+    cases = [
+        (datetime.time(rng.randrange(24), rng.randrange(60)), datetime.time(rng.randrange(24), rng.randrange(60)),
+         rng.randrange(37) / 12)
+        for _ in range(states)
+    ]
+    cases += [(None, None, 0.0), (datetime.time(3), None, 0.25), (datetime.time(23), datetime.time(23), 3.0)]
+
+    print(f"\n=== sleep rules, {len(cases)} states ===")
+    print(f"{'evaluator':<22}{'p50 ms':>9}{'p95 ms':>9}{'us/state':>10}")
+    for name, evaluate in (("inline branching", legacy_feedback), ("rule tables", engine_feedback)):
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for case in cases:
+                evaluate(*case)
+            samples.append(time.perf_counter() - started)
+        p50 = percentile(samples, 50)
+        print(f"{name:<22}{p50 * 1000:>9.2f}{percentile(samples, 95) * 1000:>9.2f}{p50 / len(cases) * 1e6:>10.2f}")
+
+    today = datetime.date.today()
+    history = SleepHistory()
+    for i in range(years * 365):
+        history.record(today - datetime.timedelta(days=i), 5 + i % 5, 1 + i % 5, (i % 9) / 12,
+                       f"{(22 + i % 7) % 24:02d}:30", f"{(6 + i % 9) % 24:02d}:15")
+    start = today - datetime.timedelta(days=years * 365 - 1)
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        counts = sleep_rules.evaluate_history(history, start, today)
+        samples.append(time.perf_counter() - started)
+    print(f"{'history, ' + str(years) + ' years':<22}{percentile(samples, 50) * 1000:>9.2f}"
+          f"{percentile(samples, 95) * 1000:>9.2f}   {counts}")
+
+
+# --- Up Next ---
+
+def bench_up_next(records, repeat):
+    """Times Up Next (top 3 undone by urgency) from the heap against sorting a full scan."""
+    rng = random.Random(1)
+    store = TaskStore()
+    for i in range(records):
+        store.add(f"Habit {i}", CATEGORIES[i % len(CATEGORIES)], rng.random() < 0.3,
+                  priority=rng.randrange(3), due=rng.choice((None, rng.randrange(24 * 60))))
+    ids = [task.id for task in store]
+
+    def scan():
+        return sorted((task for task in store if not task.done), key=lambda task: task.urgency)[:3]
+
+    def toggle_and_top():
+        task = store.get(rng.choice(ids))
+        store.set_done(task.id, not task.done)
+        return store.next_undone(3)
+
+    assert [t.urgency for t in scan()] == [t.urgency for t in store.next_undone(3)]
+    print(f"\n=== up next, {records} habits ===")
+    print(f"{'operation':<26}{'p50 ms':>9}{'p95 ms':>9}")
+    for name, op in (("full scan + sort", scan), ("heap top 3", lambda: store.next_undone(3)),
+                     ("toggle + heap top 3", toggle_and_top)):
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            op()
+            samples.append(time.perf_counter() - started)
+        print(f"{name:<26}{percentile(samples, 50) * 1000:>9.3f}{percentile(samples, 95) * 1000:>9.3f}")
+
+
+# --- Import / Export ---
+
+def synthetic_records(records):
+    """`records` export records, half tasks and half nights."""
+    first = datetime.date(1900, 1, 1)
+    for i in range(records):
+        if i % 2:
+            yield {"kind": "task", "label": f"Habit {i}", "category": CATEGORIES[i % len(CATEGORIES)],
+                   "done": i % 3 == 0, "priority": i % 3, "due": "07:30" if i % 4 else None}
+        else:
+            yield {"kind": "sleep", "date": (first + datetime.timedelta(days=i // 2)).isoformat(), "hours": 7.5,
+                   "quality": 1 + i % 5, "nap_hours": 0.25, "bedtime": "23:15", "wakeup": "06:45"}
+
+
+def bench_transfer(records):
+    """Export and import (parse + validate) throughput per format, with peak import memory."""
+    print(f"\n=== import / export, {records} records ===")
+    print(f"{'format':<10}{'MiB':>8}{'export MB/s':>13}{'import MB/s':>13}{'import rec/s':>14}{'peak MiB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for ext, fmt in transfer.FORMATS.items():
+            path = os.path.join(tmp, f"export{ext}")
+            started = time.perf_counter()
+            transfer.write_records(path, synthetic_records(records))
+            export_seconds = time.perf_counter() - started
+            size = os.path.getsize(path)
+
+            started = time.perf_counter()
+            imported = sum(len(b.tasks) + len(b.nights) for b in transfer.read_batches(path, CATEGORIES))
+            import_seconds = time.perf_counter() - started
+            # Memory in a second pass, since tracing slows the first one down severalfold
+            tracemalloc.start()
+            for _ in transfer.read_batches(path, CATEGORIES):
+                pass
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert imported == records, (fmt, imported)
+            print(f"{fmt:<10}{size / 2**20:>8.1f}{size / 1e6 / export_seconds:>13.1f}"
+                  f"{size / 1e6 / import_seconds:>13.1f}{records / import_seconds:>14,.0f}{peak / 2**20:>10.1f}")
+
+
+# --- Completion log ---
+
+def bench_streaks(habits, years, repeat):
+    """Memory and query times of the completion bitsets for `habits` habits over `years` years."""
+    days = years * 365
+    rng = random.Random(1)
+    end = EPOCH + datetime.timedelta(days=days - 1)
+    rows = [(task_id, rng.randbytes((days + 7) // 8)) for task_id in range(habits)]
+
+    print(f"\n=== completion log, {habits} habits x {years} years ===")
+    sets_size = traced_size(lambda: {
+        task_id: {EPOCH + datetime.timedelta(days=d) for d in range(days) if bits[d >> 3] >> (d & 7) & 1}
+        for task_id, bits in rows[:1000]
+    }) * habits / min(habits, 1000)
+    log_size = traced_size(lambda: CompletionLog(rows))
+    print(f"{'set of dates per habit':<26}{sets_size / 2**20:>10.2f} MiB (extrapolated from 1000 habits)")
+    print(f"{'bitset per habit':<26}{log_size / 2**20:>10.2f} MiB")
+
+    log = CompletionLog(rows)
+    ids = [rng.randrange(habits) for _ in range(1000)]
+    ops = (
+        ("mark + unmark", lambda task_id: (log.mark(task_id, end), log.mark(task_id, end, False))),
+        ("streak", lambda task_id: log.streak(task_id, end)),
+        ("30-day rate", lambda task_id: log.rate(task_id, end - datetime.timedelta(days=29), end)),
+        (f"{years}-year rate", lambda task_id: log.rate(task_id, EPOCH, end)),
+    )
+    print(f"{'operation':<26}{'p50 us':>10}{'p95 us':>10}")
+    for name, op in ops:
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for task_id in ids:
+                op(task_id)
+            samples.append((time.perf_counter() - started) / len(ids))
+        print(f"{name:<26}{percentile(samples, 50) * 1e6:>10.2f}{percentile(samples, 95) * 1e6:>10.2f}")
+
+    # Category index over the same history
+    store = TaskStore({"id": task_id, "label": "", "category": CATEGORIES[task_id % len(CATEGORIES)]}
+                      for task_id, _ in rows)
+    started = time.perf_counter()
+    index = CategoryIndex(store, log)
+    print(f"\n{'category index build':<26}{(time.perf_counter() - started) * 1000:>10.1f} ms")
+    week = end - datetime.timedelta(days=6)
+    category_ops = (
+        ("mark + unmark", lambda i: (index.mark(i % len(CATEGORIES), end, True),
+                                     index.mark(i % len(CATEGORIES), end, False))),
+        ("7-day completions", lambda i: index.completions(i % len(CATEGORIES), week, end)),
+        (f"{years}-year completions", lambda i: index.completions(i % len(CATEGORIES), EPOCH, end)),
+        ("dashboard breakdown", lambda i: [index.trend(c, end, 7, 2) for c in range(len(CATEGORIES))]),
+    )
+    print(f"{'operation':<26}{'p50 us':>10}{'p95 us':>10}")
+    for name, op in category_ops:
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for i in range(100):
+                op(i)
+            samples.append((time.perf_counter() - started) / 100)
+        print(f"{name:<26}{percentile(samples, 50) * 1e6:>10.2f}{percentile(samples, 95) * 1e6:>10.2f}")
+
+
+def bench_stress(habits, timers=200, producers=8, toggles=2000, steps=50):
+    """Drives one session with tick jobs, toggles posted from worker threads and direct toggles.
+
+    Afterwards checks that no update was lost: each habit ends in the state its last
+    toggle asked for, the completion log, category index, database and task lists all
+    agree with the store, and every tick job ran all of its steps.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        session = Session(load_app_module(), os.path.join(tmp, "stress.db"))
+        try:
+            return stress_session(session, habits, timers, producers, toggles, steps)
+        finally:
+            session.close()
+
+
+def stress_session(session, habits, timers, producers, toggles, steps):
+    populate(session, habits)
+    app = session.app
+    for index in (3, 1):   # mindfulness for its scheduler, then movement so toggles re-render the lists
+        app.rail.selected_index = index
+        session.run(app.navigate(FakeEvent(app.rail)))
+    store = app.state.task_store
+    ids = [task.id for task in store]
+    expected = {task.id: task.done for task in store}
+    # Each producer (and the direct clicks) owns a slice of the habits, so the last
+    # value it asked for is the state the habit must end in
+    slices = [ids[i::producers + 1] for i in range(producers + 1)]
+
+    scheduler = app.mindfulness.scheduler
+    scheduler.interval = 0.005
+    ran = [0] * timers
+
+    def job(n):
+        for _ in range(steps):
+            ran[n] += 1
+            yield
+
+    def produce(owned, seed):
+        rng = random.Random(seed)
+        for _ in range(toggles):
+            task_id, value = rng.choice(owned), rng.random() < 0.5
+            expected[task_id] = value
+            app.mailbox.post(app.toggle_task, task_id, value)
+
+    started = time.perf_counter()
+    buttons = find_controls(app.view_cache["mindfulness"], ft.ElevatedButton)
+    session.run(app.mindfulness.start_meditation_timer(FakeEvent(buttons[0])))
+    session.run(app.mindfulness.animate_breathing(FakeEvent(buttons[-1])))
+    for n in range(timers):
+        scheduler.schedule(job(n))
+    threads = [threading.Thread(target=produce, args=(slices[i], i)) for i in range(producers)]
+    for thread in threads:
+        thread.start()
+    rng = random.Random(producers)
+    for _ in range(toggles):
+        task_id, value = rng.choice(slices[-1]), rng.random() < 0.5
+        expected[task_id] = value
+        session.run(app.toggle_task(task_id, value))
+    for thread in threads:
+        thread.join()
+    while app.mailbox.applied < app.mailbox.posted or sum(ran) < timers * steps:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - started
+    session.call(app.ui_batcher.flush)
+    session.run(app.storage.flush())
+
+    today = app.state.completions_day
+    rebuilt = CategoryIndex(store, app.state.completions)
+    saved = {row["id"]: row["done"] for row in app.storage.load_tasks()}
+    shown = [(row.task_id, lst.done) for lst in (app.todo_list, app.done_list) for row in lst.rows if row.visible]
+    lost = {
+        "habit state": sum(store.get(task_id).done != expected[task_id] for task_id in ids),
+        "completion log": sum(app.state.completions.is_done(task_id, today) != store.get(task_id).done for task_id in ids),
+        "category index": sum(
+            rebuilt.completions(c, today, today) != app.state.category_index.completions(c, today, today)
+            for c in range(len(CATEGORIES))
+        ),
+        "database": sum(saved[task_id] != store.get(task_id).done for task_id in ids),
+        "task list rows": sum(store.get(task_id).done != done for task_id, done in shown),
+        "tick steps": timers * steps - sum(ran),
+    }
+
+    batcher, mailbox = app.ui_batcher, app.mailbox
+    print(f"\n=== stress, {habits} habits, {timers} tick jobs, {producers} threads x {toggles} toggles ===")
+    print(f"{'toggles posted / applied':<28}{mailbox.posted:>10,} / {mailbox.applied:,}")
+    print(f"{'direct toggles':<28}{toggles:>10,}")
+    print(f"{'elapsed':<28}{elapsed:>10.2f} s")
+    print(f"{'ui updates requested / sent':<28}{batcher.requested:>10,} / {batcher.sent:,}")
+    for name, count in lost.items():
+        print(f"{'lost: ' + name:<28}{count:>10}")
+    return lost
+
+
+def print_report(report):
+    for habits, rows in report.items():
+        print(f"\n=== {habits} habits ===")
+        print(f"{'operation':<22}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'updates':>9}{'bytes':>10}{'controls':>10}")
+        for row in rows:
+            controls = row["controls"] if row["controls"] is not None else "-"
+            print(
+                f"{row['op']:<22}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+                f"{row['updates_per_op']:>9.2f}{row['bytes_per_op']:>10.0f}{controls:>10}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000], help="habit counts to test")
+    parser.add_argument("--repeat", type=int, default=30, help="iterations per operation")
+    parser.add_argument("--json", action="store_true", help="print the raw results as JSON")
+    parser.add_argument("--memory", action="store_true", help="compare model memory instead of timing the UI")
+    parser.add_argument("--records", type=int, default=100_000,
+                        help="records (or habits) for --memory, --up-next, --transfer, --streaks and --stress")
+    parser.add_argument("--analytics", action="store_true", help="time the sleep analytics instead of the UI")
+    parser.add_argument("--years", type=int, default=3, help="history length for --analytics, --rules and --streaks")
+    parser.add_argument("--rules", action="store_true", help="time the sleep feedback rules instead of the UI")
+    parser.add_argument("--up-next", action="store_true", help="time the Up Next queue instead of the UI")
+    parser.add_argument("--transfer", action="store_true", help="time import/export instead of the UI")
+    parser.add_argument("--streaks", action="store_true", help="time the completion log instead of the UI")
+    parser.add_argument("--stress", action="store_true",
+                        help="check for lost updates under concurrent timers and toggles instead of timing the UI")
+    args = parser.parse_args()
+
+    if args.stress:
+        lost = bench_stress(min(args.records, 10_000))
+        sys.exit(1 if any(lost.values()) else 0)
+
+    if args.streaks:
+        bench_streaks(args.records, args.years, args.repeat)
+        return
+
+    if args.transfer:
+        bench_transfer(args.records)
+        return
+
+    if args.up_next:
+        bench_up_next(args.records, args.repeat)
+        return
+
+    if args.rules:
+        bench_rules(args.years, args.repeat)
+        return
+
+    if args.analytics:
+        bench_analytics(args.years, args.repeat)
+        return
+
+    if args.memory:
+        bench_memory(args.records)
+        return
+
+    report = run_benchmarks(args.sizes, args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import datetime
+
+from models import CATEGORIES
+
+# Day 0 of every bitset. Days before it can't be logged; the app has no data from then.
+EPOCH = datetime.date(2020, 1, 1)
+
+
+class CompletionLog:
+    """Which days each habit was completed, as one bitset per habit.
+
+    Bit `d` of a habit's bytearray is set when it was done on EPOCH + d days, so
+    three years of history cost 137 bytes per habit. Marking a day is O(1) (the
+    array grows by whole bytes as days pass); streaks and completion rates are
+    computed with int.bit_count() / bit_length() over the bitset as one integer,
+    instead of looping over days.
+    """
+
+    def __init__(self, bitsets=()):
+        self._bits = {}   # task id -> bytearray
+
+        # `bitsets` are (task id, bytes) rows as saved by storage
+        for task_id, bits in bitsets:
+            self._bits[task_id] = bytearray(bits)
+
+    def __contains__(self, task_id):
+        return task_id in self._bits
+
+    def bits(self, task_id):
+        """The raw bitset for storage (empty if the habit was never completed)."""
+        return bytes(self._bits.get(task_id, b""))
+
+    def days_mask(self, task_id):
+        """The bitset as an int, bit d for EPOCH + d days."""
+        return int.from_bytes(self._bits.get(task_id, b""), "little")
+
+    # --- Mutations ---
+
+    def mark(self, task_id, date, done=True):
+        """Sets or clears `date` for a habit; returns True if that changed anything."""
+        day = day_number(date)
+        if day < 0:
+            raise ValueError(f"Can't log {date}: completions start on {EPOCH}")
+        index, mask = day >> 3, 1 << (day & 7)
+        bits = self._bits.get(task_id)
+        if bits is None:
+            if not done:
+                return False
+            bits = self._bits[task_id] = bytearray()
+        if index >= len(bits):
+            if not done:
+                return False
+            bits.extend(bytes(index + 1 - len(bits)))
+        if bool(bits[index] & mask) == done:
+            return False
+        bits[index] ^= mask
+        return True
+
+    def remove(self, task_id):
+        self._bits.pop(task_id, None)
+
+    # --- Queries ---
+
+    def is_done(self, task_id, date):
+        day = day_number(date)
+        bits = self._bits.get(task_id)
+        return bits is not None and 0 <= day and day >> 3 < len(bits) and bool(bits[day >> 3] & (1 << (day & 7)))
+
+    def count(self, task_id, start, end):
+        """Days from `start` to `end` (inclusive) the habit was done."""
+        return self._window(task_id, start, end)[0].bit_count()
+
+    def rate(self, task_id, start, end):
+        """Share of the days from `start` to `end` (inclusive) the habit was done."""
+        days = (end - start).days + 1
+        return self.count(task_id, start, end) / days if days > 0 else 0.0
+
+    def streak(self, task_id, end):
+        """Consecutive days the habit was done, ending on `end` (0 if it wasn't done then)."""
+        window, days = self._window(task_id, EPOCH, end)
+        if not days:
+            return 0
+        # Bit days-1 is `end`; the run ends at the highest clear bit below it
+        missed = ~window & ((1 << days) - 1)
+        return days - missed.bit_length()
+
+    def _window(self, task_id, start, end):
+        """Returns (bits for start..end as an int with `start` at bit 0, number of days)."""
+        first, last = max(day_number(start), 0), day_number(end)
+        bits = self._bits.get(task_id)
+        if bits is None or last < first:
+            return 0, max(last - first + 1, 0)
+        chunk = int.from_bytes(bits[first >> 3:(last >> 3) + 1], "little") >> (first & 7)
+        days = last - first + 1
+        return chunk & ((1 << days) - 1), days
+
+
+class DayCounter:
+    """A count per day, stored bit-sliced: plane i holds bit i of every day's count.
+
+    Adding a whole bitset of days is a ripple-carry add across the planes, so it
+    costs O(log count) big-int operations however many days are set, and the total
+    over a date range is one masked popcount per plane.
+    """
+
+    __slots__ = ("planes",)
+
+    def __init__(self):
+        self.planes = []
+
+    def add(self, days):
+        """Adds 1 on every day set in `days` (an int bitmask)."""
+        planes, carry, i = self.planes, days, 0
+        while carry:
+            if i == len(planes):
+                planes.append(0)
+            plane = planes[i]
+            planes[i] = plane ^ carry
+            carry &= plane
+            i += 1
+
+    def subtract(self, days):
+        """Subtracts 1 on every day set in `days`; those days must have been added."""
+        planes, borrow, i = self.planes, days, 0
+        while borrow:
+            plane = planes[i]
+            planes[i] = plane ^ borrow
+            borrow &= ~plane
+            i += 1
+
+    def total(self, days):
+        """Sum of the counts on the days set in `days`."""
+        return sum((plane & days).bit_count() << i for i, plane in enumerate(self.planes))
+
+
+class CategoryIndex:
+    """Completions per category and day, kept in step with a CompletionLog.
+
+    Call mark() whenever CompletionLog.mark() changed a bit and remove() before a
+    habit's bitset is dropped. Totals and today's done counts come from TaskStore,
+    which already maintains them per category.
+    """
+
+    def __init__(self, store, log):
+        self.store = store
+        self._days = [DayCounter() for _ in CATEGORIES]
+        for task in store:
+            if task.id in log:
+                self._days[task.category_id].add(log.days_mask(task.id))
+
+    def mark(self, category_id, date, done):
+        day = 1 << day_number(date)
+        if done:
+            self._days[category_id].add(day)
+        else:
+            self._days[category_id].subtract(day)
+
+    def remove(self, category_id, days_mask):
+        self._days[category_id].subtract(days_mask)
+
+    # --- Queries ---
+
+    def counts(self, category_id):
+        """(done today, habits) for a category."""
+        return self.store.category_counts(CATEGORIES[category_id])
+
+    def completions(self, category_id, start, end):
+        """Completions logged in a category from `start` to `end` inclusive."""
+        return self._days[category_id].total(_range_mask(start, end))
+
+    def rate(self, category_id, start, end):
+        """Completions over possible completions (current habits x days); 0.0 for an empty category."""
+        habits = self.counts(category_id)[1]
+        days = (end - start).days + 1
+        return self.completions(category_id, start, end) / (habits * days) if habits and days > 0 else 0.0
+
+    def trend(self, category_id, end, days, buckets):
+        """Completions in `buckets` consecutive periods of `days` days, oldest first, the last ending on `end`."""
+        step = datetime.timedelta(days=days)
+        first_end = end - step * (buckets - 1)
+        return [
+            self.completions(category_id, period_end - step + datetime.timedelta(days=1), period_end)
+            for period_end in (first_end + step * i for i in range(buckets))
+        ]
+
+
+def day_number(date):
+    """Days from EPOCH to `date`, i.e. its bit in a bitset."""
+    return (date - EPOCH).days
+
+
+def _range_mask(start, end):
+    first, last = max(day_number(start), 0), day_number(end)
+    if last < first:
+        return 0
+    return ((1 << (last - first + 1)) - 1) << first
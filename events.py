@@ -0,0 +1,192 @@
+import asyncio
+import collections
+import inspect
+import logging
+import threading
+import time
+
+import metrics
+
+FRAME_INTERVAL = 1 / 60  # seconds between batched page updates
+
+# Everything here runs on the session's event loop (async handlers, loop callbacks),
+# so no locking is needed. Mailbox.post() is the one way in from other threads.
+
+
+class Mailbox:
+    """Single writer for a session's state and controls.
+
+    Session state and controls are only changed on the session's event loop. Code
+    running anywhere else (worker threads, callbacks from libraries) posts a message
+    instead: a callable and its arguments. Messages run on the loop one at a time in
+    the order they were posted; a coroutine function's message is awaited before the
+    next one starts. A burst of posts costs one wake-up of the loop.
+
+    `posted` and `applied` count messages; they are equal once the mailbox is idle.
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self._queue = collections.deque()
+        self._lock = threading.Lock()
+        self._draining = False
+        self.posted = 0
+        self.applied = 0
+
+    def post(self, fn, *args):
+        """Queues fn(*args) to run on the loop. Safe to call from any thread."""
+        with self._lock:
+            self._queue.append((fn, args))
+            self.posted += 1
+            if self._draining:
+                return
+            self._draining = True
+        asyncio.run_coroutine_threadsafe(self._drain(), self.loop)
+
+    async def _drain(self):
+        while True:
+            with self._lock:
+                if not self._queue:
+                    self._draining = False
+                    return
+                fn, args = self._queue.popleft()
+            try:
+                result = fn(*args)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logging.exception("Mailbox message failed")
+                metrics.count("errors", where="mailbox")
+            self.applied += 1
+
+
+class FrameBatcher:
+    """Coalesces update requests into at most one page.update() per frame.
+
+    mark(*controls) asks for those controls to be redrawn; mark() with no controls
+    asks for the whole page. Everything requested during a frame goes out in one
+    update: targeted at the marked controls, or a full page update if any request
+    was for the page. flush() sends the pending update right away, for the few
+    callers that need the client to have it first (e.g. mounting a FilePicker).
+
+    `requested` and `sent` count requests and actual page updates; `saved` is the
+    difference. They are also reported to metrics as ui_updates_requested/sent.
+    """
+
+    def __init__(self, page, frame_interval=FRAME_INTERVAL):
+        self.page = page
+        self.frame_interval = frame_interval
+        self._dirty = {}   # control -> None, used as an ordered set
+        self._whole_page = False
+        self._handle = None
+        self.requested = 0
+        self.sent = 0
+
+    @property
+    def saved(self):
+        return self.requested - self.sent
+
+    def mark(self, *controls):
+        self.requested += 1
+        metrics.count("ui_updates_requested")
+        if controls:
+            for control in controls:
+                self._dirty[control] = None
+        else:
+            self._whole_page = True
+        if self._handle is None:
+            self._handle = asyncio.get_running_loop().call_later(self.frame_interval, self.flush)
+
+    def flush(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        controls, self._dirty = list(self._dirty), {}
+        whole_page, self._whole_page = self._whole_page, False
+        if whole_page or controls:
+            self.sent += 1
+            metrics.count("ui_updates_sent")
+            if whole_page:
+                self.page.update()   # already includes every dirty control
+            else:
+                self.page.update(*controls)
+
+
+class Throttle:
+    """Calls `callback` at most once per `interval` seconds.
+
+    With `leading` the first event of a burst runs immediately; with `trailing` the
+    latest event of a burst runs once the interval has passed, so the final value
+    is never dropped. flush() runs a pending trailing call right away.
+    """
+
+    def __init__(self, callback, interval, leading=True, trailing=True):
+        self.callback = callback
+        self.interval = interval
+        self.leading = leading
+        self.trailing = trailing
+        self._last_call = float("-inf")
+        self._pending = None
+        self._handle = None
+
+    def __call__(self, e):
+        now = time.monotonic()
+        elapsed = now - self._last_call
+        if self.leading and self._handle is None and elapsed >= self.interval:
+            self._last_call = now
+            self.callback(e)
+        elif self.trailing:
+            self._pending = e
+            if self._handle is None:
+                delay = self.interval if not self.leading else max(self.interval - elapsed, 0)
+                self._handle = asyncio.get_running_loop().call_later(delay, self._fire)
+
+    def _fire(self):
+        self._handle = None
+        e, self._pending = self._pending, None
+        self._last_call = time.monotonic()
+        if e is not None:
+            self.callback(e)
+
+    def flush(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        e, self._pending = self._pending, None
+        if e is not None:
+            self.callback(e)
+
+
+class Debounce(Throttle):
+    """Calls `callback` once events have stopped arriving for `wait` seconds."""
+
+    def __init__(self, callback, wait):
+        super().__init__(callback, wait, leading=False, trailing=True)
+
+    def __call__(self, e):
+        self._pending = e
+        if self._handle is not None:
+            self._handle.cancel()
+        self._handle = asyncio.get_running_loop().call_later(self.interval, self._fire)
+
+
+def coalesce_slider(slider, on_change, on_commit=None, interval=0.1, leading=True, trailing=True, debounce=False):
+    """Wires a slider so drags run `on_change` throttled (or debounced) and release runs `on_commit`.
+
+    The pending change is flushed before `on_commit`, so the committed state always
+    matches where the thumb stopped.
+    """
+    handler = Debounce(on_change, interval) if debounce else Throttle(on_change, interval, leading, trailing)
+
+    # Async wrappers make Flet deliver the events on the session loop
+    async def on_change_event(e):
+        handler(e)
+
+    async def on_change_end(e):
+        handler.flush()
+        if on_commit is not None:
+            on_commit(e)
+
+    slider.on_change = on_change_event
+    slider.on_change_end = on_change_end
+    return handler
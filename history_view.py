@@ -0,0 +1,257 @@
+import datetime
+
+import flet as ft
+
+from sleep_analytics import ROLLING_WINDOW, TARGET_HOURS, analyze
+from sleep_chart import SleepBarChart
+from sleep_history import QUALITY_LABELS
+from sleep_rules import evaluate_history
+from theme import (
+    ACCENT_NAP, ACCENT_SLEEP, C_GREY_400, C_GREY_700, C_RED_400, C_TRANSPARENT, C_WHITE10, TEXT_COLOR
+)
+
+# (button label, days) for the chart range picker on the Week tab
+CHART_RANGES = (("7 Days", 7), ("30 Days", 30), ("Year", 365))
+
+
+def create_night_card(title, entry):
+    if entry is None:
+        details = ft.Text("No entry logged", color=C_GREY_700, size=12)
+    else:
+        nap_minutes = int(entry.nap_hours * 60)
+        bed_str = entry.bedtime.strftime("%H:%M") if entry.bedtime else "--:--"
+        wake_str = entry.wakeup.strftime("%H:%M") if entry.wakeup else "--:--"
+        details = ft.Row([
+            ft.Column([
+                ft.Text(f"{entry.hours:.1f}h Sleep", color="white", weight="bold"),
+                ft.Text(f"Quality: {entry.quality}/5 ({QUALITY_LABELS[entry.quality]})", color=C_GREY_400, size=12),
+            ]),
+            ft.Column([
+                ft.Text(f"{bed_str} - {wake_str}", color=C_GREY_400, size=12),
+                ft.Text(f"Nap: {nap_minutes}m", color=ACCENT_NAP, size=12) if nap_minutes > 0
+                else ft.Text("No Nap", color=C_GREY_700, size=12),
+            ], horizontal_alignment=ft.CrossAxisAlignment.END)
+        ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
+
+    return ft.Column([
+        ft.Text(title, weight="bold", size=16),
+        ft.Container(bgcolor=C_WHITE10, padding=15, border_radius=10, content=details),
+    ])
+
+
+class SleepHistoryView:
+    """The Sleep History screen, built once and refreshed in place.
+
+    refresh() recomputes the numbers and writes them into the existing controls; the
+    chart reuses its bars, so reopening the view after logging a night only changes
+    the bars and texts whose values moved.
+    """
+
+    def __init__(self, history, on_close, request_update):
+        self.history = history
+        self.on_close = on_close
+        self.request_update = request_update   # called with the controls that changed
+        self.chart = SleepBarChart()
+        self.chart_days = CHART_RANGES[0][1]
+
+    def build(self):
+        self.night_cards = ft.Column()
+        self.chart_title = ft.Text(weight="bold")
+        self.week_summary = ft.Text(size=12, color=C_GREY_400)
+        self.range_buttons = [
+            ft.TextButton(label, data=days, on_click=self.handle_range) for label, days in CHART_RANGES
+        ]
+        self.month_sleep = ft.Text(size=24, weight="bold")
+        self.month_quality = ft.Text(size=24, weight="bold")
+        self.month_naps = ft.Text(size=24, weight="bold")
+        self.month_debt = ft.Text(size=20, weight="bold")
+        self.bedtime_spread = ft.Text(size=20, weight="bold")
+        self.wakeup_spread = ft.Text(size=20, weight="bold")
+        self.correlation_insight = ft.Text(size=12, color=C_GREY_400)
+        self.nap_insight = ft.Text(size=12, color=C_GREY_400)
+        self.rules_insight = ft.Text(size=12, color=C_GREY_400)
+
+        view_week = ft.Container(
+            padding=20, bgcolor=C_WHITE10, border_radius=15,
+            content=ft.Column([
+                ft.Row([self.chart_title, ft.Row(self.range_buttons, spacing=0)],
+                       alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+                self.week_summary,
+                ft.Container(height=10),
+                self.chart.control,
+            ])
+        )
+
+        view_month = ft.Column([
+            ft.Row([
+                create_summary_card("bedtime", ACCENT_SLEEP, "Avg Sleep", self.month_sleep),
+                ft.Container(width=10),
+                create_summary_card("star", "#B39DDB", "Avg Quality", self.month_quality),
+                ft.Container(width=10),
+                create_summary_card("wb_sunny_outlined", ACCENT_NAP, "Naps", self.month_naps),
+            ]),
+            ft.Container(height=10),
+            ft.Row([
+                create_metric_card("Sleep Debt", self.month_debt),
+                ft.Container(width=10),
+                create_metric_card("Bedtime Spread", self.bedtime_spread),
+                ft.Container(width=10),
+                create_metric_card("Wake-up Spread", self.wakeup_spread),
+            ]),
+            ft.Container(height=10),
+            ft.Container(
+                bgcolor=C_WHITE10, padding=15, border_radius=15,
+                content=ft.Column([self.correlation_insight, self.nap_insight, self.rules_insight])
+            ),
+        ])
+
+        self.refresh()
+        return ft.Column([
+            ft.Container(height=5),
+            ft.Row([
+                ft.Icon("history", size=30, color="#B39DDB"),
+                ft.Text("Sleep History", size=28, weight="bold", color="white"),
+                ft.IconButton(
+                    icon="close",
+                    icon_color=C_RED_400,
+                    tooltip="Back to Tracker",
+                    on_click=self.on_close
+                )
+            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+            ft.Divider(color=C_TRANSPARENT, height=10),
+
+            ft.Tabs( # different History Views
+                selected_index=0,
+                animation_duration=300,
+                indicator_color=ACCENT_SLEEP,
+                label_color=TEXT_COLOR,
+                unselected_label_color=C_GREY_400,
+                divider_color=C_TRANSPARENT,
+                tabs=[
+                    ft.Tab(
+                        text="Past 2 Days",
+                        content=ft.Container(content=self.night_cards, padding=ft.padding.only(top=20))
+                    ),
+                    ft.Tab(
+                        text="Week",
+                        content=ft.Container(content=view_week, padding=ft.padding.only(top=20))
+                    ),
+                    ft.Tab(
+                        text="Month",
+                        content=ft.Container(content=view_month, padding=ft.padding.only(top=20))
+                    ),
+                ],
+                expand=1,
+            )
+        ])
+
+    def refresh(self):
+        """Writes current values into the view's controls."""
+        # Tabs read single nights, precomputed rollups or analytics over a bounded range,
+        # never the full log
+        today = datetime.date.today()
+
+        yesterday = self.history.night(today - datetime.timedelta(days=1))
+        two_days_ago = self.history.night(today - datetime.timedelta(days=2))
+        # record() stores a new entry object, so identity tells whether a card is stale
+        if self.night_cards.data != (today, yesterday, two_days_ago):
+            self.night_cards.data = (today, yesterday, two_days_ago)
+            self.night_cards.controls = [
+                create_night_card("Yesterday", yesterday),
+                ft.Container(height=10),
+                create_night_card("2 Days Ago", two_days_ago),
+            ]
+
+        week = self.history.week(today)
+        week_report = analyze(self.history, today - datetime.timedelta(days=6), today)
+        summary = "No nights logged this week"
+        if week.nights:
+            summary = f"This week: {week.mean_hours:.1f}h avg, quality {week.mean_quality:.1f}/5"
+        if week_report.nights:
+            summary += f"\nSleep debt, last 7 nights: {week_report.debt_hours:.1f}h below {TARGET_HOURS:g}h"
+        self.week_summary.value = summary
+        self.refresh_chart(today)
+
+        month = self.history.month(today)
+        month_report = analyze(self.history, today.replace(day=1), today)
+        self.month_sleep.value = f"{month.mean_hours:.1f}h" if month.nights else "--"
+        self.month_quality.value = f"{month.mean_quality:.1f}/5" if month.nights else "--"
+        self.month_naps.value = f"{month.nap_total:.1f}h"
+        self.month_debt.value = f"{month_report.debt_hours:.1f}h" if month_report.nights else "--"
+        self.bedtime_spread.value = _spread(month_report.bedtime_spread)
+        self.wakeup_spread.value = _spread(month_report.wakeup_spread)
+        self.correlation_insight.value = _correlation_insight(month_report.quality_correlation)
+        self.nap_insight.value = _nap_insight(month_report)
+        self.rules_insight.value = _rules_insight(evaluate_history(self.history, today.replace(day=1), today))
+
+    def refresh_chart(self, today):
+        days = self.chart_days
+        start = today - datetime.timedelta(days=days - 1)
+        notes = None
+        if days <= 30:
+            # Rolling average per bar; start a window early so the first bars have a full one
+            report = analyze(self.history, start - datetime.timedelta(days=ROLLING_WINDOW - 1), today)
+            notes = {
+                today - datetime.timedelta(days=offset): f"{ROLLING_WINDOW}-night avg: {average:.1f}h"
+                for offset, average in enumerate(reversed(report.rolling_hours[-days:]))
+                if average is not None
+            }
+        label = next(label for label, range_days in CHART_RANGES if range_days == days)
+        self.chart_title.value = f"Last {label} (Hours)"
+        for button in self.range_buttons:
+            button.style = ft.ButtonStyle(color=ACCENT_SLEEP if button.data == days else C_GREY_400)
+        self.chart.set_range(self.history, start, today, notes)
+
+    async def handle_range(self, e):
+        self.chart_days = e.control.data
+        self.refresh_chart(datetime.date.today())
+        self.request_update(self.chart_title, self.chart.control, *self.range_buttons)
+
+
+def create_summary_card(icon, color, title, value_text):
+    return ft.Container(
+        bgcolor=C_WHITE10, padding=20, border_radius=15, expand=1,
+        content=ft.Column([
+            ft.Icon(icon, color=color, size=30),
+            ft.Text(title, size=12, color=C_GREY_400),
+            value_text
+        ], horizontal_alignment=ft.CrossAxisAlignment.CENTER)
+    )
+
+
+def create_metric_card(title, value_text):
+    return ft.Container(
+        bgcolor=C_WHITE10, padding=15, border_radius=15, expand=1,
+        content=ft.Column([
+            ft.Text(title, size=12, color=C_GREY_400),
+            value_text
+        ], horizontal_alignment=ft.CrossAxisAlignment.CENTER)
+    )
+
+
+def _spread(minutes):
+    return f"±{minutes:.0f} min" if minutes is not None else "--"
+
+
+def _correlation_insight(r):
+    if r is None:
+        return "Log a few more nights to see how duration relates to quality."
+    if abs(r) < 0.3:
+        return f"Sleep length barely affects your quality this month (r = {r:.2f})."
+    trend = "better" if r > 0 else "worse"
+    return f"Longer nights have meant {trend} quality this month (r = {r:.2f})."
+
+
+def _nap_insight(report):
+    if not report.nap_days or report.hours_after_nap is None or report.hours_without_nap is None:
+        return "No nap comparison yet this month."
+    difference = report.hours_after_nap - report.hours_without_nap
+    direction = "more" if difference >= 0 else "less"
+    return f"After a nap you slept {abs(difference):.1f}h {direction} than after days without one."
+
+
+def _rules_insight(counts):
+    risky, long_naps = counts.get("schedule_risky", 0), counts.get("nap_long", 0)
+    if not risky and not long_naps:
+        return "No risky sleep schedules or long naps this month."
+    return f"This month: {risky} risky sleep schedule(s), {long_naps} nap(s) over 30 minutes."
@@ -0,0 +1,79 @@
+"""Import-time report for the app entry point.
+
+Imports the entry point in a fresh interpreter under `python -X importtime` (without
+starting the app) and summarizes where startup import time goes. It also checks that
+the modules meant to load on first use stay out of startup.
+
+Usage:
+    python importtime_report.py [--top 15]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(ROOT, "New updates 13.01.py")
+PROJECT_MODULES = (
+    "completions", "events", "history_view", "metrics", "mindfulness", "models", "scheduler", "sleep_analytics",
+    "sleep_chart", "sleep_history", "sleep_rules", "storage", "task_store", "theme", "transfer",
+)
+DEFERRED_MODULES = (
+    "history_view", "mindfulness", "scheduler", "sleep_analytics", "sleep_chart", "transfer",
+    "numpy", "cProfile", "http.server",
+)
+
+IMPORT_APP = f"""
+import importlib.util, sys
+sys.path.insert(0, {ROOT!r})
+spec = importlib.util.spec_from_file_location("zenith_app", {APP_PATH!r})
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+"""
+
+
+def collect():
+    """Returns [(module, self_us, cumulative_us, depth)] as reported by -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_APP],
+        capture_output=True, text=True, check=True, cwd=ROOT
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=15, help="top-level imports to list")
+    args = parser.parse_args()
+
+    rows = collect()
+    imported = {name for name, *_ in rows}
+    top_level = sorted((row for row in rows if row[3] == 0), key=lambda row: row[2], reverse=True)
+    total = sum(row[2] for row in top_level)
+
+    print(f"Total import time: {total / 1000:.1f} ms across {len(rows)} modules")
+    if os.environ.get("PYTHONDONTWRITEBYTECODE"):
+        print("(PYTHONDONTWRITEBYTECODE is set, so project modules include compile time)")
+    print()
+    print(f"{'top-level import':<32}{'cumulative ms':>15}{'share':>8}")
+    for name, _, cumulative_us, _ in top_level[:args.top]:
+        print(f"{name:<32}{cumulative_us / 1000:>15.1f}{cumulative_us / total:>8.0%}")
+
+    print(f"\n{'project module':<32}{'self ms':>15}{'cumulative ms':>15}")
+    for name, self_us, cumulative_us, _ in rows:
+        if name in PROJECT_MODULES:
+            print(f"{name:<32}{self_us / 1000:>15.1f}{cumulative_us / 1000:>15.1f}")
+
+    leaked = [name for name in DEFERRED_MODULES if name in imported]
+    print("\nDeferred modules imported at startup: " + (", ".join(leaked) if leaked else "none"))
+    return 1 if leaked else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+import atexit
+import contextlib
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+
+# Instrumentation is off unless ZENITH_METRICS=1. The switch is read once at import:
+# when off, timed() returns the function unchanged and span() a shared no-op context,
+# so the hot paths pay nothing beyond a function call.
+ENABLED = os.environ.get("ZENITH_METRICS") == "1"
+METRICS_FILE = os.environ.get("ZENITH_METRICS_FILE")             # JSON lines, one per observation
+METRICS_PORT = int(os.environ.get("ZENITH_METRICS_PORT", "0"))   # Prometheus text on 127.0.0.1
+PROFILE_FILE = os.environ.get("ZENITH_PROFILE")                   # cProfile stats written at exit
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, float("inf"))  # seconds
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+class Histogram:
+    """Latency histogram with a count per bucket; the exporter sums them into Prometheus cumulative buckets."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.total += value
+        self.count += 1
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class Registry:
+    """Holds every histogram and counter; safe to read from the exporter thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}   # (name, labels) -> Histogram
+        self._counters = {}     # (name, labels) -> float
+        self._sink = None
+
+    def observe(self, name, value, labels=()):
+        with self._lock:
+            histogram = self._histograms.get((name, labels))
+            if histogram is None:
+                histogram = self._histograms[(name, labels)] = Histogram()
+            histogram.observe(value)
+            self._write(name, value, labels)
+
+    def increment(self, name, amount=1, labels=()):
+        with self._lock:
+            self._counters[(name, labels)] = self._counters.get((name, labels), 0) + amount
+            self._write(name, amount, labels)
+
+    def open_sink(self, path):
+        self._sink = open(path, "a", buffering=1, encoding="utf-8")
+        atexit.register(self._sink.close)
+
+    def _write(self, name, value, labels):
+        if self._sink is not None:
+            self._sink.write(json.dumps({"ts": time.time(), "metric": name, "labels": dict(labels), "value": value}) + "\n")
+
+    def snapshot(self):
+        with self._lock:
+            histograms = {key: (list(h.counts), h.total, h.count) for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+        return histograms, counters
+
+    def prometheus_text(self):
+        histograms, counters = self.snapshot()
+        lines = []
+        for (name, labels), value in sorted(counters.items()):
+            lines.append(f"zenith_{name}_total{_format_labels(labels)} {value}")
+        for (name, labels), (counts, total, count) in sorted(histograms.items()):
+            cumulative = 0
+            for bound, bucket in zip(BUCKETS, counts):
+                cumulative += bucket
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"zenith_{name}_seconds_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"zenith_{name}_seconds_sum{_format_labels(labels)} {total}")
+            lines.append(f"zenith_{name}_seconds_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+# --- Recording API ---
+
+class _Span:
+    __slots__ = ("name", "labels", "started")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        REGISTRY.observe(self.name, time.perf_counter() - self.started, self.labels)
+        return False
+
+
+def span(name, **labels):
+    """Times a block into the `name` histogram."""
+    if not ENABLED:
+        return _NO_SPAN
+    return _Span(name, tuple(sorted(labels.items())))
+
+
+def count(name, amount=1, **labels):
+    if ENABLED:
+        REGISTRY.increment(name, amount, tuple(sorted(labels.items())))
+
+
+def count_controls(name, control, **labels):
+    """Adds the number of controls in `control`'s tree to the `name` counter."""
+    if ENABLED:
+        REGISTRY.increment(name, _tree_size(control), tuple(sorted(labels.items())))
+
+
+def _tree_size(control):
+    return 1 + sum(_tree_size(child) for child in control._get_children())
+
+
+def timed(name="handler"):
+    """Decorator recording each call's latency, labelled with the function name."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        labels = (("handler", fn.__name__),)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    REGISTRY.observe(name, time.perf_counter() - started, labels)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                REGISTRY.observe(name, time.perf_counter() - started, labels)
+        return wrapper
+    return decorate
+
+
+def instrument_page(page):
+    """Times every page.update() on `page`. Call before anything captures page.update."""
+    if not ENABLED:
+        return
+    update = page.update
+
+    def timed_update(*controls):
+        started = time.perf_counter()
+        try:
+            update(*controls)
+        finally:
+            REGISTRY.observe("page_update", time.perf_counter() - started, (("targeted", str(bool(controls)).lower()),))
+
+    page.update = timed_update
+
+
+# --- Exporters ---
+# cProfile and http.server are only imported when switched on, to keep them off startup.
+
+def _serve(port):
+    import http.server
+
+    class MetricsHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = REGISTRY.prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+
+def start():
+    """Starts the configured exporters and profiler; call once from the thread running the event loop."""
+    if PROFILE_FILE:
+        import cProfile
+        # cProfile only sees the calling thread, which is the one running every async handler
+        profiler = cProfile.Profile()
+        profiler.enable()
+        atexit.register(lambda: (profiler.disable(), profiler.dump_stats(PROFILE_FILE)))
+        logging.info(f"Profiling to {PROFILE_FILE}")
+    if not ENABLED:
+        return
+    if METRICS_FILE:
+        REGISTRY.open_sink(METRICS_FILE)
+        logging.info(f"Writing metrics to {METRICS_FILE}")
+    if METRICS_PORT:
+        _serve(METRICS_PORT)
+        logging.info(f"Serving metrics on http://127.0.0.1:{METRICS_PORT}/metrics")
@@ -0,0 +1,238 @@
+import time
+
+import flet as ft
+
+import metrics
+from scheduler import TickScheduler
+from theme import ACCENT_MOVEMENT, C_GREY_400, C_RED_400, C_WHITE10, CARD_COLOR
+
+# (name, contact, description, icon) -- string icons avoid flet icon errors
+HOTLINES = (
+    ("Line", "804", "Available 24/7", "phone"),
+    ("Live Chat Support", "+490741741", "Free support", "sms"),
+    ("Email", "info@zenith.de", "Free support", "sms"),
+)
+
+# Mindfulness "Ocean" background (Calm Color Palette)
+OCEAN_GRADIENT = ft.LinearGradient(
+    begin=ft.alignment.top_center, end=ft.alignment.bottom_center, colors=["#0F2027", "#3985A5"]
+)
+
+
+class MindfulnessView:
+    """Meditation timer, breathing exercise and help lines, with their own tick scheduler."""
+
+    def __init__(self, page, ui_batcher):
+        self.page = page
+        self.ui_batcher = ui_batcher
+        # Meditation timer and breathing animation share one tick loop
+        self.scheduler = TickScheduler(page.run_task, self.on_tick)
+        self.meditation_timer = None
+        self.meditation_button = None
+        self.breathing_timer = None
+
+    def on_tick(self):
+        # Only the controls the timer jobs change, not the whole page
+        self.ui_batcher.mark(
+            self.meditation_timer_text, *self.meditation_buttons, self.breath_status, self.breathing_circle
+        )
+
+    def cancel_timers(self):
+        for timer in (self.meditation_timer, self.breathing_timer):
+            if timer is not None:
+                timer.cancel()
+
+    def build(self):
+        return ft.Container(
+            expand=True,
+            padding=30,
+            # This adds the calming "Ocean" background
+            gradient=OCEAN_GRADIENT,
+            content=ft.Column([
+                ft.Text("Mindfulness Sanctuary", size=32, weight="bold", color="white"),
+                ft.Tabs(
+                    selected_index=0,
+                    tabs=[
+                        ft.Tab(text="Meditation", content=self.ui_meditation_tab()),
+                        ft.Tab(text="Breathing Exercise", content=self.ui_breathing_tab()),
+                        ft.Tab(text="Emergency Help", content=self.ui_help_tab()),
+                    ],
+                    expand=1
+                )
+            ], scroll=ft.ScrollMode.AUTO)
+        )
+
+    def ui_meditation_tab(self):
+        self.meditation_timer_text = ft.Text("10:00", size=40, weight="bold", color=ACCENT_MOVEMENT)
+        self.meditation_buttons = [
+            # Each button carries its duration (seconds) in `data`
+            ft.ElevatedButton("5 Min", data=300, on_click=self.start_meditation_timer),
+            ft.ElevatedButton("10 Min", data=600, on_click=self.start_meditation_timer),
+        ]
+        return ft.Container(
+            padding=20,
+            content=ft.Column([
+                ft.Text("Guided Meditation", size=20, weight="bold"),
+                ft.Container(
+                    bgcolor=CARD_COLOR, padding=30, border_radius=15,
+                    content=ft.Column([
+                        ft.Icon("spa", size=50, color=ACCENT_MOVEMENT),
+                        self.meditation_timer_text,
+                        ft.Row(self.meditation_buttons, alignment=ft.MainAxisAlignment.CENTER)
+                    ], horizontal_alignment=ft.CrossAxisAlignment.CENTER)
+                ),
+            ])
+        )
+
+    @metrics.timed()
+    async def animate_breathing(self, e):
+        if self.breathing_timer is not None:
+            self.breathing_timer.cancel()
+
+        # Reset first so the inhale animation always starts from the small circle
+        self.breathing_circle.scale = 1.0 
+        # Sent now: in the same frame as the first inhale step it would be coalesced away
+        self.ui_batcher.mark(self.breathing_circle)
+        self.ui_batcher.flush()
+
+        def run():
+            # --- PHASE 1: INHALE (4s) ---
+            self.breath_status.color = "#00E676" # Hardcoded Green
+            self.breathing_circle.bgcolor = "#00E676"
+            self.breathing_circle.scale = 2.5  
+            self.breathing_circle.opacity = 0.8
+            self.breathing_circle.animate_scale = ft.Animation(4000, "decelerate")
+
+            for i in range(4, 0, -1):
+                self.breath_status.value = f"INHALE... {i}"
+                yield
+
+            # --- PHASE 2: HOLD (7s) ---
+            self.breath_status.color = "#FF5252" # Hardcoded Red
+            self.breathing_circle.bgcolor = "#FF5252"
+
+            for i in range(7, 0, -1):
+                self.breath_status.value = f"HOLD... {i}"
+                yield
+
+            # --- PHASE 3: RELEASE (8s) ---
+            self.breath_status.color = "#448AFF" 
+            self.breathing_circle.bgcolor = "#448AFF"
+            self.breathing_circle.scale = 1.0  
+            self.breathing_circle.opacity = 0.2
+            self.breathing_circle.animate_scale = ft.Animation(8000, "accelerate")
+
+            for i in range(8, 0, -1):
+                self.breath_status.value = f"RELEASE... {i}"
+                yield
+
+            # --- RESET ---
+            self.breath_status.value = "Ready to breathe?"
+            self.breath_status.color = "white"
+            self.breathing_circle.bgcolor = "#00E676"
+
+        # One step per tick; the scheduler requests a single update per tick
+        self.breathing_timer = self.scheduler.schedule(run(), immediate=True)
+
+    def ui_breathing_tab(self):
+        self.breath_status = ft.Text("Ready to breathe?", size=20, weight="bold")
+        self.breathing_circle = ft.Container(
+            width=100, height=100,
+            bgcolor=ACCENT_MOVEMENT,
+            border_radius=50,
+            opacity=0.2,
+            scale=1.0,
+            # Critical for smooth movement and color shifting
+            animate_scale=ft.Animation(1000, ft.AnimationCurve.EASE_IN_OUT),
+            animate=ft.Animation(1000, ft.AnimationCurve.EASE_IN_OUT),
+            shadow=ft.BoxShadow(
+                blur_radius=50,
+                spread_radius=-10,
+                color=ft.Colors.with_opacity(0.3, ACCENT_MOVEMENT), # Fixed Capital 'C'
+            ),
+        )
+
+        return ft.Container(
+            padding=40,
+            content=ft.Column([
+                ft.Text("4-7-8 Rhythm", size=28, weight="bold"),
+                ft.Container(height=40),
+                ft.Container(
+                    height=300, width=400,
+                    alignment=ft.alignment.center,
+                    content=ft.Stack([
+                        # Outer Guide Ring
+                        ft.Container(
+                            width=260, height=260,
+                            border=ft.border.all(1, C_WHITE10),
+                            border_radius=130,
+                        ),
+                        self.breathing_circle
+                    ], alignment=ft.alignment.center)
+                ),
+                self.breath_status,
+                ft.Container(height=40),
+                ft.ElevatedButton(
+                    "BEGIN SESSION", 
+                    on_click=self.animate_breathing,
+                    bgcolor=C_WHITE10,
+                    color="white",
+                    style=ft.ButtonStyle(shape=ft.RoundedRectangleBorder(radius=20))
+                )
+            ], horizontal_alignment=ft.CrossAxisAlignment.CENTER)
+        )
+
+    def ui_help_tab(self):
+        return ft.Container(
+            padding=20,
+            content=ft.Column([
+                ft.Text("You are not alone.", size=24, weight="bold", color=C_RED_400),
+                ft.Container(height=10),
+                # FIXED: Using string "phone" to prevent flet icon errors
+                *(self.create_help_hotline(*hotline) for hotline in HOTLINES),
+            ])
+        )
+
+    
+
+    @metrics.timed()
+    async def start_meditation_timer(self, e):
+        duration_seconds = e.control.data
+        # Cancel the running session (and free its button) before starting a new one
+        if self.meditation_timer is not None:
+            self.meditation_timer.cancel()
+            self.meditation_button.disabled = False
+
+        button = e.control
+        button.disabled = True
+        self.meditation_button = button
+        # Remaining time comes from the monotonic clock, so late ticks never drift
+        deadline = time.monotonic() + duration_seconds
+
+        def countdown():
+            while True:
+                remaining = round(deadline - time.monotonic())
+                if remaining <= 0:
+                    break
+                mins, secs = divmod(remaining, 60)
+                self.meditation_timer_text.value = f"{mins:02d}:{secs:02d}"
+                yield
+
+            self.meditation_timer_text.value = "Done!"
+            button.disabled = False
+
+        self.meditation_timer = self.scheduler.schedule(countdown(), immediate=True)
+
+    def create_help_hotline(self, name, contact, desc, icon):
+        # We use the string "phone" instead of ft.icons.PHONE to avoid crashes
+        return ft.Container(
+            bgcolor=CARD_COLOR, padding=15, border_radius=10, margin=ft.margin.only(bottom=10),
+            content=ft.Row([
+                ft.Icon(icon, color=C_RED_400), 
+                ft.Column([
+                    ft.Text(name, weight="bold", size=16),
+                    ft.Text(contact, color=ACCENT_MOVEMENT, size=14, weight="bold"),
+                    ft.Text(desc, size=12, color=C_GREY_400),
+                ], spacing=2)
+            ])
+        )
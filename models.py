@@ -0,0 +1,91 @@
+CATEGORIES = (
+    "Socialising", "Exercise", "Mental Exercise",
+    "Hygiene", "Nutrition", "Chores", "Others"
+)
+
+# Categories are stored on tasks as small ints (indexes into CATEGORIES), so each
+# task holds a shared int instead of its own reference to a category string.
+CATEGORY_IDS = {name: index for index, name in enumerate(CATEGORIES)}
+OTHERS = CATEGORY_IDS["Others"]
+
+
+def category_id(name):
+    """Interns a category name; unknown or missing names fall back to "Others"."""
+    return CATEGORY_IDS.get(name, OTHERS)
+
+
+# --- Scheduling ---
+# Up Next orders undone habits by due time, pulled earlier by priority, category
+# and streak. Every weight is in minutes, e.g. a high-priority habit due at 10:00
+# ranks like a normal one due at 08:00.
+PRIORITIES = ("Low", "Normal", "High")
+NORMAL = PRIORITIES.index("Normal")
+PRIORITY_LEAD = 120                                  # minutes per priority step
+CATEGORY_LEAD = (30, 60, 45, 30, 60, 0, 0)           # minutes, indexed by category id
+STREAK_LEAD = 15                                     # minutes per streak day at stake
+MAX_STREAK_LEAD_DAYS = 7
+END_OF_DAY = 24 * 60                                 # habits without a due time
+
+
+def parse_due(text):
+    """"HH:MM" to minutes after midnight; None for empty or malformed values."""
+    try:
+        hours, minutes = text.split(":")
+        value = int(hours) * 60 + int(minutes)
+    except (AttributeError, ValueError):
+        return None
+    return value if 0 <= value < END_OF_DAY else None
+
+
+def format_due(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}" if minutes is not None else None
+
+
+class Task:
+    """One movement habit. `due` is minutes after midnight or None; `streak` is days in a row done."""
+
+    __slots__ = ("id", "label", "done", "category_id", "priority", "due", "streak")
+
+    def __init__(self, task_id, label, category_id=OTHERS, done=False, priority=NORMAL, due=None, streak=0):
+        self.id = task_id
+        self.label = label
+        self.category_id = category_id
+        self.done = done
+        self.priority = priority
+        self.due = due
+        self.streak = streak
+
+    @property
+    def category(self):
+        return CATEGORIES[self.category_id]
+
+    @property
+    def urgency(self):
+        """Up Next sort key in minutes; lower comes first."""
+        due = self.due if self.due is not None else END_OF_DAY
+        return (
+            due
+            - (self.priority - NORMAL) * PRIORITY_LEAD
+            - CATEGORY_LEAD[self.category_id]
+            - min(self.streak, MAX_STREAK_LEAD_DAYS) * STREAK_LEAD
+        )
+
+    def __repr__(self):
+        return f"Task({self.id!r}, {self.label!r}, {self.category!r}, done={self.done!r})"
+
+
+class SleepEntry:
+    """One logged night, keyed by the date of waking up. bedtime/wakeup are datetime.time or None."""
+
+    __slots__ = ("date", "hours", "quality", "nap_hours", "bedtime", "wakeup")
+
+    def __init__(self, date, hours, quality, nap_hours, bedtime=None, wakeup=None):
+        self.date = date
+        self.hours = hours
+        self.quality = quality
+        self.nap_hours = nap_hours
+        self.bedtime = bedtime
+        self.wakeup = wakeup
+
+    def __repr__(self):
+        return f"SleepEntry({self.date!r}, hours={self.hours!r}, quality={self.quality!r})"
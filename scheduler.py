@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import threading
+import time
+
+TICK_INTERVAL = 1.0  # seconds
+
+
+class TimerHandle:
+    """Returned by TickScheduler.schedule(); cancel() stops the job before its next step.
+
+    Awaiting the handle waits until the job has finished or been cancelled.
+    """
+
+    __slots__ = ("steps", "cancelled", "skip_tick", "finished")
+
+    def __init__(self, steps):
+        self.steps = steps
+        self.cancelled = False
+        self.skip_tick = False
+        self.finished = asyncio.Event()
+
+    def cancel(self):
+        self.cancelled = True
+        self.finished.set()
+
+    def __await__(self):
+        return self.finished.wait().__await__()
+
+
+class TickScheduler:
+    """Single asyncio task that drives every periodic UI job (timers, animations).
+
+    A job is an iterator; each tick advances every active job by one step and then
+    calls `on_tick` once, so all jobs share a single UI update per tick. Ticks are
+    scheduled against monotonic deadlines (start + n * interval), so slow steps do
+    not make the clock drift. The task only runs while there are active jobs.
+    """
+
+    def __init__(self, run_task, on_tick, interval=TICK_INTERVAL):
+        self.run_task = run_task
+        self.on_tick = on_tick
+        self.interval = interval
+        self._jobs = []
+        self._lock = threading.Lock()
+        self._running = False
+        self._deadline = None
+
+    def schedule(self, steps, immediate=False):
+        """Runs one step of `steps` per tick until it is exhausted or cancelled.
+
+        With `immediate` the first step runs right away instead of on the next tick.
+        """
+        handle = TimerHandle(iter(steps))
+        with self._lock:
+            start = not self._running
+            self._running = True
+            if start:
+                self._deadline = time.monotonic() + self.interval
+            elif immediate:
+                # Joining a running clock: skip a tick that is due too soon after
+                # the immediate step so the first step still lasts about one interval
+                handle.skip_tick = self._deadline - time.monotonic() < self.interval / 2
+            self._jobs.append(handle)
+        if start:
+            self.run_task(self._run, handle if immediate else None)
+        elif immediate:
+            self._step_now(handle)
+        return handle
+
+    def _step_now(self, handle):
+        # Runs a job's first step without waiting for the shared tick
+        async def step():
+            self._step(handle)
+            self.on_tick()
+        self.run_task(step)
+
+    def _step(self, handle):
+        if handle.cancelled:
+            return
+        try:
+            next(handle.steps)
+        except StopIteration:
+            handle.cancel()
+        except Exception as ex:
+            handle.cancel()
+            logging.error(f"Scheduled job crashed: {ex}")
+
+    def _advance(self, jobs):
+        for handle in jobs:
+            if handle.skip_tick:
+                handle.skip_tick = False
+                continue
+            self._step(handle)
+
+    async def _run(self, first=None):
+        if first is not None:
+            self._step(first)
+            self.on_tick()
+
+        while True:
+            await asyncio.sleep(max(self._deadline - time.monotonic(), 0))
+            with self._lock:
+                self._jobs = [job for job in self._jobs if not job.cancelled]
+                jobs = list(self._jobs)
+                if not jobs:
+                    self._running = False
+                    return
+            self._advance(jobs)
+            try:
+                self.on_tick()
+            except Exception as ex:
+                logging.error(f"Tick update failed: {ex}")
+
+            with self._lock:
+                self._deadline += self.interval
+                now = time.monotonic()
+                if self._deadline < now:
+                    # Fell behind (e.g. a blocked loop): skip missed ticks rather than bursting
+                    self._deadline += ((now - self._deadline) // self.interval + 1) * self.interval
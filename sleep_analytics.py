@@ -0,0 +1,243 @@
+import array
+import math
+
+try:
+    import numpy as np
+except ImportError:  # optional: the pure-Python path gives the same numbers, only slower
+    np = None
+
+TARGET_HOURS = 8.0      # nightly need used for sleep debt
+ROLLING_WINDOW = 7      # nights in the rolling average
+GOOD_HOURS = 7          # nights at or above this are "good"
+SHORT_HOURS = 6         # nights below this are "short"
+MINUTES_PER_DAY = 24 * 60
+
+# Loaded with the Sleep History view. Every statistic works on columns (one slot per
+# day, NaN where nothing was logged) so the NumPy path is a handful of array ops.
+
+
+def hours_band(hours):
+    """Buckets a night's hours into "good", "fair" or "short"."""
+    if hours >= GOOD_HOURS:
+        return "good"
+    return "short" if hours < SHORT_HOURS else "fair"
+
+
+class SleepColumns:
+    """One date range of a SleepHistory as parallel float columns, one slot per day.
+
+    bedtime/wakeup are minutes after midnight. Columns are numpy arrays when NumPy
+    is installed, array.array("d") otherwise.
+    """
+
+    __slots__ = ("start", "hours", "quality", "nap_hours", "bedtime", "wakeup")
+
+    def __init__(self, history, start, end):
+        self.start = start
+        nan = math.nan
+        hours, quality, nap_hours, bedtime, wakeup = [], [], [], [], []
+        for _, entry in history.last_nights(end, (end - start).days + 1):
+            if entry is None:
+                hours.append(nan)
+                quality.append(nan)
+                nap_hours.append(nan)
+                bedtime.append(nan)
+                wakeup.append(nan)
+                continue
+            hours.append(entry.hours)
+            quality.append(entry.quality)
+            nap_hours.append(entry.nap_hours)
+            bedtime.append(_minutes(entry.bedtime))
+            wakeup.append(_minutes(entry.wakeup))
+        self.hours = _column(hours)
+        self.quality = _column(quality)
+        self.nap_hours = _column(nap_hours)
+        self.bedtime = _column(bedtime)
+        self.wakeup = _column(wakeup)
+
+    def __len__(self):
+        return len(self.hours)
+
+
+class SleepReport:
+    """Statistics for one date range; fields are None when there is too little data."""
+
+    __slots__ = (
+        "start", "end", "nights", "mean_hours", "mean_quality", "rolling_hours", "debt_hours",
+        "bedtime_spread", "wakeup_spread", "quality_correlation",
+        "nap_days", "hours_after_nap", "hours_without_nap", "quality_after_nap", "quality_without_nap",
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+
+def analyze(history, start, end, target_hours=TARGET_HOURS, window=ROLLING_WINDOW):
+    """Computes a SleepReport for the nights from `start` to `end` inclusive.
+
+    rolling_hours has one value per day: the mean of the logged nights in the
+    `window` days ending there (None if there were none). Sleep debt adds up the
+    shortfall below `target_hours` of each logged night. The spreads are circular
+    standard deviations in minutes, so 23:30 and 00:30 count as an hour apart.
+    Nap impact compares the night after a day with a nap against the others.
+    """
+    columns = SleepColumns(history, start, end)
+    hours, quality, naps = columns.hours, columns.quality, columns.nap_hours
+
+    # A nap logged with one night's entry affects the following night
+    after_nap = _shift(_greater(naps, 0.0), 1)
+    after_no_nap = _shift(_equal(naps, 0.0), 1)
+
+    return SleepReport(
+        start=start,
+        end=end,
+        nights=_count(hours),
+        mean_hours=_mean(hours),
+        mean_quality=_mean(quality),
+        rolling_hours=_rolling_mean(hours, window),
+        debt_hours=_shortfall(hours, target_hours),
+        bedtime_spread=_circular_spread(columns.bedtime),
+        wakeup_spread=_circular_spread(columns.wakeup),
+        quality_correlation=_correlation(hours, quality),
+        nap_days=_count(_masked(naps, _greater(naps, 0.0))),
+        hours_after_nap=_mean(_masked(hours, after_nap)),
+        hours_without_nap=_mean(_masked(hours, after_no_nap)),
+        quality_after_nap=_mean(_masked(quality, after_nap)),
+        quality_without_nap=_mean(_masked(quality, after_no_nap)),
+    )
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute if value is not None else math.nan
+
+
+def _none_if_nan(value):
+    return None if value is None or math.isnan(value) else float(value)
+
+
+# --- Column operations ---
+# Each has a NumPy branch and a pure-Python branch over array.array("d").
+
+def _column(values):
+    return np.array(values, dtype=float) if np is not None else array.array("d", values)
+
+
+def _logged(column):
+    if np is not None:
+        return ~np.isnan(column)
+    return [value == value for value in column]   # NaN != NaN
+
+
+def _masked(column, mask):
+    """Keeps the values where `mask` is true and replaces the rest with NaN."""
+    if np is not None:
+        return np.where(mask, column, np.nan)
+    return array.array("d", (value if keep else math.nan for value, keep in zip(column, mask)))
+
+
+def _greater(column, threshold):
+    if np is not None:
+        return column > threshold   # False for NaN
+    return [value > threshold for value in column]
+
+
+def _equal(column, target):
+    if np is not None:
+        return column == target
+    return [value == target for value in column]
+
+
+def _shift(mask, days):
+    """Moves a day mask `days` forward, so day i reads what was true on day i - days."""
+    if np is not None:
+        return np.concatenate((np.zeros(days, dtype=bool), mask[:-days]))
+    return [False] * days + list(mask[:-days])
+
+
+def _count(column):
+    if np is not None:
+        return int(np.count_nonzero(~np.isnan(column)))
+    return sum(_logged(column))
+
+
+def _mean(column):
+    if np is not None:
+        logged = column[~np.isnan(column)]
+        return float(logged.mean()) if logged.size else None
+    logged = [value for value in column if value == value]
+    return sum(logged) / len(logged) if logged else None
+
+
+def _shortfall(hours, target):
+    if np is not None:
+        return float(np.clip(target - hours[~np.isnan(hours)], 0, None).sum())
+    return sum(max(target - value, 0.0) for value in hours if value == value)
+
+
+def _rolling_mean(column, window):
+    if np is not None:
+        logged = ~np.isnan(column)
+        sums = np.concatenate(([0.0], np.cumsum(np.where(logged, column, 0.0))))
+        counts = np.concatenate(([0], np.cumsum(logged)))
+        ends = np.arange(1, len(column) + 1)
+        starts = np.maximum(ends - window, 0)
+        window_counts = counts[ends] - counts[starts]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = (sums[ends] - sums[starts]) / window_counts
+        return [None if n == 0 else float(m) for m, n in zip(means, window_counts)]
+
+    means = []
+    total, count = 0.0, 0
+    for i, value in enumerate(column):
+        if value == value:
+            total += value
+            count += 1
+        if i >= window:
+            dropped = column[i - window]
+            if dropped == dropped:
+                total -= dropped
+                count -= 1
+        means.append(total / count if count else None)
+    return means
+
+
+def _circular_spread(minutes):
+    """Circular standard deviation of clock times, in minutes."""
+    if np is not None:
+        angles = minutes[~np.isnan(minutes)] * (2 * math.pi / MINUTES_PER_DAY)
+        if angles.size < 2:
+            return None
+        resultant = math.hypot(float(np.cos(angles).mean()), float(np.sin(angles).mean()))
+    else:
+        angles = [value * (2 * math.pi / MINUTES_PER_DAY) for value in minutes if value == value]
+        if len(angles) < 2:
+            return None
+        resultant = math.hypot(
+            sum(math.cos(a) for a in angles) / len(angles), sum(math.sin(a) for a in angles) / len(angles)
+        )
+    if resultant <= 0:
+        return None
+    return math.sqrt(max(-2 * math.log(min(resultant, 1.0)), 0.0)) * MINUTES_PER_DAY / (2 * math.pi)
+
+
+def _correlation(x, y):
+    """Pearson correlation over the days where both columns were logged."""
+    if np is not None:
+        both = ~np.isnan(x) & ~np.isnan(y)
+        x, y = x[both], y[both]
+        if x.size < 3 or x.std() == 0 or y.std() == 0:
+            return None
+        return _none_if_nan(np.corrcoef(x, y)[0, 1])
+
+    pairs = [(a, b) for a, b in zip(x, y) if a == a and b == b]
+    if len(pairs) < 3:
+        return None
+    mean_x = sum(a for a, _ in pairs) / len(pairs)
+    mean_y = sum(b for _, b in pairs) / len(pairs)
+    cov = sum((a - mean_x) * (b - mean_y) for a, b in pairs)
+    var_x = sum((a - mean_x) ** 2 for a, _ in pairs)
+    var_y = sum((b - mean_y) ** 2 for _, b in pairs)
+    if var_x == 0 or var_y == 0:
+        return None
+    return cov / math.sqrt(var_x * var_y)
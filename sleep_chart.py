@@ -0,0 +1,109 @@
+import flet as ft
+
+from sleep_analytics import hours_band
+from theme import ACCENT_SLEEP, C_GREY_400, C_WARNING
+
+BAND_COLORS = {"good": ACCENT_SLEEP, "fair": "#90CAF9", "short": C_WARNING}
+BUCKET_DAYS = (1, 7, 30)   # day, week and month buckets, smallest that fits is used
+MAX_BARS = 60              # pixel budget: wider ranges are aggregated into buckets
+MAX_HOURS = 10             # hours at full bar height
+
+
+class _BarSlot:
+    """One reusable bar: spacer, bar and label, plus the key of what it currently shows."""
+
+    __slots__ = ("key", "spacer", "bar", "label", "control")
+
+    def __init__(self):
+        self.key = None
+        self.spacer = ft.Container()
+        self.bar = ft.Container(border_radius=ft.border_radius.only(top_left=5, top_right=5))
+        self.label = ft.Text(size=10, color=C_GREY_400)
+        self.control = ft.Column(
+            [self.spacer, self.bar, self.label], alignment=ft.MainAxisAlignment.END, spacing=5
+        )
+
+
+class SleepBarChart:
+    """Bar chart of nightly sleep hours that keeps and reuses its bar controls.
+
+    Each slot remembers the (day, hours, band, note) it shows, so set_range() only
+    touches the bars whose key changed and never rebuilds the row. Ranges longer than
+    `max_bars` days are averaged into weekly or monthly buckets first.
+    """
+
+    def __init__(self, height=100, max_bars=MAX_BARS):
+        self.height = height
+        self.max_bars = max_bars
+        self._slots = []
+        self.control = ft.Row([], alignment=ft.MainAxisAlignment.SPACE_EVENLY, height=height + 50)
+
+    def set_range(self, history, start, end, notes=None):
+        """Shows the nights from `start` to `end`; `notes` optionally maps a day to tooltip text.
+
+        Returns the number of bars that changed.
+        """
+        points = list(self._points(history, start, end, notes or {}))
+        bar_width = 20 if len(points) <= 14 else 8
+        label_every = max(1, len(points) // 7)
+
+        while len(self._slots) < len(points):
+            slot = _BarSlot()
+            self._slots.append(slot)
+            self.control.controls.append(slot.control)
+
+        changed = 0
+        for index, slot in enumerate(self._slots):
+            if index >= len(points):
+                slot.control.visible = False
+                slot.key = None
+                continue
+            day, hours, label, tooltip = points[index]
+            band = hours_band(hours) if hours is not None else None
+            key = (day, hours, band, tooltip, bar_width, index % label_every == 0)
+            slot.control.visible = True
+            if key == slot.key:
+                continue
+            slot.key = key
+            changed += 1
+
+            bar_height = (min(hours or 0, MAX_HOURS) / MAX_HOURS) * self.height
+            slot.spacer.height = self.height - bar_height
+            slot.bar.height = bar_height
+            slot.bar.width = bar_width
+            slot.bar.bgcolor = BAND_COLORS[band] if band else None
+            slot.bar.tooltip = tooltip
+            slot.label.value = label if index % label_every == 0 else ""
+        return changed
+
+    def _points(self, history, start, end, notes):
+        """Yields (day, hours or None, label, tooltip) per bar, averaging into buckets if needed."""
+        days = (end - start).days + 1
+        bucket = next((size for size in BUCKET_DAYS if -(-days // size) <= self.max_bars), BUCKET_DAYS[-1])
+        # Widen the range to whole buckets, ending on `end`, so no bucket is partial
+        nights = history.last_nights(end, -(-days // bucket) * bucket)
+
+        if bucket == 1:
+            for day, entry in nights:
+                hours = entry.hours if entry else None
+                tooltip = f"{hours:.1f} hours" if entry else "No entry"
+                if day in notes:
+                    tooltip += f"\n{notes[day]}"
+                yield day, hours, day.strftime("%a" if days <= 14 else "%d"), tooltip
+            return
+
+        for group in (nights[i:i + bucket] for i in range(0, len(nights), bucket)):
+            logged = [entry.hours for _, entry in group if entry is not None]
+            first_day, last_day = group[0][0], group[-1][0]
+            if logged:
+                hours = sum(logged) / len(logged)
+                tooltip = f"{_span(first_day, last_day)}\n{hours:.1f}h avg over {len(logged)} nights"
+            else:
+                hours = None
+                tooltip = f"{_span(first_day, last_day)}\nNo entries"
+            label = first_day.strftime("%b") if bucket >= 28 else first_day.strftime("%d %b")
+            yield first_day, hours, label, tooltip
+
+
+def _span(first, last):
+    return first.strftime("%d %b") if first == last else f"{first:%d %b} - {last:%d %b}"
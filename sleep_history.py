@@ -0,0 +1,123 @@
+import datetime
+import functools
+
+from models import SleepEntry
+
+QUALITY_LABELS = {  # Sleep quality score -> label shown to the user
+    1: "Horrible (Insomnia)",
+    2: "Poor",
+    3: "Average",
+    4: "Good",
+    5: "Well Rested"
+}
+
+
+class Rollup:
+    """Running totals for a group of nights (a week or a month)."""
+
+    __slots__ = ("nights", "hours_total", "quality_total", "nap_total")
+
+    def __init__(self):
+        self.nights = 0
+        self.hours_total = 0.0
+        self.quality_total = 0
+        self.nap_total = 0.0
+
+    def add(self, entry, sign=1):
+        self.nights += sign
+        self.hours_total += sign * entry.hours
+        self.quality_total += sign * entry.quality
+        self.nap_total += sign * entry.nap_hours
+
+    @property
+    def mean_hours(self):
+        return self.hours_total / self.nights if self.nights else None
+
+    @property
+    def mean_quality(self):
+        return self.quality_total / self.nights if self.nights else None
+
+
+class SleepHistory:
+    """Per-night sleep log with weekly and monthly rollups.
+
+    Nights are keyed by the date of waking up. Rollups are adjusted on every
+    record() (the old values of an overwritten night are subtracted first), so
+    week/month averages are read in O(1) no matter how many years are stored.
+    """
+
+    def __init__(self, entries=()):
+        self._nights = {}    # date -> SleepEntry
+        self._weekly = {}    # (iso year, iso week) -> Rollup
+        self._monthly = {}   # (year, month) -> Rollup
+
+        for entry in entries:
+            self.record(
+                _as_date(entry["date"]), entry["hours"], entry["quality"], entry["nap_hours"],
+                entry.get("bedtime"), entry.get("wakeup")
+            )
+
+    def __len__(self):
+        return len(self._nights)
+
+    def __iter__(self):
+        """Yields the logged nights, oldest first."""
+        return (self._nights[day] for day in sorted(self._nights))
+
+    def record(self, date, hours, quality, nap_hours, bedtime=None, wakeup=None):
+        """Stores (or replaces) the night ending on `date`. bedtime/wakeup are datetime.time or "HH:MM"."""
+        entry = SleepEntry(date, hours, quality, nap_hours, _as_time(bedtime), _as_time(wakeup))
+        week, month = self._rollups_for(date)
+        previous = self._nights.get(date)
+        if previous is not None:
+            week.add(previous, -1)
+            month.add(previous, -1)
+        week.add(entry)
+        month.add(entry)
+        self._nights[date] = entry
+        return entry
+
+    def _rollups_for(self, date):
+        iso = date.isocalendar()
+        week = self._weekly.get((iso[0], iso[1]))
+        if week is None:
+            week = self._weekly[(iso[0], iso[1])] = Rollup()
+        month = self._monthly.get((date.year, date.month))
+        if month is None:
+            month = self._monthly[(date.year, date.month)] = Rollup()
+        return week, month
+
+    # --- Queries ---
+
+    def night(self, date):
+        return self._nights.get(date)
+
+    def last_nights(self, end, count):
+        """Returns [(date, entry or None)] for the `count` nights up to and including `end`."""
+        return [
+            (day, self._nights.get(day))
+            for day in (end - datetime.timedelta(days=offset) for offset in range(count - 1, -1, -1))
+        ]
+
+    def week(self, date):
+        iso = date.isocalendar()
+        return self._weekly.get((iso[0], iso[1])) or Rollup()
+
+    def month(self, date):
+        return self._monthly.get((date.year, date.month)) or Rollup()
+
+
+def _as_date(value):
+    return datetime.date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _as_time(value):
+    if isinstance(value, str):
+        return _parse_time(value)
+    return value
+
+
+@functools.lru_cache(maxsize=1440)
+def _parse_time(value):
+    # One shared (immutable) time object per "HH:MM", so years of nights don't each hold their own
+    return datetime.datetime.strptime(value, "%H:%M").time()
@@ -0,0 +1,121 @@
+from theme import ACCENT_NAP, C_GREY_400, C_WARNING
+
+MAX_SLEEP_HOURS = 12      # the Sleep tab's hours slider goes up to this
+MAX_NAP_MINUTES = 180     # and its nap slider up to this
+MINUTES_PER_DAY = 24 * 60
+
+
+class Feedback:
+    """A piece of advice shown on the Sleep tab. Instances are created once and shared."""
+
+    __slots__ = ("key", "title", "message", "hint", "color")
+
+    def __init__(self, key, message="", color=C_GREY_400, title="", hint=""):
+        self.key = key
+        self.title = title
+        self.message = message
+        self.hint = hint
+        self.color = color
+
+    def __bool__(self):
+        return bool(self.message)
+
+    def __repr__(self):
+        return f"Feedback({self.key!r})"
+
+
+NO_FEEDBACK = Feedback("none")
+
+# --- Rule tables ---
+# First matching row wins. Ranges are inclusive; None means unbounded.
+
+# (lowest nap minutes, highest nap minutes, feedback)
+NAP_RULES = (
+    (31, None, Feedback("nap_long", "⚠️ Short naps are better. Long naps (>30m) cause inertia.", C_WARNING)),
+    (15, 30, Feedback("nap_power", "Power naps (15-30m) boost energy.", ACCENT_NAP)),
+    (1, 14, Feedback("nap_short", "Too short for benefit. Aim for 15-30m.", C_GREY_400)),
+)
+
+# (bedtime hours, wake-up hours, feedback) as inclusive hour ranges
+SCHEDULE_RULES = (
+    ((2, 5), (13, 23), Feedback(
+        "schedule_risky",
+        title="Risky Sleep Schedule",
+        message="Sleeping late (>2:00) and waking late (>13:00) increases risk of depressive moods.",
+        hint="Go to sleep earlier and wake up earlier for mood boosts.",
+        color=C_WARNING,
+    )),
+)
+
+
+# --- Compilation ---
+# Each table is expanded once into a flat lookup over every possible input, so
+# evaluating a rule is a single index instead of a chain of comparisons.
+
+def _compile_ranges(rules, size):
+    table = [NO_FEEDBACK] * size
+    for value in range(size):
+        for low, high, feedback in rules:
+            if value >= low and (high is None or value <= high):
+                table[value] = feedback
+                break
+    return tuple(table)
+
+
+def _compile_hour_grid(rules):
+    table = [NO_FEEDBACK] * (24 * 24)
+    for bed_hour in range(24):
+        for wake_hour in range(24):
+            for (bed_low, bed_high), (wake_low, wake_high), feedback in rules:
+                if bed_low <= bed_hour <= bed_high and wake_low <= wake_hour <= wake_high:
+                    table[bed_hour * 24 + wake_hour] = feedback
+                    break
+    return tuple(table)
+
+
+NAP_TABLE = _compile_ranges(NAP_RULES, MAX_NAP_MINUTES + 1)
+SCHEDULE_TABLE = _compile_hour_grid(SCHEDULE_RULES)
+
+
+# --- Evaluation ---
+
+def nap_advice(nap_hours):
+    return NAP_TABLE[min(max(int(nap_hours * 60), 0), MAX_NAP_MINUTES)]
+
+
+def schedule_risk(bedtime, wakeup):
+    """Feedback for a bedtime/wake-up pair (datetime.time); NO_FEEDBACK if either is unset."""
+    if bedtime is None or wakeup is None:
+        return NO_FEEDBACK
+    return SCHEDULE_TABLE[bedtime.hour * 24 + wakeup.hour]
+
+
+def sleep_duration(bedtime, wakeup):
+    """Hours from bedtime to wake-up, clamped to the slider range; None if either is unset.
+
+    A wake-up at or before bedtime is taken to be the next day.
+    """
+    if bedtime is None or wakeup is None:
+        return None
+    minutes = (wakeup.hour * 60 + wakeup.minute - bedtime.hour * 60 - bedtime.minute) % MINUTES_PER_DAY
+    return min((minutes or MINUTES_PER_DAY) / 60, MAX_SLEEP_HOURS)
+
+
+def evaluate(bedtime, wakeup, nap_hours):
+    """Runs every rule for one sleep state; returns (schedule feedback, nap feedback)."""
+    return schedule_risk(bedtime, wakeup), nap_advice(nap_hours)
+
+
+def evaluate_history(history, start, end):
+    """Counts how often each feedback fired over the logged nights from `start` to `end`.
+
+    Returns {feedback key: nights}; nights without advice are not counted.
+    """
+    counts = {}
+    for _, entry in history.last_nights(end, (end - start).days + 1):
+        if entry is None:
+            continue
+        for feedback in evaluate(entry.bedtime, entry.wakeup, entry.nap_hours):
+            if feedback:
+                counts[feedback.key] = counts.get(feedback.key, 0) + 1
+    return counts
@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+
+from models import format_due
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    label TEXT NOT NULL,
+    category TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    priority INTEGER NOT NULL DEFAULT 1,
+    due TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks (category);
+
+CREATE TABLE IF NOT EXISTS sleep_log (
+    date TEXT PRIMARY KEY,
+    hours REAL NOT NULL,
+    quality INTEGER NOT NULL,
+    nap_hours REAL NOT NULL DEFAULT 0,
+    bedtime TEXT,
+    wakeup TEXT
+);
+
+-- One bit per day per habit, see completions.CompletionLog
+CREATE TABLE IF NOT EXISTS completions (
+    task_id INTEGER PRIMARY KEY,
+    bits BLOB NOT NULL
+);
+"""
+
+# PRAGMA user_version of a database created from SCHEMA. Older databases are brought
+# up to date by running MIGRATIONS[version:] in order.
+SCHEMA_VERSION = 1
+MIGRATIONS = (
+    # 1: Up Next scheduling fields
+    "ALTER TABLE tasks ADD COLUMN priority INTEGER NOT NULL DEFAULT 1;"
+    "ALTER TABLE tasks ADD COLUMN due TEXT;",
+)
+
+# Statements are kept as constants so sqlite3's statement cache reuses the compiled form
+SQL_UPSERT_TASK = (
+    "INSERT INTO tasks (id, label, category, done, priority, due) VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(id) DO UPDATE SET label = excluded.label, category = excluded.category, done = excluded.done, "
+    "priority = excluded.priority, due = excluded.due"
+)
+SQL_DELETE_TASK = "DELETE FROM tasks WHERE id = ?"
+SQL_UPSERT_COMPLETIONS = (
+    "INSERT INTO completions (task_id, bits) VALUES (?, ?) ON CONFLICT(task_id) DO UPDATE SET bits = excluded.bits"
+)
+SQL_DELETE_COMPLETIONS = "DELETE FROM completions WHERE task_id = ?"
+SQL_SELECT_COMPLETIONS = "SELECT task_id, bits FROM completions"
+SQL_UPSERT_SLEEP = (
+    "INSERT INTO sleep_log (date, hours, quality, nap_hours, bedtime, wakeup) VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(date) DO UPDATE SET hours = excluded.hours, quality = excluded.quality, "
+    "nap_hours = excluded.nap_hours, bedtime = excluded.bedtime, wakeup = excluded.wakeup"
+)
+SQL_SELECT_TASKS = "SELECT id, label, category, done, priority, due FROM tasks ORDER BY id"
+SQL_SELECT_SLEEP = "SELECT date, hours, quality, nap_hours, bedtime, wakeup FROM sleep_log WHERE date = ?"
+SQL_SELECT_SLEEP_ALL = "SELECT date, hours, quality, nap_hours, bedtime, wakeup FROM sleep_log ORDER BY date"
+SQL_SELECT_SLEEP_RANGE = (
+    "SELECT date, hours, quality, nap_hours, bedtime, wakeup FROM sleep_log "
+    "WHERE date >= ? AND date < ? ORDER BY date"
+)
+
+FLUSH_INTERVAL = 0.25  # seconds a write may wait so bursts land in one transaction
+RETRY_DELAY = 0.5      # seconds before retrying a failed batch, doubled after each failure
+MAX_RETRY_DELAY = 30.0
+CLOSE_ATTEMPTS = 3     # tries a failing batch gets once the storage is closing
+
+
+class HabitStorage:
+    """SQLite (WAL) persistence for tasks and nightly sleep logs.
+
+    Writes are queued and applied by one writer task on the event loop, which hands
+    each batch to a worker thread so disk I/O never blocks the loop. Queued writes
+    are keyed by row, so a burst of changes to the same night collapses into the
+    last value and a whole burst is committed in one transaction.
+
+    A batch that fails to commit is put back in the queue (behind any newer write to
+    the same row) and retried with backoff. `on_write_error(ex)` is called when
+    writes start failing, and flush() raises the error while they keep failing.
+    """
+
+    def __init__(self, path, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+
+        self._read_conn = self._connect()
+        # A brand-new database has no tables yet; callers use this to seed defaults
+        self.is_new = self._read_conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks'"
+        ).fetchone() is None
+        self._migrate()
+        self._read_lock = threading.Lock()
+        self._write_conn = self._connect()
+
+        self._pending = {}   # (table, key) -> (sql, params); later writes replace earlier ones
+        self._lock = threading.Lock()
+        self._loop = None
+        self._writer = None
+        self._wake = None
+        self._flush_now = None
+        self._idle = None
+        self._closed = False
+        self.on_write_error = None   # called on the loop with the sqlite3.Error
+        self.write_error = None      # set while queued writes are failing
+        self._failures = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _migrate(self):
+        conn = self._read_conn
+        if self.is_new:
+            conn.executescript(SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            return
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for step, script in enumerate(MIGRATIONS[version:], start=version + 1):
+            logging.info(f"Migrating {self.path} to schema version {step}")
+            conn.executescript(f"BEGIN; {script} PRAGMA user_version = {step}; COMMIT;")
+        # Tables added since the last migration are still created here
+        conn.executescript(SCHEMA)
+
+    def start(self):
+        """Starts the writer task; must be called from the event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._flush_now = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._writer = self._loop.create_task(self._run_writer())
+
+    # --- Writes (queued) ---
+
+    def _enqueue(self, key, sql, params):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Storage is closed")
+            self._pending[key] = (sql, params)
+        self._loop.call_soon_threadsafe(self._wake.set)
+
+    def save_task(self, task):
+        self._enqueue(("task", task.id), SQL_UPSERT_TASK,
+                      (task.id, task.label, task.category, int(task.done), task.priority, format_due(task.due)))
+
+    def delete_task(self, task_id):
+        self._enqueue(("task", task_id), SQL_DELETE_TASK, (task_id,))
+        self._enqueue(("completions", task_id), SQL_DELETE_COMPLETIONS, (task_id,))
+
+    def save_completions(self, task_id, bits):
+        """Queues a habit's completion bitset (bytes)."""
+        self._enqueue(("completions", task_id), SQL_UPSERT_COMPLETIONS, (task_id, bits))
+
+    def save_sleep(self, date, hours, quality, nap_hours, bedtime=None, wakeup=None):
+        """Queues the sleep log for `date` (a datetime.date); bedtime/wakeup are datetime.time."""
+        self._enqueue(("sleep", date), SQL_UPSERT_SLEEP, (
+            date.isoformat(), hours, quality, nap_hours,
+            bedtime.strftime("%H:%M") if bedtime else None,
+            wakeup.strftime("%H:%M") if wakeup else None,
+        ))
+
+    async def flush(self):
+        """Waits until every queued write has been committed.
+
+        Raises the storage error if a write is failing; the writes stay queued.
+        """
+        while True:
+            with self._lock:
+                if not self._pending and self._idle.is_set():
+                    return
+            self._flush_now.set()
+            self._wake.set()
+            self._idle.clear()
+            await self._idle.wait()
+            if self.write_error is not None:
+                raise self.write_error
+
+    async def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._flush_now.set()
+        self._wake.set()
+        await self._writer
+        self._write_conn.close()
+        self._read_conn.close()
+
+    async def _run_writer(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            if self._failures:
+                delay = min(RETRY_DELAY * 2 ** (self._failures - 1), MAX_RETRY_DELAY)
+            else:
+                delay = self.flush_interval
+            if not self._flush_now.is_set():
+                # Let the rest of a burst (e.g. a slider drag) coalesce first
+                try:
+                    await asyncio.wait_for(self._flush_now.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+            self._flush_now.clear()
+
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                closed = self._closed
+            if batch:
+                self._idle.clear()
+                try:
+                    await asyncio.to_thread(self._write_batch, batch.values())
+                except sqlite3.Error as ex:
+                    self._write_failed(batch, ex)
+                else:
+                    self.write_error, self._failures = None, 0
+            self._idle.set()
+            if closed:
+                if not self._pending:
+                    return
+                if self._failures >= CLOSE_ATTEMPTS:
+                    logging.error(f"Storage closed with {len(self._pending)} unsaved writes: {self.write_error}")
+                    return
+
+    def _write_failed(self, batch, ex):
+        with self._lock:
+            # Newer writes to the same rows were queued meanwhile and win
+            for key, write in batch.items():
+                self._pending.setdefault(key, write)
+        self._failures += 1
+        self.write_error = ex
+        logging.error(f"Storage write failed (attempt {self._failures}), {len(batch)} writes kept for retry: {ex}")
+        if self._failures == 1 and self.on_write_error is not None:
+            self.on_write_error(ex)
+        self._wake.set()
+
+    def _write_batch(self, writes):
+        by_sql = {}
+        for sql, params in writes:
+            by_sql.setdefault(sql, []).append(params)
+        with self._write_conn:
+            for sql, rows in by_sql.items():
+                self._write_conn.executemany(sql, rows)
+
+    # --- Reads ---
+
+    def load_tasks(self):
+        with self._read_lock:
+            rows = self._read_conn.execute(SQL_SELECT_TASKS).fetchall()
+        return [
+            {"id": r[0], "label": r[1], "category": r[2], "done": bool(r[3]), "priority": r[4], "due": r[5]}
+            for r in rows
+        ]
+
+    def load_completions(self):
+        """Returns (task id, bitset bytes) for every habit completed at least once."""
+        with self._read_lock:
+            return self._read_conn.execute(SQL_SELECT_COMPLETIONS).fetchall()
+
+    def load_sleep(self, date):
+        with self._read_lock:
+            row = self._read_conn.execute(SQL_SELECT_SLEEP, (date.isoformat(),)).fetchone()
+        return _sleep_row(row) if row else None
+
+    def load_sleep_history(self):
+        """Returns every stored night, oldest first."""
+        with self._read_lock:
+            rows = self._read_conn.execute(SQL_SELECT_SLEEP_ALL).fetchall()
+        return [_sleep_row(r) for r in rows]
+
+    def load_sleep_range(self, start, end):
+        """Returns the sleep logs for dates in [start, end), oldest first."""
+        with self._read_lock:
+            rows = self._read_conn.execute(SQL_SELECT_SLEEP_RANGE, (start.isoformat(), end.isoformat())).fetchall()
+        return [_sleep_row(r) for r in rows]
+
+
+def _sleep_row(row):
+    return {
+        "date": row[0],
+        "hours": row[1],
+        "quality": row[2],
+        "nap_hours": row[3],
+        "bedtime": row[4],
+        "wakeup": row[5],
+    }
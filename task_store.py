@@ -0,0 +1,213 @@
+import heapq
+import itertools
+
+from models import CATEGORIES, NORMAL, Task, category_id, parse_due
+
+
+ID_BITS = 40   # low bits of an Up Next heap entry hold the task id
+ID_MASK = (1 << ID_BITS) - 1
+
+
+class UpNextQueue:
+    """Binary heap of undone task ids ordered by Task.urgency.
+
+    Each entry is a single int, urgency << ID_BITS | task id, so it sorts by urgency
+    and then by id (older habits first) and costs no tuple or bookkeeping per task.
+    An entry is live while its task is still undone with that urgency; removing or
+    rescheduling a task leaves the old entry to be skipped, and the heap is rebuilt
+    once stale entries outnumber live ones. top() walks the heap from the root, so
+    the k most urgent ids cost O(k log k) and the heap itself is never popped.
+
+    `tasks` and `undone` are the owning TaskStore's dicts; the queue only reads them.
+    """
+
+    def __init__(self, tasks, undone):
+        self._heap = []
+        self._tasks = tasks
+        self._undone = undone
+
+    def push(self, task):
+        """Queues a task under its current urgency; older entries for it go stale."""
+        heapq.heappush(self._heap, task.urgency << ID_BITS | task.id)
+        self._compact()
+
+    def discard(self, task_id):
+        """Call after a task was removed or marked done; its entries go stale."""
+        self._compact()
+
+    def _is_live(self, entry):
+        task = self._tasks.get(entry & ID_MASK)
+        return task is not None and not task.done and task.urgency == entry >> ID_BITS
+
+    def _compact(self):
+        if len(self._heap) > 2 * len(self._undone) + 32:
+            # The set also drops duplicates left by a task returning to an earlier urgency
+            self._heap = list({entry for entry in self._heap if self._is_live(entry)})
+            heapq.heapify(self._heap)
+
+    def top(self, k):
+        """Returns up to `k` task ids, most urgent first."""
+        heap = self._heap
+        ids = []
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier and len(ids) < k:
+            entry, index = heapq.heappop(frontier)
+            # Duplicates of one entry pop back to back
+            if self._is_live(entry) and (not ids or ids[-1] != entry & ID_MASK):
+                ids.append(entry & ID_MASK)
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+        return ids
+
+
+class TaskStore:
+    """Indexed storage for movement tasks.
+
+    Tasks are models.Task objects keyed by a stable integer id.
+    The done/undone partitions, per-category counts and the Up Next queue are kept
+    up to date on every mutation, so views can read totals and the most urgent
+    undone tasks without scanning.
+    """
+
+    def __init__(self, tasks=()):
+        self._next_id = 1
+        self._tasks = {}      # id -> task, in insertion order
+        self._undone = {}     # id -> None, used as an ordered set
+        self._done = {}       # id -> None, used as an ordered set
+        self._category_totals = [0] * len(CATEGORIES)   # indexed by category id
+        self._category_done = [0] * len(CATEGORIES)
+        self._up_next = UpNextQueue(self._tasks, self._undone)
+
+        # `tasks` are rows as saved by storage: dicts {"id", "label", "category", "done", "priority", "due"}
+        for task in tasks:
+            self.add(
+                task["label"], task.get("category", "Others"), task.get("done", False), task.get("id"),
+                task.get("priority", NORMAL), parse_due(task.get("due")),
+            )
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __iter__(self):
+        return iter(self._tasks.values())
+
+    def __contains__(self, task_id):
+        return task_id in self._tasks
+
+    def get(self, task_id):
+        return self._tasks.get(task_id)
+
+    # --- Mutations ---
+
+    def add(self, label, category="Others", done=False, task_id=None, priority=NORMAL, due=None):
+        """Adds a task and returns it. `task_id` keeps ids stable when reloading saved tasks.
+
+        `due` is minutes after midnight or None.
+        """
+        if task_id is None:
+            task_id = self._next_id
+        elif task_id in self._tasks:
+            raise ValueError(f"Duplicate task id: {task_id}")
+        # Keep generated ids ahead of any explicitly supplied one
+        self._next_id = max(self._next_id, task_id + 1)
+
+        task = Task(task_id, label, category_id(category), bool(done), priority, due)
+        self._tasks[task_id] = task
+        self._category_totals[task.category_id] += 1
+        if task.done:
+            self._done[task_id] = None
+            self._category_done[task.category_id] += 1
+        else:
+            self._undone[task_id] = None
+            self._up_next.push(task)
+        return task
+
+    def set_done(self, task_id, done):
+        """Marks a task done/undone and returns it (None for unknown ids)."""
+        task = self._tasks.get(task_id)
+        if task is None or task.done == bool(done):
+            return task
+
+        task.done = bool(done)
+        if task.done:
+            del self._undone[task_id]
+            self._done[task_id] = None
+            self._category_done[task.category_id] += 1
+            self._up_next.discard(task_id)
+        else:
+            # Re-opened tasks go to the back of the To Do partition
+            del self._done[task_id]
+            self._undone[task_id] = None
+            self._category_done[task.category_id] -= 1
+            self._up_next.push(task)
+        return task
+
+    def reschedule(self, task_id, priority, due):
+        """Sets a task's priority and due time (minutes or None) and re-queues it; returns it."""
+        task = self._tasks.get(task_id)
+        if task is None:
+            return None
+        task.priority = priority
+        task.due = due
+        if not task.done:
+            self._up_next.push(task)
+        return task
+
+    def set_streak(self, task_id, days):
+        """Records how many days in a row a task has been done; longer streaks rank sooner."""
+        task = self._tasks.get(task_id)
+        if task is None or task.streak == days:
+            return task
+        task.streak = days
+        if not task.done:
+            self._up_next.push(task)
+        return task
+
+    def remove(self, task_id):
+        """Removes a task and returns it (None for unknown ids)."""
+        task = self._tasks.pop(task_id, None)
+        if task is None:
+            return None
+
+        self._category_totals[task.category_id] -= 1
+        if task.done:
+            del self._done[task_id]
+            self._category_done[task.category_id] -= 1
+        else:
+            del self._undone[task_id]
+            self._up_next.discard(task_id)
+        return task
+
+    # --- Queries ---
+
+    @property
+    def done_count(self):
+        return len(self._done)
+
+    @property
+    def progress(self):
+        return len(self._done) / len(self._tasks) if self._tasks else 0
+
+    def undone(self):
+        return [self._tasks[i] for i in self._undone]
+
+    def done(self):
+        return [self._tasks[i] for i in self._done]
+
+    def count(self, done):
+        return len(self._done) if done else len(self._undone)
+
+    def window(self, done, start, stop):
+        """Returns the tasks at positions [start, stop) of the done or undone partition."""
+        ids = self._done if done else self._undone
+        return [self._tasks[i] for i in itertools.islice(ids, start, stop)]
+
+    def next_undone(self, k=3):
+        """Returns the `k` most urgent undone tasks (see Task.urgency) in O(k log k)."""
+        return [self._tasks[i] for i in self._up_next.top(k)]
+
+    def category_counts(self, category):
+        """Returns (done, total) for a category name."""
+        index = category_id(category)
+        return self._category_done[index], self._category_totals[index]
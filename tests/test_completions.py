@@ -0,0 +1,172 @@
+import datetime
+import random
+
+import pytest
+
+from completions import EPOCH, CategoryIndex, CompletionLog, DayCounter, day_number
+from models import CATEGORIES
+from task_store import TaskStore
+
+
+def day(n):
+    return EPOCH + datetime.timedelta(days=n)
+
+
+def log_with(task_id, days):
+    log = CompletionLog()
+    for n in days:
+        log.mark(task_id, day(n))
+    return log
+
+
+def test_mark_sets_bits_and_reports_changes():
+    log = CompletionLog()
+    assert log.mark(1, day(9))
+    assert not log.mark(1, day(9))
+    assert log.bits(1) == bytes([0, 0b10])
+    assert log.is_done(1, day(9)) and not log.is_done(1, day(8))
+
+
+def test_clearing_past_the_end_of_the_array_changes_nothing():
+    log = log_with(1, [3])
+    assert not log.mark(1, day(100), done=False)
+    assert log.bits(1) == bytes([0b1000])
+    assert not log.mark(2, day(5), done=False)
+    assert 2 not in log
+
+
+def test_clearing_a_set_day_keeps_the_array():
+    log = log_with(1, [3, 15])
+    assert log.mark(1, day(15), done=False)
+    assert log.bits(1) == bytes([0b1000, 0])
+    assert log.count(1, day(0), day(30)) == 1
+
+
+def test_days_before_epoch_are_rejected():
+    with pytest.raises(ValueError):
+        CompletionLog().mark(1, EPOCH - datetime.timedelta(days=1))
+
+
+def test_is_done_out_of_range():
+    log = log_with(1, [0])
+    assert not log.is_done(1, EPOCH - datetime.timedelta(days=1))
+    assert not log.is_done(1, day(800))
+
+
+def test_streak_at_the_epoch():
+    log = log_with(1, [0])
+    assert log.streak(1, day(0)) == 1
+    assert log.streak(1, day(1)) == 0
+    assert log.streak(2, day(0)) == 0
+    assert log.streak(1, EPOCH - datetime.timedelta(days=1)) == 0
+    # Every day since the epoch: the run is bounded by the start of the log
+    log = log_with(1, range(20))
+    assert log.streak(1, day(19)) == 20
+
+
+@pytest.mark.parametrize("first, last", [(5, 7), (5, 8), (7, 8), (8, 15), (8, 16), (3, 24), (15, 16)])
+def test_streak_across_byte_boundaries(first, last):
+    log = log_with(1, range(first, last + 1))
+    assert log.streak(1, day(last)) == last - first + 1
+    assert log.streak(1, day(last - 1)) == last - first
+    assert log.streak(1, day(last + 1)) == 0
+
+
+def test_count_and_rate_windows():
+    log = log_with(1, [6, 7, 8, 9, 20])
+    assert log.count(1, day(7), day(8)) == 2
+    assert log.count(1, day(0), day(100)) == 5
+    assert log.count(1, day(21), day(100)) == 0
+    assert log.rate(1, day(6), day(9)) == 1.0
+    assert log.rate(1, day(9), day(6)) == 0.0
+
+
+def test_round_trip_through_storage_rows():
+    log = log_with(7, [0, 8, 365])
+    restored = CompletionLog([(7, log.bits(7))])
+    assert restored.days_mask(7) == (1 << 0) | (1 << 8) | (1 << 365)
+    assert day_number(day(365)) == 365
+
+
+# --- Category index ---
+
+def counter_values(counter, days):
+    return [counter.total(1 << d) for d in range(days)]
+
+
+def test_day_counter_subtract_borrows_across_planes():
+    counter = DayCounter()
+    for _ in range(4):
+        counter.add(0b101)   # days 0 and 2 reach 4 = 0b100
+    counter.add(0b010)
+    assert counter_values(counter, 3) == [4, 1, 4]
+    counter.subtract(0b001)   # 4 - 1 borrows through two empty planes
+    assert counter_values(counter, 3) == [3, 1, 4]
+    counter.subtract(0b111)
+    assert counter_values(counter, 3) == [2, 0, 3]
+    assert counter.total(0b111) == 5
+
+
+def test_day_counter_matches_plain_counts():
+    rng = random.Random(3)
+    counter, counts = DayCounter(), [0] * 64
+    for _ in range(2000):
+        days = rng.getrandbits(64)
+        if rng.random() < 0.5:
+            counter.add(days)
+            counts = [c + (days >> d & 1) for d, c in enumerate(counts)]
+        else:
+            # Only subtract from days that have something to take away
+            days &= sum(1 << d for d, c in enumerate(counts) if c)
+            counter.subtract(days)
+            counts = [c - (days >> d & 1) for d, c in enumerate(counts)]
+    assert counter_values(counter, 64) == counts
+    assert counter.total((1 << 64) - 1) == sum(counts)
+
+
+def make_index():
+    store = TaskStore()
+    walk = store.add("Walk", "Exercise")
+    run = store.add("Run", "Exercise")
+    read = store.add("Read", "Mental Exercise")
+    log = CompletionLog()
+    for task, days in ((walk, [0, 1, 2, 3]), (run, [2, 3]), (read, [3])):
+        for n in days:
+            log.mark(task.id, day(n))
+    return store, log, CategoryIndex(store, log)
+
+
+EXERCISE, MENTAL = CATEGORIES.index("Exercise"), CATEGORIES.index("Mental Exercise")
+
+
+def test_category_index_built_from_log():
+    _, _, index = make_index()
+    assert index.completions(EXERCISE, day(0), day(3)) == 6
+    assert index.completions(EXERCISE, day(2), day(2)) == 2
+    assert index.completions(MENTAL, day(0), day(3)) == 1
+    assert index.completions(EXERCISE, day(4), day(10)) == 0
+    assert index.rate(EXERCISE, day(0), day(3)) == 6 / 8
+    assert index.rate(CATEGORIES.index("Chores"), day(0), day(3)) == 0.0
+
+
+def test_category_index_follows_marks_and_removals():
+    store, log, index = make_index()
+    run = store.get(2)
+    if log.mark(run.id, day(2), done=False):
+        index.mark(run.category_id, day(2), False)
+    assert index.completions(EXERCISE, day(2), day(2)) == 1
+    index.remove(run.category_id, log.days_mask(run.id))
+    log.remove(run.id)
+    store.remove(run.id)
+    assert index.completions(EXERCISE, day(0), day(3)) == 4
+    rebuilt = CategoryIndex(store, log)
+    assert all(
+        rebuilt.completions(c, day(0), day(10)) == index.completions(c, day(0), day(10))
+        for c in range(len(CATEGORIES))
+    )
+
+
+def test_category_trend_buckets_end_on_the_given_day():
+    _, _, index = make_index()
+    assert index.trend(EXERCISE, day(3), 2, 2) == [2, 4]
+    assert index.trend(EXERCISE, day(3), 1, 4) == [1, 1, 2, 2]
@@ -0,0 +1,232 @@
+import asyncio
+import threading
+import types
+
+from events import Debounce, FrameBatcher, Mailbox, Throttle, coalesce_slider
+
+FRAME = 0.02
+INTERVAL = 0.05
+
+
+class FakePage:
+    def __init__(self):
+        self.updates = []
+
+    def update(self, *controls):
+        self.updates.append(controls)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+# --- Mailbox ---
+
+async def drained(mailbox):
+    while mailbox.applied < mailbox.posted:
+        await asyncio.sleep(0.001)
+
+
+def test_mailbox_keeps_each_producers_order_and_loses_nothing():
+    producers, messages = 8, 2000
+    received = []
+
+    async def scenario():
+        mailbox = Mailbox(asyncio.get_running_loop())
+        on_loop = []
+
+        def apply(producer, n):
+            on_loop.append(threading.current_thread() is threading.main_thread())
+            received.append((producer, n))
+
+        def produce(producer):
+            for n in range(messages):
+                mailbox.post(apply, producer, n)
+
+        threads = [threading.Thread(target=produce, args=(p,)) for p in range(producers)]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            await asyncio.sleep(0.001)
+        await asyncio.wait_for(drained(mailbox), 5)
+        assert mailbox.posted == mailbox.applied == producers * messages
+        assert all(on_loop)
+
+    asyncio.run(scenario())
+    assert len(received) == producers * messages
+    for producer in range(producers):
+        assert [n for p, n in received if p == producer] == list(range(messages))
+
+
+def test_mailbox_awaits_coroutines_in_order_and_survives_failures():
+    events = []
+
+    async def slow(name):
+        await asyncio.sleep(0.01)
+        events.append(name)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        mailbox = Mailbox(asyncio.get_running_loop())
+        mailbox.post(slow, "first")
+        mailbox.post(fail)
+        mailbox.post(events.append, "second")
+        await asyncio.wait_for(drained(mailbox), 5)
+
+    asyncio.run(scenario())
+    assert events == ["first", "second"]
+
+
+# --- FrameBatcher ---
+
+def test_marks_within_a_frame_coalesce_into_one_targeted_update():
+    async def scenario():
+        page = FakePage()
+        batcher = FrameBatcher(page, FRAME)
+        batcher.mark("a")
+        batcher.mark("b", "a")
+        batcher.mark("c")
+        assert page.updates == []
+        await asyncio.sleep(FRAME * 3)
+        return page, batcher
+
+    page, batcher = run(scenario())
+    assert page.updates == [("a", "b", "c")]
+    assert (batcher.requested, batcher.sent, batcher.saved) == (3, 1, 2)
+
+
+def test_a_whole_page_mark_sends_a_full_update():
+    async def scenario():
+        page = FakePage()
+        batcher = FrameBatcher(page, FRAME)
+        batcher.mark("a")
+        batcher.mark()
+        await asyncio.sleep(FRAME * 3)
+        batcher.mark("b")
+        await asyncio.sleep(FRAME * 3)
+        return page
+
+    assert run(scenario()).updates == [(), ("b",)]
+
+
+def test_flush_sends_now_and_cancels_the_frame():
+    async def scenario():
+        page = FakePage()
+        batcher = FrameBatcher(page, FRAME)
+        batcher.mark("a")
+        batcher.flush()
+        assert page.updates == [("a",)]
+        await asyncio.sleep(FRAME * 3)
+        batcher.flush()   # nothing pending
+        return page
+
+    assert run(scenario()).updates == [("a",)]
+
+
+# --- Throttle / Debounce ---
+
+def test_throttle_runs_the_leading_and_the_latest_trailing_call():
+    calls = []
+
+    async def scenario():
+        throttle = Throttle(calls.append, INTERVAL)
+        for e in (1, 2, 3):
+            throttle(e)
+        assert calls == [1]
+        await asyncio.sleep(INTERVAL * 2)
+        assert calls == [1, 3]
+        await asyncio.sleep(INTERVAL * 2)
+
+    run(scenario())
+    assert calls == [1, 3]
+
+
+def test_throttle_without_leading_waits_for_the_interval():
+    calls = []
+
+    async def scenario():
+        throttle = Throttle(calls.append, INTERVAL, leading=False)
+        throttle(1)
+        throttle(2)
+        assert calls == []
+        await asyncio.sleep(INTERVAL * 2)
+
+    run(scenario())
+    assert calls == [2]
+
+
+def test_throttle_without_trailing_drops_the_rest_of_a_burst():
+    calls = []
+
+    async def scenario():
+        throttle = Throttle(calls.append, INTERVAL, trailing=False)
+        for e in (1, 2, 3):
+            throttle(e)
+        await asyncio.sleep(INTERVAL * 2)
+        throttle(4)
+
+    run(scenario())
+    assert calls == [1, 4]
+
+
+def test_flush_runs_the_pending_trailing_call_once():
+    calls = []
+
+    async def scenario():
+        throttle = Throttle(calls.append, INTERVAL)
+        throttle(1)
+        throttle(2)
+        throttle.flush()
+        assert calls == [1, 2]
+        await asyncio.sleep(INTERVAL * 2)
+        throttle.flush()
+
+    run(scenario())
+    assert calls == [1, 2]
+
+
+def test_debounce_fires_once_after_events_stop():
+    calls = []
+
+    async def scenario():
+        debounce = Debounce(calls.append, INTERVAL)
+        for e in (1, 2, 3):
+            debounce(e)
+            await asyncio.sleep(INTERVAL / 4)
+        assert calls == []
+        await asyncio.sleep(INTERVAL * 2)
+
+    run(scenario())
+    assert calls == [3]
+
+
+def test_coalesce_slider_flushes_the_pending_change_before_commit():
+    calls = []
+
+    async def scenario():
+        slider = types.SimpleNamespace(on_change=None, on_change_end=None)
+        coalesce_slider(slider, lambda e: calls.append(("change", e)), lambda e: calls.append(("commit", e)),
+                        interval=INTERVAL)
+        for e in (1, 2, 3):
+            await slider.on_change(e)
+        await slider.on_change_end(3)
+        await asyncio.sleep(INTERVAL * 2)
+
+    run(scenario())
+    assert calls == [("change", 1), ("change", 3), ("commit", 3)]
+
+
+def test_coalesce_slider_debounced():
+    calls = []
+
+    async def scenario():
+        slider = types.SimpleNamespace(on_change=None, on_change_end=None)
+        coalesce_slider(slider, calls.append, interval=INTERVAL, debounce=True)
+        await slider.on_change(1)
+        await slider.on_change(2)
+        await asyncio.sleep(INTERVAL * 2)
+
+    run(scenario())
+    assert calls == [2]
@@ -0,0 +1,151 @@
+import asyncio
+import types
+
+import pytest
+
+import scheduler
+from scheduler import TickScheduler
+
+
+class FakeClock:
+    """Stands in for time.monotonic() and asyncio.sleep(); time only moves on advance()."""
+
+    def __init__(self, now=100.0):
+        self.now = now
+        self._sleepers = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, delay):
+        future = asyncio.get_running_loop().create_future()
+        self._sleepers.append((self.now + delay, future))
+        await future
+
+    async def advance(self, to):
+        """Moves the clock to `to` (possibly past a deadline, like a late callback) and runs what is due."""
+        await settle()
+        self.now = to
+        for deadline, future in list(self._sleepers):
+            if deadline <= to:
+                self._sleepers.remove((deadline, future))
+                future.set_result(None)
+        await settle()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scheduler, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(scheduler, "asyncio", types.SimpleNamespace(sleep=clock.sleep, Event=asyncio.Event))
+    return clock
+
+
+def make_scheduler(clock, ticks=None):
+    tasks = []
+
+    def run_task(fn, *args):
+        tasks.append(asyncio.get_running_loop().create_task(fn(*args)))
+
+    on_tick = (lambda: ticks.append(clock.now)) if ticks is not None else (lambda: None)
+    return TickScheduler(run_task, on_tick, interval=1.0)
+
+
+def job(clock, steps, count=None):
+    n = 0
+    while count is None or n < count:
+        steps.append(clock.now)
+        n += 1
+        yield
+
+
+def test_first_step_waits_one_interval(clock):
+    steps = []
+
+    async def scenario():
+        clocked = make_scheduler(clock)
+        handle = clocked.schedule(job(clock, steps, 3))
+        await settle()
+        assert steps == []
+        for t in (101, 102, 103, 104):
+            await clock.advance(t)
+        assert handle.finished.is_set()
+        await clock.advance(105)   # the clock stops on the first tick without jobs
+        assert not clocked._running
+
+    asyncio.run(scenario())
+    assert steps == [101, 102, 103]
+
+
+def test_immediate_first_step(clock):
+    steps = []
+
+    async def scenario():
+        handle = make_scheduler(clock).schedule(job(clock, steps, 3), immediate=True)
+        await settle()
+        for t in (101, 102, 103):
+            await clock.advance(t)
+        await handle
+
+    asyncio.run(scenario())
+    assert steps == [100, 101, 102]
+
+
+def test_cancel_stops_the_job_and_the_clock(clock):
+    steps, ticks = [], []
+
+    async def scenario():
+        clocked = make_scheduler(clock, ticks)
+        handle = clocked.schedule(job(clock, steps))
+        await clock.advance(101)
+        await clock.advance(102)
+        handle.cancel()
+        await handle
+        await clock.advance(103)
+        await clock.advance(104)
+        assert not clocked._running
+
+    asyncio.run(scenario())
+    assert steps == [101, 102]
+    assert ticks == [101, 102]
+
+
+@pytest.mark.parametrize("joined_at, expected", [
+    (100.2, [100.2, 101, 102]),   # next tick is far enough away
+    (100.7, [100.7, 102, 103]),   # next tick is too close, so it is skipped
+])
+def test_immediate_job_joining_a_running_clock(clock, joined_at, expected):
+    steps = []
+
+    async def scenario():
+        clocked = make_scheduler(clock)
+        clocked.schedule(job(clock, [], 10))
+        await clock.advance(joined_at)
+        handle = clocked.schedule(job(clock, steps, 3), immediate=True)
+        assert handle.skip_tick == (joined_at == 100.7)
+        await settle()
+        for t in range(101, 105):
+            await clock.advance(t)
+
+    asyncio.run(scenario())
+    assert steps == pytest.approx(expected)
+
+
+def test_late_ticks_do_not_drift_or_burst(clock):
+    steps = []
+
+    async def scenario():
+        make_scheduler(clock).schedule(job(clock, steps, 4))
+        await clock.advance(101.3)   # 0.3 s late: the next tick is still due at 102
+        await clock.advance(102)
+        await clock.advance(104.5)   # missed 103 and 104: run once, then carry on at 105
+        await clock.advance(104.9)
+        await clock.advance(105)
+
+    asyncio.run(scenario())
+    assert steps == pytest.approx([101.3, 102, 104.5, 105])
@@ -0,0 +1,89 @@
+import datetime
+import math
+
+import pytest
+
+import sleep_analytics
+from sleep_analytics import SleepReport, analyze
+from sleep_history import SleepHistory
+
+END = datetime.date(2024, 3, 31)
+
+
+def history_of(nights):
+    """`nights` are (days before END, hours, quality, nap hours, bedtime, wakeup)."""
+    history = SleepHistory()
+    for days_back, hours, quality, nap_hours, bedtime, wakeup in nights:
+        history.record(END - datetime.timedelta(days=days_back), hours, quality, nap_hours, bedtime, wakeup)
+    return history
+
+
+def gappy_year():
+    return [
+        (i, 4 + i % 6, 1 + i % 5, (i % 4) * 0.25, f"{(21 + i % 5) % 24:02d}:{i % 60:02d}", f"{5 + i % 4:02d}:30")
+        for i in range(365) if i % 7 != 3
+    ]
+
+
+HISTORIES = {
+    "empty": ([], 30),
+    "single night": ([(0, 7.5, 4, 0.5, "23:30", "07:00")], 7),
+    "flat hours": ([(i, 8.0, 1 + i % 5, 0.0, "23:00", "07:00") for i in range(10)], 10),
+    "across midnight": ([(i, 6 + i % 3, 1 + i % 5, 0.5 * (i % 2), ("23:40", "00:20")[i % 2], None)
+                         for i in range(20)], 30),
+    "gappy year": (gappy_year(), 365),
+}
+
+
+def report(history, days):
+    return analyze(history, END - datetime.timedelta(days=days - 1), END)
+
+
+def assert_same(expected, actual):
+    if isinstance(expected, list):
+        assert len(expected) == len(actual)
+        for a, b in zip(expected, actual):
+            assert_same(a, b)
+    elif isinstance(expected, float):
+        assert actual == pytest.approx(expected, rel=1e-9, abs=1e-9)
+    else:
+        assert actual == expected
+
+
+@pytest.mark.parametrize("name", HISTORIES)
+def test_numpy_and_pure_python_paths_agree(name, monkeypatch):
+    np = pytest.importorskip("numpy")
+    nights, days = HISTORIES[name]
+    history = history_of(nights)
+
+    monkeypatch.setattr(sleep_analytics, "np", np)
+    with_numpy = report(history, days)
+    monkeypatch.setattr(sleep_analytics, "np", None)
+    pure_python = report(history, days)
+
+    for field in SleepReport.__slots__:
+        assert_same(getattr(pure_python, field), getattr(with_numpy, field))
+
+
+@pytest.mark.parametrize("numpy", [False, True])
+def test_empty_and_single_night(numpy, monkeypatch):
+    monkeypatch.setattr(sleep_analytics, "np", pytest.importorskip("numpy") if numpy else None)
+
+    empty = report(SleepHistory(), 7)
+    assert empty.nights == 0 and empty.mean_hours is None and empty.debt_hours == 0
+    assert empty.rolling_hours == [None] * 7
+    assert empty.bedtime_spread is None and empty.quality_correlation is None
+
+    single = report(history_of(HISTORIES["single night"][0]), 7)
+    assert single.nights == 1 and single.mean_hours == 7.5 and single.debt_hours == 0.5
+    assert single.rolling_hours[-1] == 7.5 and single.rolling_hours[:-1] == [None] * 6
+    assert single.bedtime_spread is None and single.nap_days == 1
+    assert single.hours_after_nap is None
+
+
+def test_spread_wraps_around_midnight(monkeypatch):
+    monkeypatch.setattr(sleep_analytics, "np", None)
+    nights, days = HISTORIES["across midnight"]
+    spread = report(history_of(nights), days).bedtime_spread
+    # 23:40 and 00:20 are 40 minutes apart, so the spread is about 20 minutes, not hours
+    assert 19 < spread < 21 and not math.isnan(spread)
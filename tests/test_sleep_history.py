@@ -0,0 +1,66 @@
+import datetime
+
+import pytest
+
+from sleep_history import SleepHistory
+
+D = datetime.date
+
+
+def test_record_stores_the_night_and_rolls_it_up():
+    history = SleepHistory()
+    entry = history.record(D(2024, 3, 5), 7.5, 4, 0.5, "23:00", datetime.time(6, 30))
+    assert history.night(D(2024, 3, 5)) is entry
+    assert entry.bedtime == datetime.time(23, 0) and entry.wakeup == datetime.time(6, 30)
+    week, month = history.week(D(2024, 3, 5)), history.month(D(2024, 3, 5))
+    for rollup in (week, month):
+        assert rollup.nights == 1
+        assert rollup.mean_hours == 7.5 and rollup.mean_quality == 4 and rollup.nap_total == 0.5
+
+
+def test_overwriting_a_night_replaces_it_in_the_rollups():
+    history = SleepHistory()
+    history.record(D(2024, 3, 5), 6.0, 2, 1.0)
+    history.record(D(2024, 3, 6), 8.0, 4, 0.0)
+    history.record(D(2024, 3, 5), 7.0, 5, 0.0)
+    assert len(history) == 2
+    assert history.night(D(2024, 3, 5)).hours == 7.0
+    for rollup in (history.week(D(2024, 3, 5)), history.month(D(2024, 3, 5))):
+        assert rollup.nights == 2
+        assert rollup.hours_total == pytest.approx(15.0)
+        assert rollup.quality_total == 9
+        assert rollup.nap_total == pytest.approx(0.0)
+
+
+def test_nights_either_side_of_a_week_boundary_land_in_different_weeks():
+    history = SleepHistory()
+    history.record(D(2024, 3, 3), 6.0, 2, 0.0)   # Sunday, ISO week 9
+    history.record(D(2024, 3, 4), 8.0, 4, 0.0)   # Monday, ISO week 10
+    assert history.week(D(2024, 3, 3)).mean_hours == 6.0
+    assert history.week(D(2024, 3, 4)).mean_hours == 8.0
+    assert history.month(D(2024, 3, 1)).nights == 2
+
+
+def test_nights_either_side_of_a_month_boundary_share_the_week():
+    history = SleepHistory()
+    history.record(D(2024, 2, 29), 6.0, 2, 0.0)
+    history.record(D(2024, 3, 1), 8.0, 4, 0.0)
+    assert history.month(D(2024, 2, 1)).mean_hours == 6.0
+    assert history.month(D(2024, 3, 31)).mean_hours == 8.0
+    assert history.week(D(2024, 2, 29)).nights == 2
+
+
+def test_iso_week_spanning_new_year():
+    history = SleepHistory()
+    history.record(D(2024, 12, 30), 6.0, 3, 0.0)   # ISO week 1 of 2025
+    history.record(D(2025, 1, 2), 8.0, 3, 0.0)
+    assert history.week(D(2024, 12, 30)).nights == 2
+    assert history.month(D(2024, 12, 1)).nights == 1
+    assert history.month(D(2025, 1, 1)).nights == 1
+
+
+def test_empty_periods_have_no_means():
+    history = SleepHistory([{"date": "2024-03-05", "hours": 7.0, "quality": 3, "nap_hours": 0.0}])
+    assert history.week(D(2024, 4, 1)).mean_hours is None
+    assert history.month(D(2024, 4, 1)).mean_quality is None
+    assert [day for day, entry in history.last_nights(D(2024, 3, 6), 3) if entry] == [D(2024, 3, 5)]
@@ -0,0 +1,59 @@
+import datetime
+import random
+
+import pytest
+
+import sleep_rules
+
+T = datetime.time
+
+
+def legacy_feedback(bedtime, wakeup, nap_hours):
+    """The Sleep tab's original inline branching, which the rule tables replace."""
+    sleep_hours = None
+    risky = False
+    if bedtime and wakeup:
+        today = datetime.date.today()
+        b_dt = datetime.datetime.combine(today, bedtime)
+        w_dt = datetime.datetime.combine(today, wakeup)
+        if w_dt <= b_dt:
+            w_dt += datetime.timedelta(days=1)
+        sleep_hours = min(max((w_dt - b_dt).total_seconds() / 3600, 0), sleep_rules.MAX_SLEEP_HOURS)
+        risky = 2 <= bedtime.hour < 6 and wakeup.hour >= 13
+
+    mins = int(nap_hours * 60)
+    if mins > 30:
+        nap = "⚠️ Short naps are better. Long naps (>30m) cause inertia."
+    elif mins >= 15:
+        nap = "Power naps (15-30m) boost energy."
+    elif mins > 0:
+        nap = "Too short for benefit. Aim for 15-30m."
+    else:
+        nap = ""
+    return sleep_hours, risky, nap
+
+
+def random_states(count):
+    rng = random.Random(1)
+    return [
+        (T(rng.randrange(24), rng.randrange(60)), T(rng.randrange(24), rng.randrange(60)), rng.randrange(37) / 12)
+        for _ in range(count)
+    ]
+
+
+EDGE_CASES = [(None, None, 0.0), (T(3), None, 0.25), (T(23), T(23), 3.0), (T(2), T(13), 0.5), (T(6), T(13), 0.3)]
+
+
+def test_rule_tables_match_the_inline_branching():
+    for state in EDGE_CASES + random_states(10_000):
+        hours, risky, nap = legacy_feedback(*state)
+        schedule, nap_feedback = sleep_rules.evaluate(*state)
+        assert bool(schedule) == risky, state
+        assert nap_feedback.message == nap, state
+        assert sleep_rules.sleep_duration(*state[:2]) == pytest.approx(hours), state
+
+
+def test_sleep_duration_stays_within_the_hours_slider():
+    assert sleep_rules.sleep_duration(T(20), T(19, 30)) == sleep_rules.MAX_SLEEP_HOURS
+    assert sleep_rules.sleep_duration(T(23), T(23)) == sleep_rules.MAX_SLEEP_HOURS
+    assert sleep_rules.sleep_duration(T(23), T(6, 30)) == 7.5
@@ -0,0 +1,163 @@
+import asyncio
+import datetime
+import logging
+import sqlite3
+
+import pytest
+
+import storage
+from storage import HabitStorage
+from task_store import TaskStore
+
+NIGHT = datetime.date(2024, 3, 1)
+
+
+def failing_writes(fail_times):
+    """A _write_batch stand-in that fails `fail_times` times, then does nothing."""
+    calls = []
+
+    def write_batch(writes):
+        calls.append(list(writes))
+        if len(calls) <= fail_times:
+            raise sqlite3.OperationalError("database is locked")
+
+    return write_batch, calls
+
+
+def run(coro_fn, path, **kwargs):
+    async def main():
+        db = HabitStorage(str(path), **kwargs)
+        db.start()
+        try:
+            return await coro_fn(db)
+        finally:
+            await db.close()
+    return asyncio.run(main())
+
+
+def test_writes_to_one_row_coalesce_into_one_batch(tmp_path):
+    batches = []
+
+    async def scenario(db):
+        write_batch = db._write_batch
+        db._write_batch = lambda writes: (batches.append(list(writes)), write_batch(writes))
+        for hours in (6.0, 6.5, 7.0, 7.5):
+            db.save_sleep(NIGHT, hours, 3, 0.0)
+        await db.flush()
+        return db.load_sleep(NIGHT)
+
+    night = run(scenario, tmp_path / "habits.db")
+    assert len(batches) == 1 and len(batches[0]) == 1
+    assert night["hours"] == 7.5
+
+
+def test_failed_batch_is_retried_with_backoff(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "RETRY_DELAY", 0.01)
+    monkeypatch.setattr(storage, "MAX_RETRY_DELAY", 0.03)
+    waits = []
+    wait_for = asyncio.wait_for
+
+    def recording_wait_for(aw, timeout):
+        waits.append(timeout)
+        return wait_for(aw, timeout)
+
+    monkeypatch.setattr(storage.asyncio, "wait_for", recording_wait_for)
+    errors = []
+
+    async def scenario(db):
+        db.on_write_error = errors.append
+        db._write_batch, calls = failing_writes(4)
+        db.save_sleep(NIGHT, 7.0, 3, 0.0)
+        while len(calls) < 5:
+            await asyncio.sleep(0.005)
+        await db.flush()
+        return calls
+
+    calls = run(scenario, tmp_path / "habits.db", flush_interval=0.001)
+    # The first wait is the normal coalescing delay, then the delay doubles up to the cap
+    assert waits[:5] == [0.001, 0.01, 0.02, 0.03, 0.03]
+    assert len(errors) == 1   # reported once, not on every retry
+    assert all(batch == calls[0] for batch in calls)
+
+
+def test_newer_write_wins_over_a_retried_one(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "RETRY_DELAY", 0.01)
+
+    async def scenario(db):
+        write_batch = db._write_batch
+        db._write_batch, calls = failing_writes(1)
+        db.save_sleep(NIGHT, 6.0, 3, 0.0)
+        while not calls:
+            await asyncio.sleep(0.005)
+        db.save_sleep(NIGHT, 8.0, 4, 0.0)
+        db._write_batch = write_batch
+        await db.flush()
+        return db.load_sleep(NIGHT)
+
+    night = run(scenario, tmp_path / "habits.db", flush_interval=0.001)
+    assert night["hours"] == 8.0 and night["quality"] == 4
+
+
+def test_flush_raises_while_writes_fail_and_keeps_them_queued(tmp_path):
+    async def scenario(db):
+        write_batch = db._write_batch
+        db._write_batch, _ = failing_writes(1)
+        task = TaskStore().add("Walk", "Exercise")
+        db.save_task(task)
+        with pytest.raises(sqlite3.OperationalError):
+            await db.flush()
+        assert db.write_error is not None
+        db._write_batch = write_batch
+        await db.flush()
+        assert db.write_error is None
+        return db.load_tasks()
+
+    tasks = run(scenario, tmp_path / "habits.db")
+    assert [task["label"] for task in tasks] == ["Walk"]
+
+
+def test_close_gives_up_after_close_attempts(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(storage, "RETRY_DELAY", 0.001)
+
+    async def main():
+        db = HabitStorage(str(tmp_path / "habits.db"))
+        db.start()
+        db._write_batch, calls = failing_writes(fail_times=100)
+        db.save_sleep(NIGHT, 7.0, 3, 0.0)
+        await asyncio.wait_for(db.close(), 5)
+        with pytest.raises(RuntimeError):
+            db.save_sleep(NIGHT, 8.0, 3, 0.0)
+        return calls
+
+    with caplog.at_level(logging.ERROR):
+        calls = asyncio.run(main())
+    assert len(calls) == storage.CLOSE_ATTEMPTS
+    assert "Storage closed with 1 unsaved writes" in caplog.text
+
+
+def test_old_database_is_migrated(tmp_path):
+    path = str(tmp_path / "habits.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE tasks (id INTEGER PRIMARY KEY, label TEXT NOT NULL, category TEXT NOT NULL,
+                            done INTEGER NOT NULL DEFAULT 0);
+        INSERT INTO tasks (id, label, category, done) VALUES (1, 'Walk', 'Exercise', 1);
+    """)
+    conn.commit()
+    conn.close()
+
+    db = HabitStorage(path)
+    assert not db.is_new
+    assert db.load_tasks() == [
+        {"id": 1, "label": "Walk", "category": "Exercise", "done": True, "priority": 1, "due": None},
+    ]
+    # Tables added after version 0 are created too
+    assert db.load_completions() == [] and db.load_sleep_history() == []
+    assert db._read_conn.execute("PRAGMA user_version").fetchone()[0] == storage.SCHEMA_VERSION
+    db._write_conn.close()
+    db._read_conn.close()
+
+    reopened = HabitStorage(path)   # an up-to-date database is left alone
+    assert reopened.load_tasks()[0]["priority"] == 1
+    reopened._write_conn.close()
+    reopened._read_conn.close()
@@ -0,0 +1,75 @@
+import random
+
+from models import CATEGORIES, PRIORITIES
+from task_store import TaskStore
+
+HIGH, LOW = PRIORITIES.index("High"), PRIORITIES.index("Low")
+
+
+def scan(store, k):
+    """Up Next the slow way: every undone task sorted by (urgency, id)."""
+    undone = sorted((task for task in store if not task.done), key=lambda task: (task.urgency, task.id))
+    return [task.id for task in undone[:k]]
+
+
+def make_store():
+    store = TaskStore()
+    for minutes in (600, 660, 720, 780):
+        store.add(f"Due {minutes}", "Others", due=minutes)
+    return store
+
+
+def test_top_orders_by_urgency_then_age():
+    store = make_store()
+    store.add("Also due 600", "Others", due=600)
+    assert [task.id for task in store.next_undone(3)] == [1, 5, 2]
+
+
+def test_done_task_leaves_top_and_returns_once_reopened():
+    store = make_store()
+    store.set_done(1, True)
+    assert [task.id for task in store.next_undone(2)] == [2, 3]
+    # The entry from before it was done is live again alongside the new one
+    store.set_done(1, False)
+    assert [task.id for task in store.next_undone(4)] == [1, 2, 3, 4]
+
+
+def test_priority_change_skips_stale_entry():
+    store = make_store()
+    store.reschedule(4, HIGH, 700)
+    assert [task.id for task in store.next_undone(4)] == [4, 1, 2, 3]
+    store.reschedule(1, LOW, 600)
+    assert [task.id for task in store.next_undone(4)] == [4, 2, 1, 3]
+    # Back to its first urgency: two identical entries, one result
+    store.reschedule(4, PRIORITIES.index("Normal"), 780)
+    assert [task.id for task in store.next_undone(4)] == [2, 1, 3, 4]
+
+
+def test_removed_task_is_skipped():
+    store = make_store()
+    store.remove(1)
+    store.remove(3)
+    assert [task.id for task in store.next_undone(3)] == [2, 4]
+
+
+def test_random_changes_match_scan_and_compaction_bounds_heap():
+    rng = random.Random(7)
+    store = TaskStore()
+    for i in range(200):
+        store.add(f"Habit {i}", rng.choice(CATEGORIES), rng.random() < 0.3,
+                  priority=rng.randrange(3), due=rng.choice((None, rng.randrange(24 * 60))))
+    for step in range(5000):
+        task = rng.choice(list(store))
+        action = rng.randrange(4)
+        if action == 0:
+            store.set_done(task.id, not task.done)
+        elif action == 1:
+            store.reschedule(task.id, rng.randrange(3), rng.choice((None, rng.randrange(24 * 60))))
+        elif action == 2:
+            store.set_streak(task.id, rng.randrange(10))
+        elif len(store) > 50:
+            store.remove(task.id)
+        else:
+            store.add(f"New {step}", rng.choice(CATEGORIES))
+        assert [t.id for t in store.next_undone(5)] == scan(store, 5)
+        assert len(store._up_next._heap) <= 2 * store.count(False) + 33
@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+import transfer
+from models import CATEGORIES
+
+TASK = {"kind": "task", "label": "Walk", "category": "Exercise", "done": True, "priority": 2, "due": "07:30"}
+NIGHT = {
+    "kind": "sleep", "date": "2024-03-01", "hours": 7.5, "quality": 4, "nap_hours": 0.5,
+    "bedtime": "23:00", "wakeup": "06:30",
+}
+
+
+def read_all(path):
+    batches = list(transfer.read_batches(path, CATEGORIES))
+    return (
+        [task for batch in batches for task in batch.tasks],
+        [night for batch in batches for night in batch.nights],
+        sum(batch.rejected for batch in batches),
+        [error for batch in batches for error in batch.errors],
+    )
+
+
+def write_jsonl(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+
+
+@pytest.mark.parametrize("field, value", [
+    ("label", 123), ("label", ["Walk"]), ("category", 5), ("category", {"name": "Exercise"}),
+])
+def test_jsonl_non_string_task_fields_are_rejected(tmp_path, field, value):
+    path = tmp_path / "in.jsonl"
+    write_jsonl(path, [TASK, dict(TASK, **{field: value}), TASK])
+    tasks, _, rejected, errors = read_all(str(path))
+    assert len(tasks) == 2
+    assert rejected == 1
+    assert errors == [f"record 2: {field} must be text"]
+
+
+@pytest.mark.parametrize("value", [20240301, ["2024-03-01"]])
+def test_jsonl_non_string_date_is_rejected(tmp_path, value):
+    path = tmp_path / "in.jsonl"
+    write_jsonl(path, [NIGHT, dict(NIGHT, date=value)])
+    _, nights, rejected, errors = read_all(str(path))
+    assert len(nights) == 1
+    assert rejected == 1
+    assert errors == ["record 2: date must be text"]
+
+
+def test_binary_round_trip(tmp_path):
+    path = str(tmp_path / "out.zbin")
+    assert transfer.write_records(path, [TASK, NIGHT, dict(TASK, due=None, label="Ünïcode")]) == 3
+    tasks, nights, rejected, _ = read_all(path)
+    assert rejected == 0
+    assert tasks[0] == {k: v for k, v in TASK.items() if k != "kind"}
+    assert tasks[1]["label"] == "Ünïcode" and tasks[1]["due"] is None
+    assert nights[0]["hours"] == 7.5 and nights[0]["bedtime"] == "23:00"
+
+
+def test_binary_unknown_category_is_rejected(tmp_path):
+    path = tmp_path / "out.zbin"
+    transfer.write_records(str(path), [TASK])
+    data = bytearray(path.read_bytes())
+    data[len(transfer.BINARY_MAGIC) + 1] = 200   # category id byte of the first task
+    path.write_bytes(bytes(data))
+    _, _, rejected, errors = read_all(str(path))
+    assert rejected == 1
+    assert "unknown category '#200'" in errors[0]
+
+
+def binary_file(tmp_path, records):
+    path = tmp_path / "out.zbin"
+    transfer.write_records(str(path), records)
+    return path
+
+
+def test_binary_invalid_utf8_label_is_rejected(tmp_path):
+    path = binary_file(tmp_path, [TASK, dict(TASK, label="Swim"), NIGHT])
+    path.write_bytes(path.read_bytes().replace(b"Swim", b"Sw\xffm"))
+    tasks, nights, rejected, errors = read_all(str(path))
+    assert [task["label"] for task in tasks] == ["Walk"] and len(nights) == 1
+    assert rejected == 1
+    assert errors == ["record 2: label is not valid UTF-8"]
+
+
+@pytest.mark.parametrize("cut", [1, 3, 7])
+def test_binary_truncated_task_raises(tmp_path, cut):
+    path = binary_file(tmp_path, [TASK])
+    path.write_bytes(path.read_bytes()[:-cut])
+    with pytest.raises(ValueError, match="Truncated"):
+        read_all(str(path))
+
+
+def test_binary_truncated_night_raises(tmp_path):
+    path = binary_file(tmp_path, [TASK, NIGHT])
+    path.write_bytes(path.read_bytes()[:-4])
+    with pytest.raises(ValueError, match="Truncated"):
+        read_all(str(path))
+
+
+def test_binary_unknown_tag_raises(tmp_path):
+    path = binary_file(tmp_path, [TASK])
+    path.write_bytes(path.read_bytes() + b"X" + bytes(20))
+    with pytest.raises(ValueError, match="Corrupt"):
+        read_all(str(path))
+
+
+def test_binary_bad_magic_raises(tmp_path):
+    path = tmp_path / "out.zbin"
+    path.write_bytes(b"NOPE\x01" + bytes(20))
+    with pytest.raises(ValueError, match="Not a Zenith"):
+        read_all(str(path))
+
+
+def test_binary_records_span_read_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(transfer, "READ_CHUNK", 7)
+    records = [dict(TASK, label=f"Habit {i}") for i in range(50)] + [NIGHT] * 10
+    path = binary_file(tmp_path, records)
+    tasks, nights, rejected, _ = read_all(str(path))
+    assert [task["label"] for task in tasks] == [f"Habit {i}" for i in range(50)]
+    assert len(nights) == 10 and rejected == 0
@@ -0,0 +1,50 @@
+import flet as ft
+
+# --- Color Palette ---
+BG_COLOR = "#121212"
+CARD_COLOR = "#1E1E1E"
+ACCENT_MOVEMENT = "#00E676"  # Neon Green for Movement
+ACCENT_SLEEP = "#651FFF"     # Deep Purple for Sleep
+ACCENT_NAP = "#FF9100"       # Orange for Naps
+ACCENT_WARNING = "#FF5252"   # Red for Schedule Warning
+TEXT_COLOR = "#FFFFFF"
+
+# --- Utility Colors ---
+C_TRANSPARENT = "#00000000"
+C_WHITE10 = "#1AFFFFFF"      
+C_GREY_400 = "#BDBDBD"
+C_GREY_700 = "#616161"
+C_RED_400 = "#EF5350"
+C_WARNING = "#FF8A80"        # Light Red for warnings
+
+# --- Sleep Gradient (Calm/Dark Purple-Blue) ---
+SLEEP_GRADIENT_COLORS = ["#0f0c29",  "#302b63", "#24243e"]
+
+# --- Movement Gradient (Pastel Turquoise/Blue-Greenish) for enegrising mood ---
+MOVEMENT_GRADIENT_COLORS = ["#FF00AA69", "#FF006970"] 
+
+# --- Dashboard Gradient (Dark Sea Blue) for calming opening colors ---
+DASHBOARD_GRADIENT_COLORS = ["#191186B9", "#1F21AD86", "#090F7AA7"]
+
+GLASS_COLOR = "#25252550"
+
+# --- Shared Assets ---
+# Built once per process and shared by every session (server mode serves many
+# users from one process). They are never mutated, so sharing them is safe.
+# Flet controls can't be shared (each belongs to one page), so only these
+# plain values and gradients are hoisted; control trees are built per session.
+
+# Dashboard (Deep Slate Blue --> general calming and focused colours)
+DASHBOARD_GRADIENT = ft.LinearGradient(
+    begin=ft.alignment.top_left, end=ft.alignment.bottom_right, colors=DASHBOARD_GRADIENT_COLORS
+)
+# Movement Tab (Pastel/Blue-Green Gradient --> energizing)
+MOVEMENT_GRADIENT = ft.LinearGradient(
+    begin=ft.alignment.top_left, end=ft.alignment.bottom_right, colors=MOVEMENT_GRADIENT_COLORS
+)
+# Sleep Tab (Calm/Dark Gradient)
+SLEEP_GRADIENT = ft.LinearGradient(
+    begin=ft.alignment.top_left, end=ft.alignment.bottom_right, colors=SLEEP_GRADIENT_COLORS
+)
+# Content background per rail destination; Mindfulness uses its own ocean card
+VIEW_GRADIENTS = (DASHBOARD_GRADIENT, MOVEMENT_GRADIENT, SLEEP_GRADIENT, None)
@@ -0,0 +1,314 @@
+import csv
+import datetime
+import functools
+import io
+import json
+import os
+import struct
+
+from models import CATEGORIES, CATEGORY_IDS, NORMAL, PRIORITIES, format_due, parse_due
+
+# Import/export of habits and sleep history as CSV, JSON Lines or a compact binary
+# format. Every stage is a generator over one record at a time, so memory stays
+# bounded by BATCH_SIZE no matter how large the file is. Loaded on first use.
+
+BATCH_SIZE = 5000         # records validated and inserted together
+MAX_LABEL_LENGTH = 200
+MAX_ERRORS_KEPT = 20      # error messages kept for the summary; the rest are only counted
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".zbin": "binary"}
+FORMAT_LABELS = {"csv": "CSV", "jsonl": "JSON Lines", "binary": "compact binary"}   # as shown in menus
+
+# Records are the row dicts storage loads, tagged with a "kind":
+#   task:  label, category, done, priority, due ("HH:MM" or None)
+#   sleep: date (ISO), hours, quality, nap_hours, bedtime, wakeup ("HH:MM" or None)
+CSV_FIELDS = (
+    "kind", "label", "category", "done", "priority", "due",
+    "date", "hours", "quality", "nap_hours", "bedtime", "wakeup",
+)
+
+# --- Binary format ---
+# Header, then one record after another:
+#   b"T" category id (B), done (B), priority (B), due minutes or -1 (h), label bytes (H), label
+#   b"S" date ordinal (I), hours (f), quality (B), nap hours (f), bedtime / wakeup minutes or -1 (h h)
+BINARY_MAGIC = b"ZNTH\x01"
+TASK_STRUCT = struct.Struct("<BBBhH")
+SLEEP_STRUCT = struct.Struct("<IfBfhh")
+TASK_TAG_BYTE, SLEEP_TAG_BYTE = b"T", b"S"
+TASK_TAG, SLEEP_TAG = TASK_TAG_BYTE[0], SLEEP_TAG_BYTE[0]
+MAX_BINARY_RECORD = 1 + TASK_STRUCT.size + 0xFFFF   # longest possible label
+READ_CHUNK = 1 << 20
+
+
+def format_for(path):
+    """The format name for a file path, from its extension."""
+    fmt = FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Unsupported file type: {path} (expected {', '.join(FORMATS)})")
+    return fmt
+
+
+# --- Export ---
+
+def export_records(tasks, nights):
+    """Yields `tasks` (Task) and then `nights` (SleepEntry) as records."""
+    for task in tasks:
+        yield {
+            "kind": "task", "label": task.label, "category": task.category, "done": task.done,
+            "priority": task.priority, "due": format_due(task.due),
+        }
+    for entry in nights:
+        yield {
+            "kind": "sleep", "date": entry.date.isoformat(), "hours": entry.hours, "quality": entry.quality,
+            "nap_hours": entry.nap_hours,
+            "bedtime": entry.bedtime.strftime("%H:%M") if entry.bedtime else None,
+            "wakeup": entry.wakeup.strftime("%H:%M") if entry.wakeup else None,
+        }
+
+
+def write_records(path, records, fmt=None, on_progress=None):
+    """Streams `records` to `path`; returns how many were written.
+
+    `on_progress(count)` is called after every BATCH_SIZE records.
+    """
+    fmt = fmt or format_for(path)
+    count = 0
+    if on_progress is not None:
+        records = _reporting(records, on_progress)
+    with open(path, "wb") as f:
+        if fmt == "binary":
+            f.write(BINARY_MAGIC)
+            for record in records:
+                f.write(_pack(record))
+                count += 1
+            return count
+
+        text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+        if fmt == "csv":
+            writer = csv.DictWriter(text, CSV_FIELDS, restval="")
+            writer.writeheader()
+            for record in records:
+                writer.writerow(record)
+                count += 1
+        else:
+            for record in records:
+                text.write(json.dumps(record, separators=(",", ":")))
+                text.write("\n")
+                count += 1
+        text.flush()
+        text.detach()
+    return count
+
+
+def _reporting(records, on_progress):
+    for count, record in enumerate(records, start=1):
+        yield record
+        if count % BATCH_SIZE == 0:
+            on_progress(count)
+
+
+def _pack(record):
+    if record["kind"] == "task":
+        label = record["label"].encode("utf-8")
+        due = parse_due(record["due"])
+        return TASK_TAG_BYTE + TASK_STRUCT.pack(
+            CATEGORY_IDS[record["category"]], record["done"], record["priority"],
+            due if due is not None else -1, len(label),
+        ) + label
+    bedtime, wakeup = parse_due(record["bedtime"]), parse_due(record["wakeup"])
+    return SLEEP_TAG_BYTE + SLEEP_STRUCT.pack(
+        datetime.date.fromisoformat(record["date"]).toordinal(), record["hours"], record["quality"],
+        record["nap_hours"], bedtime if bedtime is not None else -1, wakeup if wakeup is not None else -1,
+    )
+
+
+# --- Import ---
+
+class Batch:
+    """Validated records ready to insert, plus how far into the file reading has got."""
+
+    __slots__ = ("tasks", "nights", "rejected", "errors", "bytes_read")
+
+    def __init__(self):
+        self.tasks = []
+        self.nights = []
+        self.rejected = 0
+        self.errors = []
+        self.bytes_read = 0
+
+
+def read_batches(path, categories, batch_size=BATCH_SIZE, fmt=None):
+    """Yields Batches of validated records from `path`.
+
+    Records whose category isn't one of `categories`, or whose fields are missing or
+    out of range, are rejected: counted, and the first few explained in Batch.errors.
+    """
+    fmt = fmt or format_for(path)
+    allowed = frozenset(categories)
+    with open(path, "rb") as f:
+        batch = Batch()
+        for line, record in _read(f, fmt):
+            try:
+                kind = record.get("kind")
+                if kind == "task":
+                    batch.tasks.append(validate_task(record, allowed))
+                elif kind == "sleep":
+                    batch.nights.append(validate_sleep(record))
+                else:
+                    raise ValueError(record.get("error") or f"unknown kind {kind!r}")
+            except (TypeError, ValueError) as ex:
+                batch.rejected += 1
+                if len(batch.errors) < MAX_ERRORS_KEPT:
+                    batch.errors.append(f"record {line}: {ex}")
+            if len(batch.tasks) + len(batch.nights) + batch.rejected >= batch_size:
+                batch.bytes_read = f.tell()
+                yield batch
+                batch = Batch()
+        batch.bytes_read = f.tell()
+        yield batch
+
+
+def _read(f, fmt):
+    """Yields (record number, record dict) from an open binary file."""
+    if fmt == "binary":
+        yield from enumerate(_unpack_all(f), start=1)
+        return
+
+    text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+    if fmt == "csv":
+        yield from enumerate(csv.DictReader(text), start=1)
+    else:
+        for number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as ex:
+                record = {"error": f"invalid JSON ({ex.msg})"}
+            yield number, record if isinstance(record, dict) else {"error": "not a JSON object"}
+    text.detach()
+
+
+def _unpack_all(f):
+    if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+        raise ValueError("Not a Zenith binary export")
+    # Records are decoded from READ_CHUNK-sized blocks rather than read one field at a time
+    data, pos = b"", 0
+    while True:
+        if len(data) - pos < MAX_BINARY_RECORD:
+            data, pos = data[pos:], 0
+            # read() may return less than asked for, so top up until a whole record fits
+            while len(data) < MAX_BINARY_RECORD and (chunk := f.read(READ_CHUNK)):
+                data += chunk
+            if not data:
+                return
+        tag = data[pos]
+        if len(data) - pos < 1 + min(TASK_STRUCT.size, SLEEP_STRUCT.size):
+            raise ValueError("Truncated binary export")
+        if tag == TASK_TAG:
+            category, done, priority, due, length = TASK_STRUCT.unpack_from(data, pos + 1)
+            pos += 1 + TASK_STRUCT.size
+            label = data[pos:pos + length]
+            pos += length
+            if len(label) != length:
+                raise ValueError("Truncated binary export")
+            try:
+                label = label.decode("utf-8")
+            except UnicodeDecodeError:
+                # The record's length was intact, so only this record is lost
+                yield {"error": "label is not valid UTF-8"}
+                continue
+            yield {
+                "kind": "task", "label": label,
+                "category": CATEGORIES[category] if category < len(CATEGORIES) else f"#{category}",
+                "done": bool(done), "priority": priority, "due": format_due(due) if due >= 0 else None,
+            }
+        elif tag == SLEEP_TAG:
+            if len(data) - pos < 1 + SLEEP_STRUCT.size:
+                raise ValueError("Truncated binary export")
+            ordinal, hours, quality, nap_hours, bedtime, wakeup = SLEEP_STRUCT.unpack_from(data, pos + 1)
+            pos += 1 + SLEEP_STRUCT.size
+            yield {
+                "kind": "sleep", "date": datetime.date.fromordinal(ordinal).isoformat(),
+                "hours": round(hours, 4), "quality": quality, "nap_hours": round(nap_hours, 4),
+                "bedtime": format_due(bedtime) if bedtime >= 0 else None,
+                "wakeup": format_due(wakeup) if wakeup >= 0 else None,
+            }
+        else:
+            raise ValueError("Corrupt binary export")
+
+
+# --- Validation ---
+# CSV hands every field over as a string, so each check accepts the text form too.
+
+def validate_task(record, categories):
+    label = _text(record.get("label"), "label").strip()
+    if not label or len(label) > MAX_LABEL_LENGTH:
+        raise ValueError("label must be 1-200 characters")
+    category = _text(record.get("category"), "category") or "Others"
+    if category not in categories:
+        raise ValueError(f"unknown category {category!r}")
+    priority = _int(record.get("priority"), NORMAL)
+    if not 0 <= priority < len(PRIORITIES):
+        raise ValueError(f"priority must be 0-{len(PRIORITIES) - 1}")
+    return {
+        "label": label, "category": category, "done": _bool(record.get("done")),
+        "priority": priority, "due": _clock(record.get("due"), "due"),
+    }
+
+
+def validate_sleep(record):
+    date = datetime.date.fromisoformat(_text(record.get("date"), "date"))
+    hours = float(record.get("hours"))
+    quality = _int(record.get("quality"), None)
+    nap_hours = float(record.get("nap_hours") or 0)
+    if not 0 <= hours <= 24:
+        raise ValueError("hours must be 0-24")
+    if quality is None or not 1 <= quality <= 5:
+        raise ValueError("quality must be 1-5")
+    if not 0 <= nap_hours <= 24:
+        raise ValueError("nap_hours must be 0-24")
+    return {
+        "date": date, "hours": hours, "quality": quality, "nap_hours": nap_hours,
+        "bedtime": _clock(record.get("bedtime"), "bedtime"), "wakeup": _clock(record.get("wakeup"), "wakeup"),
+    }
+
+
+def _text(value, name):
+    # JSON Lines can carry any JSON type where a string is expected
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise ValueError(f"{name} must be text")
+    return value
+
+
+def _int(value, default):
+    if type(value) is int:
+        return value
+    if value is None or value == "":
+        return default
+    if isinstance(value, float) or (isinstance(value, str) and not value.strip().lstrip("-").isdigit()):
+        raise ValueError(f"not a whole number: {value!r}")
+    return int(value)
+
+
+def _bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    return bool(value)
+
+
+def _clock(value, name):
+    """Validates an optional "HH:MM" field, returning it unchanged (or None)."""
+    if value is None or value == "":
+        return None
+    if not _is_clock(value):
+        raise ValueError(f"{name} must be HH:MM")
+    return value
+
+
+@functools.lru_cache(maxsize=2048)
+def _is_clock(value):
+    # Clock fields repeat a lot across a file, so each distinct string is checked once
+    return parse_due(value) is not None